@@ -0,0 +1,175 @@
+"""
+allocation.py
+=============
+Répartition du portefeuille par classe d'actifs, secteur, zone et compte.
+
+Chaque ligne (compte, ticker) reçoit un code de groupe par dimension ; les
+totaux par groupe de chaque dimension sont tenus à jour en permanence :
+lorsqu'une quantité, un cours ou une classification change, seul l'écart de
+valeur des lignes concernées est reporté (`np.add.at`) sur les groupes de
+chaque dimension. Les totaux de toutes les dimensions sont publiés ensemble
+(`refresh`) : changer de dimension dans l'interface revient donc à lire des
+totaux déjà calculés, sans repasser par les positions.
+
+Rééquilibrage : ordres d'achat / vente pour atteindre les cibles, ou
+répartition d'un apport sur les seuls groupes sous-pondérés (sans vente).
+"""
+
+import threading
+
+import numpy as np
+
+from config import ALLOCATION_DIMENSIONS
+
+UNCLASSIFIED = "Non classé"
+
+
+class AllocationIndex:
+    """Totaux par groupe pour chaque dimension, mis à jour ligne par ligne."""
+
+    def __init__(self, dimensions: dict[str, str] = ALLOCATION_DIMENSIONS):
+        self.dimensions = dict(dimensions)          # dimension → champ de classification
+        self._lock = threading.Lock()
+        self._lines: dict[tuple, int] = {}          # (compte, ticker) → indice de ligne
+        self._value = np.zeros(0)
+        self._codes = {d: np.zeros(0, dtype=np.int32) for d in self.dimensions}
+        self._groups: dict[str, list[str]] = {d: [] for d in self.dimensions}
+        self._group_idx: dict[str, dict[str, int]] = {d: {} for d in self.dimensions}
+        self._totals = {d: np.zeros(0) for d in self.dimensions}
+        self.updated_lines = 0
+
+    def _group_code(self, dimension: str, group: str) -> int:
+        idx = self._group_idx[dimension]
+        if group not in idx:
+            idx[group] = len(self._groups[dimension])
+            self._groups[dimension].append(group)
+            self._totals[dimension] = np.r_[self._totals[dimension], 0.0]
+        return idx[group]
+
+    def update(self, accounts: list[str], tickers: list[str], values, meta: dict[str, dict]) -> int:
+        """
+        Applique les valeurs de marché des lignes détenues ; renvoie le nombre
+        de lignes dont la valeur ou le groupe a changé.
+
+        meta : {ticker: {champ: groupe}} (classe, secteur, zone…).
+        Les lignes absentes de l'appel sont soldées (valeur 0).
+        """
+        with self._lock:
+            return self._apply(accounts, tickers, values, meta)
+
+    def refresh(self, accounts: list[str], tickers: list[str], values,
+                meta: dict[str, dict]) -> dict[str, dict]:
+        """
+        `update` puis `rollup` de toutes les dimensions, sous le même verrou :
+        les totaux renvoyés sont ceux de cet appel, même si d'autres sessions
+        mettent l'index à jour en parallèle.
+        """
+        with self._lock:
+            self._apply(accounts, tickers, values, meta)
+            return {d: self._rollup(d) for d in self.dimensions}
+
+    def rollup(self, dimension: str) -> dict:
+        """Groupes non vides d'une dimension, triés par valeur décroissante (lecture seule)."""
+        with self._lock:
+            return self._rollup(dimension)
+
+    def _apply(self, accounts, tickers, values, meta) -> int:
+        values = np.asarray(values, dtype=float)
+        keys = list(zip(accounts, tickers))
+        # Nouvelles lignes : ajoutées avec une valeur nulle et sans groupe
+        fresh = [k for k in dict.fromkeys(keys) if k not in self._lines]
+        if fresh:
+            for key in fresh:
+                self._lines[key] = len(self._lines)
+            self._value = np.r_[self._value, np.zeros(len(fresh))]
+            for d in self.dimensions:
+                self._codes[d] = np.r_[self._codes[d],
+                                       np.full(len(fresh), -1, dtype=np.int32)]
+
+        new_value = np.zeros_like(self._value)
+        rows = np.array([self._lines[k] for k in keys], dtype=int)
+        new_value[rows] = values
+        changed = new_value != self._value
+
+        for d, field in self.dimensions.items():
+            codes = self._codes[d].copy()
+            for key, row in zip(keys, rows):
+                account, ticker = key
+                group = account if field == "Compte" else (
+                    (meta.get(ticker) or {}).get(field) or UNCLASSIFIED)
+                codes[row] = self._group_code(d, str(group))
+            moved = codes != self._codes[d]
+            dirty = np.nonzero(changed | moved)[0]
+            if dirty.size:
+                old = dirty[self._codes[d][dirty] >= 0]
+                np.add.at(self._totals[d], self._codes[d][old], -self._value[old])
+                live = dirty[codes[dirty] >= 0]
+                np.add.at(self._totals[d], codes[live], new_value[live])
+                changed |= moved
+            self._codes[d] = codes
+
+        self._value = new_value
+        self.updated_lines = int(changed.sum())
+        return self.updated_lines
+
+    def _rollup(self, dimension: str) -> dict:
+        # Valeurs en listes : le résultat part tel quel dans un dcc.Store
+        totals = self._totals[dimension]
+        groups = self._groups[dimension]
+        codes = self._codes[dimension]
+        lines = sorted(self._lines, key=self._lines.get)
+        # Arrondis des mises à jour successives : un groupe soldé vaut ~0
+        totals = np.where(np.abs(totals) < 1e-6, 0.0, totals)
+        order = [i for i in np.argsort(-totals) if totals[i] > 0]
+        total = float(totals.sum())
+        held = np.nonzero(self._value > 0)[0]
+        return {
+            "dimension": dimension,
+            "groups":    [groups[i] for i in order],
+            "values":    totals[order].tolist(),
+            "shares":    (totals[order] / total if total else totals[order]).tolist(),
+            "total":     total,
+            "lines":     [lines[i] for i in held],
+            "line_values": self._value[held].tolist(),
+            "line_groups": [groups[c] for c in codes[held]],
+        }
+
+
+def rebalancing(rollup: dict, targets: dict[str, float], cash: float = 0.0) -> dict:
+    """
+    Ordres par groupe pour atteindre les cibles (en % de la valeur + apport).
+
+    trades       : achats (+) / ventes (−) pour coller exactement aux cibles ;
+    cash_only    : répartition de l'apport sur les groupes sous-pondérés,
+                   au prorata de leur écart, sans aucune vente.
+    Les groupes sans cible sont visés à 0 % (sauf si aucune cible n'est saisie).
+    """
+    groups = list(dict.fromkeys(list(rollup["groups"]) + [g for g in targets if targets[g]]))
+    current = np.array([
+        float(rollup["values"][rollup["groups"].index(g)]) if g in rollup["groups"] else 0.0
+        for g in groups
+    ])
+    weights = np.array([max(float(targets.get(g) or 0), 0.0) for g in groups])
+    if weights.sum() > 0:
+        weights = weights / weights.sum()
+    elif current.sum() > 0:
+        weights = current / current.sum()            # aucune cible : répartition actuelle
+    total = current.sum() + max(cash, 0.0)
+    target_value = weights * total
+    trades = target_value - current
+
+    shortfall = np.clip(trades, 0, None)
+    cash_only = (shortfall / shortfall.sum() * min(cash, shortfall.sum())
+                 if cash > 0 and shortfall.sum() > 0 else np.zeros_like(shortfall))
+    return {
+        "groups":    groups,
+        "current":   current,
+        "shares":    current / current.sum() if current.sum() else current,
+        "targets":   weights,
+        "trades":    trades,
+        "cash_only": cash_only,
+    }
+
+
+# Instance partagée : les totaux par groupe survivent d'une requête à l'autre
+ALLOCATION = AllocationIndex()
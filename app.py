@@ -13,28 +13,64 @@ Stratégie de persistance :
   - Un refresh navigateur recharge la page et déclenche ce callback :
     les données sont restaurées sans relancer le serveur.
 
+Démarrage à froid :
+  - Le layout est construit à la première requête (puis mis en cache), et non
+    à l'import du module : un worker relancé devient disponible plus vite.
+  - pandas et scipy.interpolate sont importés au premier usage ; pandas
+    l'est avant le traitement de la première requête, sous verrou (voir
+    callbacks.ensure_pandas).
+  - `python startup_report.py` mesure le coût d'import agrégé par paquet.
+
 Arborescence
 ------------
 ├── app.py
+├── allocation.py
 ├── config.py
 ├── figures.py
 ├── layout.py
 ├── callbacks.py
+├── dca.py
+├── deflators.py
+├── http_cache.py
+├── loans.py
+├── memo.py
+├── metrics.py
+├── networth.py
+├── payroll.py
+├── percentiles.py
+├── portfolio.py
+├── prices.py
+├── properties.py
+├── refinancing.py
+├── rental.py
+├── risk.py
+├── scenarios.py
+├── sensitivity.py
+├── startup_report.py
+├── stress.py
 ├── SalaryProjectionFunc.py
+├── tax_lots.py
 └── patrimoine_save.json   (créé par le bouton Sauvegarder)
 """
 
+from functools import lru_cache
+
 from dash import Dash
 
 from config import INITIAL_DATA, N_ROWS
 from figures import _DEFAULT_BUDGET
 from layout import build_layout, INDEX_STRING
-from callbacks import load_saved_data
+from callbacks import ensure_pandas, load_saved_data, load_saved_section
+from http_cache import register_http_caching
+from metrics import register_metrics_endpoint
 import callbacks  # noqa: F401
 
 
 # ─── Données à injecter (sauvegarde ou valeurs par défaut) ───────────────────
 _saved_salary, _saved_budget = load_saved_data()
+_saved_properties = load_saved_section("properties")
+_saved_investments = load_saved_section("investments")
+_saved_scenarios = load_saved_section("scenarios")
 
 _init_salary = _saved_salary if _saved_salary else INITIAL_DATA
 _init_budget = _saved_budget if _saved_budget else _DEFAULT_BUDGET
@@ -45,14 +81,26 @@ while len(_init_salary) < N_ROWS:
     _init_salary.append({"Salaire": None, "Date de début": None, "Date de fin": None})
 
 
+# ─── Layout (construit à la première requête) ───────────────────────────────
+@lru_cache(maxsize=1)
+def serve_layout():
+    layout = build_layout()
+    # Injecter dans les stores globaux
+    layout["salary-store"].data      = _init_salary
+    layout["app-budget-store"].data  = _init_budget
+    layout["app-property-store"].data = _saved_properties
+    layout["app-investment-store"].data = _saved_investments
+    layout["app-scenario-store"].data = _saved_scenarios
+    return layout
+
+
 # ─── Application ─────────────────────────────────────────────────────────────
 app = Dash(__name__, suppress_callback_exceptions=True)
 app.index_string = INDEX_STRING
-app.layout = build_layout()
-
-# Injecter dans les stores globaux (avant que le serveur commence à servir)
-app.layout["salary-store"].data      = _init_salary
-app.layout["app-budget-store"].data  = _init_budget
+app.layout = serve_layout
+app.server.before_request(ensure_pandas)
+register_metrics_endpoint(app.server)
+register_http_caching(app.server)
 
 
 # ─── Lancement ───────────────────────────────────────────────────────────────
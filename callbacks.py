@@ -4,27 +4,109 @@ callbacks.py
 Tous les callbacks Dash.
 
 Fonctionnalités :
-- Mise à jour projection salariale (PDF, courbe, KPI)
+- Mise à jour projection salariale (PDF, courbe, KPI) en euros courants, constants
+  ou en multiple du salaire moyen (deflators.py), en brut, net ou net après impôt
+  (payroll.py) ; lignes d'historique saisies en brut converties en net
+- Percentile au fil du temps : historique classé dans la distribution INSEE de
+  chaque année, trajectoire projetée (percentiles.py)
+- Sensibilité de la projection : grille des sliders précalculée, tornado et heatmap
 - Gestion budget : store JSON, éditeur dynamique (renommer, supprimer, créer)
 - Sauvegarde / chargement CSV (données salariales + budget)
+- Mode multi-scénarios : scénarios nommés comparés côte à côte (évaluation groupée)
+- Simulation de crédit immobilier (amortissement, grille taux × durée)
+- Rachat de crédit : meilleure option et frontière de rentabilité
+- Parc immobilier : inventaire, hypothèses par zone, projection incrémentale
+- Revenus locatifs : rendements, micro-foncier / réel, impôt de plus-value
+- Portefeuille boursier : transactions, positions, TWR / MWR par ligne et compte
+- Import d'historiques de cours CSV (stockage local projeté en mémoire)
+- Allocation : totaux par classe / secteur / zone / compte, rééquilibrage
+- Plus-values mobilières : registre de lots (PRU / FIFO), PFU contre barème
+- Simulation DCA / versement unique : grille déterministe et percentiles
+- Risque : volatilité, corrélation, VaR / CVaR (moments mis à jour incrémentalement)
+- Scénarios de stress : chocs de facteurs et rejeux historiques, en cache par scénario
+- Cumul patrimoine total : séries des 3 modules versionnées, agrégées par écart
+- Callbacks purs (projection, Sankey) mémoïsés via memo.py
+- Latence / tailles / erreurs mesurées via metrics.py (si activé)
+- Calculs lourds exécutables en arrière-plan via jobs.py (si activé)
 """
 
+import base64
 import json
 import csv
 import os
-import pandas as pd
-from datetime import datetime
-from dash import callback, Output, Input, State, html, ALL, ctx, no_update, dcc
+import threading
+import numpy as np
+from datetime import date, datetime
+from typing import TYPE_CHECKING
+from dash import (
+    callback, clientside_callback, Output, Input, State, html, ALL, ctx, no_update, dcc,
+)
 
-from config import COLORS, CURRENT_YEAR, LABEL_STYLE, VALUE_STYLE
+from config import (
+    ALLOCATION_DIMENSIONS, ASSET_CLASSES, COLORS, CURRENT_YEAR, DCA_MAX_HORIZON,
+    DCA_RETURN_RANGE, LABEL_STYLE, RISK_LEVELS, STRESS_FACTORS, VALUE_STYLE,
+)
 from figures import (
-    build_pdf_figure, build_projection_figure, build_sankey_figure,
+    build_pdf_figure, build_projection_figure, build_sankey_figure, build_total_figure,
+    build_scenarios_figure, build_tornado_figure, build_sensitivity_heatmap_figure,
+    build_percentile_figure,
+    build_amortization_figure, build_loan_grid_figure, build_property_figure,
+    build_rental_tax_figure, build_capital_gains_figure, build_refinancing_figure,
+    build_portfolio_figure, build_dca_heatmap_figure, build_dca_bands_figure,
+    build_correlation_figure, build_allocation_figure, build_stress_figure,
     _DEFAULT_BUDGET, get_cat_color, _COLOR_CYCLE,
 )
-from layout import get_tab_content
+from layout import TAB_BUILDERS
+# Moteurs de calcul importés d'emblée : numpy seul, ~7 ms à eux tous
+# (startup_report.py) ; scipy et pandas, seuls imports lourds, sont différés
+from loans import loan_totals
+from portfolio import STORE, parse_quotes
+from prices import PRICES
+from networth import NETWORTH, flat_series, property_series, savings_series
+from payroll import net_from_gross
+from percentiles import percentile_path
+from properties import PORTFOLIO, parse_zones, portfolio_totals
+from refinancing import optimize_refinancing
+from rental import evaluate_rentals, marginal_rate
+from risk import RISK, risk_report
+from scenarios import SCENARIOS
+from sensitivity import SENSITIVITY
+from stress import HYPOTHETICAL, STRESS, scenario_library
+from tax_lots import LEDGER, yearly_tax
+from allocation import ALLOCATION, rebalancing
+from dca import (
+    bootstrap_paths, lognormal_paths, monthly_returns, simulate_grid, simulate_paths,
+)
+from jobs import background_callback
+from memo import canonical_key, memoize
+from metrics import instrument
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # ─── Chemin du fichier de sauvegarde ──────────────────────────────────────────
-SAVE_PATH = os.path.join(os.path.dirname(__file__), "patrimoine_save.json")
+SAVE_PATH = os.environ.get("PATRIMOINE_SAVE_PATH") or os.path.join(
+    os.path.dirname(__file__), "patrimoine_save.json",
+)
+
+
+# ─── Import différé de pandas ─────────────────────────────────────────────────
+# L'encodeur JSON de plotly inspecte sys.modules["pandas"] sans verrou : un
+# thread qui sérialise une figure pendant qu'un autre importe pandas verrait un
+# module partiellement initialisé. ensure_pandas() est donc appelé avant chaque
+# requête (app.py) : le premier thread importe sous verrou, les autres attendent.
+
+_PANDAS_LOCK = threading.Lock()
+_pandas_ready = False
+
+
+def ensure_pandas() -> None:
+    global _pandas_ready
+    if _pandas_ready:
+        return
+    with _PANDAS_LOCK:
+        import pandas  # noqa: F401
+        _pandas_ready = True
 
 
 # ─── Parsers ──────────────────────────────────────────────────────────────────
@@ -45,17 +127,25 @@ def _parse_row(row: dict) -> dict | None:
         return None
     for fmt in DATE_FORMATS:
         try:
-            return {"Salaire": sal, "Date": datetime.strptime(str(date_raw).strip(), fmt)}
+            return {"Salaire": sal, "Date": datetime.strptime(str(date_raw).strip(), fmt),
+                    "Brut": row.get("Base") == "Brut"}
         except ValueError:
             continue
     return None
 
 
-def _parse_table(rows: list) -> pd.DataFrame | None:
+def _parse_table(rows: list) -> "pd.DataFrame | None":
     valid = [r for row in rows if (r := _parse_row(row)) is not None]
     if not valid:
         return None
-    return pd.DataFrame(valid).sort_values("Date").reset_index(drop=True)
+    # Import différé : pandas n'est chargé qu'à la première requête (ensure_pandas)
+    import pandas as pd
+    df = pd.DataFrame(valid)
+    # Montants bruts ramenés au net en un appel : la suite ne manipule que du net
+    gross = df.pop("Brut").to_numpy()
+    if gross.any():
+        df.loc[gross, "Salaire"] = net_from_gross(df.loc[gross, "Salaire"].to_numpy())
+    return df.sort_values("Date").reset_index(drop=True)
 
 
 def _mean_growth_rate(salaries: list) -> float | None:
@@ -166,25 +256,42 @@ def _render_editor(budget: dict) -> html.Div:
 
 # ─── Chargement initial depuis fichier ────────────────────────────────────────
 
-def load_saved_data() -> tuple[list, dict]:
-    """Charge les données sauvegardées. Retourne (salary_rows, budget)."""
+def _read_save_file() -> dict:
     if not os.path.exists(SAVE_PATH):
-        return [], _DEFAULT_BUDGET
+        return {}
     try:
         with open(SAVE_PATH, "r", encoding="utf-8") as f:
             data = json.load(f)
-        salary_rows = data.get("salary", [])
-        budget      = data.get("budget", _DEFAULT_BUDGET)
-        return salary_rows, budget
+        return data if isinstance(data, dict) else {}
     except Exception:
-        return [], _DEFAULT_BUDGET
+        return {}
+
+
+def load_saved_data() -> tuple[list, dict]:
+    """Charge les données sauvegardées. Retourne (salary_rows, budget)."""
+    data = _read_save_file()
+    return data.get("salary", []), data.get("budget", _DEFAULT_BUDGET)
+
+
+def load_saved_section(name: str, default=None):
+    """Section `name` du fichier de sauvegarde (modules Immobilier, Investissement…)."""
+    return _read_save_file().get(name, default)
 
 
 # ─── CALLBACKS ────────────────────────────────────────────────────────────────
 
-@callback(Output("tab-content", "children"), Input("tabs-main", "value"))
-def render_tab(tab: str):
-    return get_tab_content(tab)
+# ── Changement d'onglet (côté navigateur) ─────────────────────────────────────
+# Les panneaux sont tous montés dans le layout : seul leur affichage bascule,
+# sans aller-retour serveur ni reconstruction des figures déjà calculées.
+clientside_callback(
+    """
+    function(tab) {
+        return %s.map(t => t === tab ? {} : {display: "none"});
+    }
+    """ % json.dumps(list(TAB_BUILDERS)),
+    [Output(f"tab-panel-{tab}", "style") for tab in TAB_BUILDERS],
+    Input("tabs-main", "value"),
+)
 
 
 # ── Restauration au chargement / refresh ──────────────────────────────────────
@@ -197,6 +304,7 @@ def render_tab(tab: str):
     Input("app-budget-store",   "data"),
     prevent_initial_call="initial_duplicate",
 )
+@instrument
 def restore_on_load(saved_salary, saved_budget):
     from config import INITIAL_DATA, N_ROWS
     from figures import _DEFAULT_BUDGET as _DB
@@ -213,7 +321,10 @@ def restore_on_load(saved_salary, saved_budget):
 
 
 # ── Projection + PDF + KPI ────────────────────────────────────────────────────
-@callback(
+# Exécuté en arrière-plan si PATRIMOINE_BACKGROUND=1 (voir jobs.py) : un nouveau
+# mouvement de slider annule le calcul en cours. Dans ce mode, memoize et
+# instrument opèrent dans le worker (absents de /metrics du process principal).
+@background_callback(
     Output("mean-growth-display", "children"),
     Output("graph-pdf",           "figure"),
     Output("graph-projection",    "figure"),
@@ -221,8 +332,18 @@ def restore_on_load(saved_salary, saved_budget):
     Input("slider-growth",     "value"),
     Input("slider-horizon",    "value"),
     Input("slider-confidence", "value"),
+    Input("projection-view",      "value"),
+    Input("projection-inflation", "value"),
+    Input("projection-basis",     "value"),
+    Input("projection-parts",     "value"),
+    progress=Output("salary-progress", "value"),
+    running=[(Output("salary-progress", "style"), {"display": "block"}, {"display": "none"})],
 )
-def update_salary_tab(rows, growth_pct, horizon, confidence_pct):
+@instrument
+@memoize(skip=1)
+def update_salary_tab(set_progress, rows, growth_pct, horizon, confidence_pct,
+                      view, inflation_pct, basis, parts):
+    set_progress(0)
     past_df = _parse_table(rows) if rows else None
 
     if past_df is not None and len(past_df) >= 2:
@@ -239,11 +360,70 @@ def update_salary_tab(rows, growth_pct, horizon, confidence_pct):
         float(past_df["Salaire"].iloc[-1])
         if past_df is not None and len(past_df) > 0 else None
     )
+    set_progress(1)
+    pdf_fig = build_pdf_figure(last_salary)
+    set_progress(2)
+    projection_fig = build_projection_figure(past_df, growth_pct, horizon, CURRENT_YEAR,
+                                             confidence_pct=float(confidence_pct or 5),
+                                             view=view or "nominal",
+                                             inflation=float(inflation_pct or 0),
+                                             basis=basis or "net", parts=float(parts or 1))
+    set_progress(3)
+    return mean_display, pdf_fig, projection_fig
+
+
+# ── Percentile au fil du temps ────────────────────────────────────────────────
+@callback(
+    Output("graph-percentile", "figure"),
+    Input("table-salary",   "data"),
+    Input("slider-growth",  "value"),
+    Input("slider-horizon", "value"),
+    Input("percentile-sex", "value"),
+    Input("projection-basis", "value"),
+    Input("projection-parts", "value"),
+)
+@instrument
+@memoize
+def update_percentile_path(rows, growth_pct, horizon, sex, basis, parts):
+    past_df = _parse_table(rows) if rows else None
+    if past_df is None:
+        return build_percentile_figure()
+    # Une distribution interpolée par année, évaluée sur toutes les lignes de l'année
+    path = percentile_path([d.year for d in past_df["Date"]], past_df["Salaire"].to_numpy(),
+                           float(growth_pct or 0), int(horizon or 20), sex or "E")
+    return build_percentile_figure(path, basis or "net", float(parts or 1))
+
+
+# ── Sensibilité de la projection ──────────────────────────────────────────────
+@callback(
+    Output("sensitivity-central-display", "children"),
+    Output("sensitivity-low-display",     "children"),
+    Output("sensitivity-high-display",    "children"),
+    Output("graph-tornado",               "figure"),
+    Output("graph-sensitivity",           "figure"),
+    Input("table-salary",      "data"),
+    Input("slider-growth",     "value"),
+    Input("slider-horizon",    "value"),
+    Input("slider-confidence", "value"),
+)
+@instrument
+@memoize
+def update_sensitivity(rows, growth_pct, horizon, confidence_pct):
+    past_df = _parse_table(rows) if rows else None
+    if past_df is None:
+        return "—", "—", "—", build_tornado_figure(), build_sensitivity_heatmap_figure()
+    salary = float(past_df["Salaire"].iloc[-1])
+    growth, horizon, confidence = float(growth_pct or 0), int(horizon or 20), float(confidence_pct or 0)
+    # Grille calculée une fois par dernier salaire : les sliders ne font que la lire
+    grid = SENSITIVITY.grid(salary)
+    final = SENSITIVITY.lookup(salary, growth, horizon, confidence)
     return (
-        mean_display,
-        build_pdf_figure(last_salary),
-        build_projection_figure(past_df, growth_pct, horizon, CURRENT_YEAR,
-                                confidence_pct=float(confidence_pct or 5)),
+        f"{final['central']:,.0f} €",
+        f"{final['low']:,.0f} €",
+        f"{final['high']:,.0f} €",
+        build_tornado_figure(SENSITIVITY.tornado(salary, growth, horizon, confidence),
+                             final["central"]),
+        build_sensitivity_heatmap_figure(grid, growth, horizon),
     )
 
 
@@ -273,6 +453,7 @@ def update_salary_tab(rows, growth_pct, horizon, confidence_pct):
     State("budget-store", "data"),
     prevent_initial_call=True,
 )
+@instrument
 def update_budget_store(
     cat_names, cat_name_ids,
     del_cat_clicks, del_cat_ids,
@@ -372,6 +553,8 @@ def update_budget_store(
     Input("input-monthly-salary",  "value"),
     Input("table-salary",          "data"),
 )
+@instrument
+@memoize
 def render_budget_ui(budget, monthly_salary, salary_rows):
     if budget is None:
         budget = _DEFAULT_BUDGET
@@ -404,33 +587,857 @@ def render_budget_ui(budget, monthly_salary, salary_rows):
     return editor, fig, indicator
 
 
+# ── Mode multi-scénarios ──────────────────────────────────────────────────────
+def _scenario_snapshot(name, salary_rows, growth_pct, horizon, confidence_pct,
+                       budget, monthly_salary) -> dict:
+    """Entrées d'un scénario ; l'historique est réduit aux couples (année, salaire)."""
+    past_df = _parse_table(salary_rows) if salary_rows else None
+    history = ([[d.year, float(s)] for d, s in zip(past_df["Date"], past_df["Salaire"])]
+               if past_df is not None else [])
+    return {
+        "name":           name,
+        "salary":         [r for r in salary_rows or [] if r.get("Salaire")],
+        "history":        history,
+        "growth":         float(growth_pct or 0),
+        "horizon":        int(horizon or 20),
+        "confidence":     float(confidence_pct or 0),
+        "budget":         budget or _DEFAULT_BUDGET,
+        "monthly_salary": float(monthly_salary or 0),
+    }
+
+
+@callback(
+    Output("scenario-store", "data", allow_duplicate=True),
+    Input("app-scenario-store", "data"),
+    prevent_initial_call="initial_duplicate",
+)
+@instrument
+def restore_scenarios(saved):
+    return saved if saved else no_update
+
+
+@callback(
+    Output("scenario-store",    "data", allow_duplicate=True),
+    Output("scenario-feedback", "children"),
+    Input("btn-save-scenario",    "n_clicks"),
+    Input("btn-delete-scenarios", "n_clicks"),
+    State("scenario-name",        "value"),
+    State("scenario-select",      "value"),
+    State("scenario-store",       "data"),
+    State("table-salary",         "data"),
+    State("slider-growth",        "value"),
+    State("slider-horizon",       "value"),
+    State("slider-confidence",    "value"),
+    State("budget-store",         "data"),
+    State("input-monthly-salary", "value"),
+    prevent_initial_call=True,
+)
+@instrument
+def edit_scenarios(save_clicks, delete_clicks, name, selected, scenarios, salary_rows,
+                   growth_pct, horizon, confidence_pct, budget, monthly_salary):
+    scenarios = list(scenarios or [])
+    if ctx.triggered_id == "btn-delete-scenarios":
+        kept = [s for s in scenarios if s["name"] not in (selected or [])]
+        return kept, html.Span(f"{len(scenarios) - len(kept)} scénario(s) supprimé(s)",
+                               style={"color": COLORS["text_muted"]})
+
+    name = (name or "").strip()
+    if not name:
+        return no_update, html.Span("Nom requis", style={"color": COLORS["danger"]})
+    snapshot = _scenario_snapshot(name, salary_rows, growth_pct, horizon, confidence_pct,
+                                  budget, monthly_salary)
+    # Un nom déjà utilisé remplace le scénario existant, à la même place
+    names = [s["name"] for s in scenarios]
+    if name in names:
+        scenarios[names.index(name)] = snapshot
+    else:
+        scenarios.append(snapshot)
+    return scenarios, html.Span(f"✓ « {name} » enregistré", style={"color": COLORS["success"]})
+
+
+@callback(
+    Output("scenario-select", "options"),
+    Output("scenario-select", "value"),
+    Input("scenario-store",   "data"),
+    State("scenario-select",  "options"),
+    State("scenario-select",  "value"),
+)
+@instrument
+def update_scenario_options(scenarios, options, selected):
+    names = [s["name"] for s in scenarios or []]
+    known = {o["value"] for o in options or []}
+    # Les scénarios nouvellement enregistrés sont ajoutés à la comparaison
+    value = [n for n in names if n in (selected or []) or n not in known]
+    return [{"label": n, "value": n} for n in names], value
+
+
+@callback(
+    Output("table-scenarios", "data"),
+    Output("table-scenarios", "columns"),
+    Output("graph-scenarios", "figure"),
+    Input("scenario-select",      "value"),
+    Input("scenario-store",       "data"),
+    Input("table-salary",         "data"),
+    Input("slider-growth",        "value"),
+    Input("slider-horizon",       "value"),
+    Input("slider-confidence",    "value"),
+    Input("budget-store",         "data"),
+    Input("input-monthly-salary", "value"),
+)
+@instrument
+@memoize
+def compare_scenarios(selected, scenarios, salary_rows, growth_pct, horizon,
+                      confidence_pct, budget, monthly_salary):
+    current = _scenario_snapshot("Actuel", salary_rows, growth_pct, horizon,
+                                 confidence_pct, budget, monthly_salary)
+    chosen = [s for s in scenarios or [] if s["name"] in (selected or [])]
+    # Une seule évaluation groupée ; les scénarios inchangés sortent du cache
+    results = SCENARIOS.evaluate([current] + chosen)
+
+    def _eur(x):
+        return f"{x:,.0f} €"
+
+    metrics = [
+        ("Dernier salaire annuel",  lambda r: _eur(r["last_salary"])),
+        ("Taux projeté",            lambda r: f"{r['growth']:+.1f} %/an"),
+        ("Horizon",                 lambda r: str(r["final_year"])),
+        ("Salaire final (central)", lambda r: _eur(r["final_salary"])),
+        ("Fourchette finale",       lambda r: f"{r['final_low']:,.0f} – {r['final_high']:,.0f} €"),
+        ("Revenus cumulés",         lambda r: _eur(r["earned"])),
+        ("Budget mensuel",          lambda r: _eur(r["monthly_budget"])),
+        ("Solde mensuel",           lambda r: f"{r['balance']:+,.0f} €"),
+        ("Taux d'épargne",          lambda r: f"{r['savings_rate']:.1%}"),
+        ("Épargne cumulée",         lambda r: _eur(r["saved"])),
+    ]
+    columns = [{"name": "Indicateur", "id": "Indicateur"}] + [
+        {"name": r["name"], "id": f"s{i}"} for i, r in enumerate(results)
+    ]
+    table = []
+    for label, fmt in metrics:
+        row = {"Indicateur": label}
+        for i, r in enumerate(results):
+            row[f"s{i}"] = fmt(r)
+        table.append(row)
+    return table, columns, build_scenarios_figure(results)
+
+
 # ── Sauvegarde JSON ───────────────────────────────────────────────────────────
 # Met à jour le fichier ET les stores globaux afin que le prochain refresh
 # retrouve immédiatement les données sans relancer le serveur.
 @callback(
-    Output("save-feedback",    "children"),
-    Output("salary-store",     "data"),
-    Output("app-budget-store", "data"),
-    Input("btn-save",     "n_clicks"),
-    State("table-salary", "data"),
-    State("budget-store", "data"),
+    Output("save-feedback",      "children"),
+    Output("salary-store",       "data"),
+    Output("app-budget-store",   "data"),
+    Output("app-property-store", "data"),
+    Output("app-investment-store", "data"),
+    Output("app-scenario-store", "data"),
+    Input("btn-save",         "n_clicks"),
+    State("table-salary",     "data"),
+    State("budget-store",     "data"),
+    State("table-properties", "data"),
+    State("table-zones",      "data"),
+    State("table-rentals",    "data"),
+    State("table-transactions", "data"),
+    State("table-quotes",       "data"),
+    State("table-allocation-targets", "data"),
+    State("scenario-store",     "data"),
     prevent_initial_call=True,
 )
-def save_data(n_clicks, salary_rows, budget):
+@instrument
+def save_data(n_clicks, salary_rows, budget, property_rows, zone_rows, rental_rows,
+              transaction_rows, quote_rows, target_rows, scenarios):
     if not n_clicks:
-        return no_update, no_update, no_update
+        return no_update, no_update, no_update, no_update, no_update, no_update
     try:
         salary_rows = salary_rows or []
         budget      = budget or _DEFAULT_BUDGET
+        properties  = {"properties": property_rows or [], "zones": zone_rows or [],
+                       "rentals": rental_rows or []}
+        investments = {"transactions": transaction_rows or [], "quotes": quote_rows or [],
+                       "targets": target_rows or []}
+        scenarios   = scenarios or []
+        # Les sections inconnues de cette version sont conservées telles quelles
         payload = {
-            "saved_at": datetime.now().isoformat(timespec="seconds"),
-            "salary":   salary_rows,
-            "budget":   budget,
+            **_read_save_file(),
+            "saved_at":   datetime.now().isoformat(timespec="seconds"),
+            "salary":     salary_rows,
+            "budget":     budget,
+            "properties": properties,
+            "investments": investments,
+            "scenarios":  scenarios,
         }
         with open(SAVE_PATH, "w", encoding="utf-8") as f:
             json.dump(payload, f, ensure_ascii=False, indent=2)
         ts = datetime.now().strftime("%H:%M:%S")
         feedback = html.Span(f"✓ Sauvegardé à {ts}", style={"color": COLORS["success"]})
-        return feedback, salary_rows, budget
+        return feedback, salary_rows, budget, properties, investments, scenarios
     except Exception as e:
-        return html.Span(f"✗ Erreur : {e}", style={"color": COLORS["danger"]}), no_update, no_update
\ No newline at end of file
+        return (html.Span(f"✗ Erreur : {e}", style={"color": COLORS["danger"]}),
+                no_update, no_update, no_update, no_update, no_update)
+
+
+# ── Simulation de crédit (onglet Immobilier) ──────────────────────────────────
+@callback(
+    Output("loan-monthly-display",   "children"),
+    Output("loan-interest-display",  "children"),
+    Output("loan-insurance-display", "children"),
+    Output("graph-amortization",     "figure"),
+    Output("graph-loan-grid",        "figure"),
+    Input("loan-principal", "value"),
+    Input("loan-rate",      "value"),
+    Input("loan-years",     "value"),
+    Input("loan-insurance", "value"),
+)
+@instrument
+@memoize
+def update_loan_tab(principal, rate_pct, years, insurance_pct):
+    # Saisie incomplète ou hors bornes : on garde l'affichage précédent
+    if not principal or principal <= 0 or not years or not 1 <= years <= 40:
+        return ("—",) * 3 + (no_update, no_update)
+    rate_pct      = max(float(rate_pct or 0), 0.0)
+    insurance_pct = max(float(insurance_pct or 0), 0.0)
+    years         = int(years)
+
+    totals = loan_totals(principal, rate_pct / 100, years * 12, insurance_pct / 100)
+    monthly = f"{float(totals['monthly_payment']):,.0f} €"
+    if insurance_pct:
+        monthly += f" + {float(totals['monthly_insurance']):,.0f} €"
+    return (
+        monthly,
+        f"{float(totals['total_interest']):,.0f} €",
+        f"{float(totals['total_insurance']):,.0f} €",
+        build_amortization_figure(principal, rate_pct, years, insurance_pct),
+        build_loan_grid_figure(principal, rate_pct, years, insurance_pct),
+    )
+
+
+# ── Rachat de crédit ──────────────────────────────────────────────────────────
+@callback(
+    Output("refi-best-display",   "children"),
+    Output("graph-refi-frontier", "figure"),
+    Input("loan-principal", "value"),
+    Input("loan-rate",      "value"),
+    Input("loan-years",     "value"),
+    Input("loan-elapsed",   "value"),
+    Input("refi-rate",      "value"),
+    Input("refi-fees",      "value"),
+)
+@instrument
+@memoize
+def update_refinancing(principal, rate_pct, years, elapsed, offer_pct, fees):
+    if not principal or principal <= 0 or not years or not 1 <= years <= 40:
+        return "—", build_refinancing_figure(None)
+    months  = int(years) * 12
+    elapsed = int(min(max(elapsed or 0, 0), months))
+    fees    = max(float(fees or 0), 0.0)
+    rate    = max(float(rate_pct or 0), 0.0) / 100
+    current = float(loan_totals(principal, rate, months)["monthly_payment"])
+
+    result = optimize_refinancing(
+        principal, rate, months, elapsed,
+        max_payment=current + 0.01,
+        min_rate=max(float(offer_pct or 0), 0.0) / 100, min_fees=fees,
+    )
+    best = result["best"]
+    scanned = f"{result['evaluated']:,} / {result['combinations']:,} combinaisons évaluées"
+    if best is None:
+        text = [html.Span("Aucun rachat rentable avec cette offre. ",
+                          style={"color": COLORS["text_primary"]}), scanned]
+    else:
+        recovered = (f"récupéré en {best['breakeven_months']} mois"
+                     if best["breakeven_months"] else "jamais récupéré en trésorerie")
+        text = [
+            html.Span(
+                f"Rachat dans {best['switch_month']} mois à {best['rate']:.2%} "
+                f"sur {best['months'] // 12} ans : gain actualisé {best['gain']:,.0f} €",
+                style={"color": COLORS["success"]},
+            ),
+            html.Br(),
+            f"Mensualité {best['payment']:,.0f} € (actuelle {current:,.0f} €) · "
+            f"frais + IRA {best['fees'] + best['penalty']:,.0f} € {recovered} · {scanned}",
+        ]
+    return text, build_refinancing_figure(result, fees)
+
+
+# ── Parc immobilier ───────────────────────────────────────────────────────────
+@callback(
+    Output("table-properties", "data", allow_duplicate=True),
+    Output("table-zones",      "data", allow_duplicate=True),
+    Output("table-rentals",    "data", allow_duplicate=True),
+    Input("app-property-store", "data"),
+    prevent_initial_call="initial_duplicate",
+)
+@instrument
+def restore_properties(saved):
+    if not saved:
+        return no_update, no_update, no_update
+    return (saved.get("properties", []), saved.get("zones") or no_update,
+            saved.get("rentals", []))
+
+
+@callback(
+    Output("table-properties", "data", allow_duplicate=True),
+    Input("btn-add-property",  "n_clicks"),
+    State("table-properties",  "data"),
+    State("table-zones",       "data"),
+    prevent_initial_call=True,
+)
+@instrument
+def add_property_row(n_clicks, rows, zone_rows):
+    if not n_clicks:
+        return no_update
+    rows = list(rows or [])
+    zone = next(iter(parse_zones(zone_rows)), "")
+    rows.append({"Bien": f"Bien {len(rows) + 1}", "Zone": zone, "Valeur": None,
+                 "Capital": None, "Taux": None, "Durée": None, "Début": CURRENT_YEAR})
+    return rows
+
+
+@callback(
+    Output("table-properties", "dropdown"),
+    Input("table-zones", "data"),
+)
+def update_zone_options(zone_rows):
+    return {"Zone": {"options": [{"label": z, "value": z} for z in parse_zones(zone_rows)]}}
+
+
+@callback(
+    Output("property-value-display",    "children"),
+    Output("property-debt-display",     "children"),
+    Output("property-equity-display",   "children"),
+    Output("graph-property-projection", "figure"),
+    Input("table-properties",        "data"),
+    Input("table-zones",             "data"),
+    Input("slider-property-horizon", "value"),
+)
+@instrument
+@memoize
+def update_property_tab(rows, zone_rows, horizon):
+    # Seuls les biens modifiés (ou dont la zone a changé) sont recalculés
+    projection = PORTFOLIO.update(rows, parse_zones(zone_rows))
+    horizon = int(horizon or 20)
+    if not projection["properties"]:
+        return "—", "—", "—", build_property_figure(None, horizon)
+
+    # Année courante : la valeur est la même dans tous les scénarios
+    value = float(projection["value"][:, 0, 0].sum())
+    debt  = float(projection["balance"][:, 0].sum())
+    return (
+        f"{value:,.0f} €",
+        f"{debt:,.0f} €",
+        f"{value - debt:,.0f} €",
+        build_property_figure(projection, horizon),
+    )
+
+
+# ── Revenus locatifs & fiscalité ──────────────────────────────────────────────
+@callback(
+    Output("table-rentals", "data", allow_duplicate=True),
+    Input("btn-add-rental",   "n_clicks"),
+    State("table-rentals",    "data"),
+    State("table-properties", "data"),
+    prevent_initial_call=True,
+)
+@instrument
+def add_rental_row(n_clicks, rows, property_rows):
+    if not n_clicks:
+        return no_update
+    rows = list(rows or [])
+    rented = {r.get("Bien") for r in rows}
+    name = next((p.get("Bien") for p in property_rows or []
+                 if p.get("Bien") and p.get("Bien") not in rented), "")
+    rows.append({"Bien": name, "Loyer": None, "Charges": None, "Occupation": 100,
+                 "Prix": None, "Achat": CURRENT_YEAR})
+    return rows
+
+
+@callback(
+    Output("table-rentals", "dropdown"),
+    Input("table-properties", "data"),
+)
+def update_rental_options(property_rows):
+    names = [p["Bien"] for p in property_rows or [] if p.get("Bien")]
+    return {"Bien": {"options": [{"label": n, "value": n} for n in names]}}
+
+
+@callback(
+    Output("rental-tmi-display",   "children"),
+    Output("table-rental-yields",  "data"),
+    Output("graph-rental-tax",     "figure"),
+    Output("graph-capital-gains",  "figure"),
+    Input("table-rentals",    "data"),
+    Input("table-properties", "data"),
+    Input("table-zones",      "data"),
+    Input("rental-income",    "value"),
+    Input("rental-parts",     "value"),
+)
+@instrument
+@memoize
+def update_rental_tab(rental_rows, property_rows, zone_rows, income, parts):
+    tmi = float(marginal_rate(income or 0, parts or 1))
+    projection = PORTFOLIO.update(property_rows, parse_zones(zone_rows))
+    result = evaluate_rentals(rental_rows, projection, tmi)
+    tmi_display = f"TMI {tmi:.0%}"
+    if result is None:
+        return tmi_display, [], build_rental_tax_figure(None), build_capital_gains_figure(None)
+
+    def _pct(x):
+        return "—" if x != x else f"{x:.2%}"   # NaN : prix d'achat inconnu
+
+    yields = [
+        {"Bien": n, "Brut": _pct(g), "Net": _pct(net), "Net-net": _pct(nn)}
+        for n, g, net, nn in zip(result["names"], result["gross_yield"],
+                                 result["net_yield"], result["net_net_yield"])
+    ]
+    regime = result["best_regime"][0]
+    return (
+        f"TMI {tmi:.0%} · régime conseillé cette année : {regime}",
+        yields,
+        build_rental_tax_figure(result),
+        build_capital_gains_figure(result),
+    )
+
+
+# ── Portefeuille boursier (onglet Investissement) ─────────────────────────────
+@callback(
+    Output("table-transactions", "data", allow_duplicate=True),
+    Output("table-quotes",       "data", allow_duplicate=True),
+    Output("table-allocation-targets", "data", allow_duplicate=True),
+    Input("app-investment-store", "data"),
+    prevent_initial_call="initial_duplicate",
+)
+@instrument
+def restore_investments(saved):
+    if not saved:
+        return no_update, no_update, no_update
+    return (saved.get("transactions", []), saved.get("quotes", []),
+            saved.get("targets") or no_update)
+
+
+@callback(
+    Output("table-transactions", "data", allow_duplicate=True),
+    Input("btn-add-transaction", "n_clicks"),
+    State("table-transactions",  "data"),
+    prevent_initial_call=True,
+)
+@instrument
+def add_transaction_row(n_clicks, rows):
+    if not n_clicks:
+        return no_update
+    rows = list(rows or [])
+    last = rows[-1] if rows else {}
+    rows.append({"Date": datetime.now().strftime("%d/%m/%Y"),
+                 "Compte": last.get("Compte", "PEA"), "Ticker": last.get("Ticker", ""),
+                 "Type": "Achat", "Quantité": None, "Prix": None, "Frais": 0})
+    return rows
+
+
+@callback(
+    Output("table-quotes", "data", allow_duplicate=True),
+    Input("table-transactions", "data"),
+    State("table-quotes",       "data"),
+    prevent_initial_call="initial_duplicate",
+)
+def update_quote_rows(rows, quote_rows):
+    # Une ligne par ticker détenu ou échangé, cours et classification conservés
+    previous = {q.get("Ticker"): q for q in quote_rows or []}
+    tickers = sorted({str(r.get("Ticker") or "").strip().upper()
+                      for r in rows or []} - {""})
+    new = [previous.get(t) or {"Ticker": t, "Cours": None, "Classe": None,
+                               "Secteur": None, "Zone": None}
+           for t in tickers]
+    return no_update if new == (quote_rows or []) else new
+
+
+@callback(
+    Output("prices-import-feedback", "children"),
+    Output("prices-version",         "data"),
+    Input("upload-prices", "contents"),
+    State("upload-prices", "filename"),
+)
+@instrument
+def import_prices(contents, filenames):
+    if not contents:
+        tickers = PRICES.tickers()
+        text = (f"Historique local : {', '.join(tickers)}" if tickers
+                else "Aucun historique : valorisation au dernier prix de transaction")
+        return text, PRICES.signature()
+    lines = []
+    for content, name in zip(contents, filenames or [""] * len(contents)):
+        try:
+            raw = base64.b64decode(content.split(",", 1)[1]).decode("utf-8-sig")
+            imported = PRICES.import_csv(raw, name)
+        except Exception as e:
+            lines += [html.Span(f"✗ {name} : {e}", style={"color": COLORS["danger"]}), html.Br()]
+            continue
+        for ticker, n in imported.items():
+            lines += [html.Span(f"✓ {ticker} : {n:,} cotations",
+                                style={"color": COLORS["success"]}), html.Br()]
+    return lines, PRICES.signature()
+
+
+@callback(
+    Output("portfolio-value-display",     "children"),
+    Output("portfolio-invested-display",  "children"),
+    Output("portfolio-gain-display",      "children"),
+    Output("portfolio-twr-display",       "children"),
+    Output("portfolio-mwr-display",       "children"),
+    Output("table-portfolio-performance", "data"),
+    Output("graph-portfolio",             "figure"),
+    Input("table-transactions", "data"),
+    Input("table-quotes",       "data"),
+    Input("prices-version",     "data"),
+)
+@instrument
+def update_portfolio_tab(rows, quote_rows, prices_version):
+    # Valorisation au jour : la date fait partie de la clé de mémoïsation
+    return _portfolio_outputs(rows, quote_rows, prices_version, date.today().isoformat())
+
+
+@memoize
+def _portfolio_outputs(rows, quote_rows, prices_version, valuation_date):
+    # Instantané propre à cette requête ; relu seulement si les transactions
+    # ont changé : modifier un cours ne relit pas les transactions
+    snapshot = STORE.load(rows)
+    # Cours saisis prioritaires, sinon dernière cotation de l'historique local
+    quotes = {**PRICES.latest(snapshot.tickers), **parse_quotes(quote_rows)}
+    perf = snapshot.performance(quotes, date.fromisoformat(valuation_date),
+                                price_history=PRICES.matrix, history_key=PRICES.signature())
+    if perf is None:
+        return ("—",) * 5 + ([], build_portfolio_figure(None))
+
+    def _pct(x):
+        return "—" if x != x else f"{x:+.2%}"   # NaN : pas de flux de signe opposé
+
+    table = [
+        {"Série": s, "Valeur": f"{v:,.0f} €", "Investi": f"{i:,.0f} €",
+         "Dividendes": f"{d:,.0f} €", "TWR": _pct(t), "MWR": _pct(m)}
+        for s, v, i, d, t, m in zip(perf["series"], perf["value"], perf["invested"],
+                                    perf["dividends"], perf["twr"], perf["mwr"])
+    ]
+    gain = float(snapshot.positions(quotes)["gain"].sum())
+    return (
+        f"{float(perf['value'][-1]):,.0f} €",
+        f"{float(perf['invested'][-1]):,.0f} €",
+        f"{gain:+,.0f} €",
+        _pct(float(perf["twr"][-1])),
+        _pct(float(perf["mwr"][-1])),
+        table,
+        build_portfolio_figure(perf),
+    )
+
+
+# ── Allocation d'actifs ───────────────────────────────────────────────────────
+@callback(
+    Output("table-allocation-targets", "data", allow_duplicate=True),
+    Input("btn-add-target", "n_clicks"),
+    State("table-allocation-targets", "data"),
+    prevent_initial_call=True,
+)
+@instrument
+def add_target_row(n_clicks, rows):
+    if not n_clicks:
+        return no_update
+    rows = list(rows or [])
+    used = {r.get("Classe") for r in rows}
+    rows.append({"Classe": next((c for c in ASSET_CLASSES if c not in used), None),
+                 "Cible": 0})
+    return rows
+
+
+@callback(
+    Output("allocation-rollups", "data"),
+    Output("table-rebalancing",  "data"),
+    Input("table-transactions",       "data"),
+    Input("table-quotes",             "data"),
+    Input("table-allocation-targets", "data"),
+    Input("allocation-cash",          "value"),
+    Input("prices-version",           "data"),
+)
+@instrument
+@memoize
+def update_allocation_tab(rows, quote_rows, target_rows, cash, prices_version):
+    snapshot = STORE.load(rows)
+    quotes = {**PRICES.latest(snapshot.tickers), **parse_quotes(quote_rows)}
+    positions = snapshot.positions(quotes)
+    meta = {str(q.get("Ticker")): q for q in quote_rows or []}
+    # Seules les lignes dont la valeur ou la classification a changé sont
+    # reportées ; les totaux de toutes les dimensions sont relus sous le même verrou
+    rollups = ALLOCATION.refresh(positions["account"], positions["ticker"],
+                                 positions["value"], meta)
+
+    by_class = rollups[next(iter(ALLOCATION_DIMENSIONS))]
+    targets = {}
+    for r in target_rows or []:
+        try:
+            targets[str(r["Classe"])] = float(r["Cible"])
+        except (KeyError, TypeError, ValueError):
+            continue
+    plan = rebalancing(by_class, targets, max(float(cash or 0), 0.0))
+    table = [
+        {"Classe": g, "Actuel": f"{s:.1%}", "Cible": f"{t:.1%}",
+         "Ordre": f"{trade:+,.0f} €", "Apport seul": f"{add:,.0f} €"}
+        for g, s, t, trade, add in zip(plan["groups"], plan["shares"], plan["targets"],
+                                       plan["trades"], plan["cash_only"])
+    ]
+    return rollups, table
+
+
+@callback(
+    Output("graph-allocation", "figure"),
+    Input("allocation-rollups",   "data"),
+    Input("allocation-dimension", "value"),
+)
+@instrument
+def update_allocation_figure(rollups, dimension):
+    # Changement de dimension : simple lecture des totaux déjà publiés
+    rollups = rollups or {}
+    if dimension not in rollups:
+        dimension = next(iter(ALLOCATION_DIMENSIONS))
+    return build_allocation_figure(rollups.get(dimension))
+
+
+# ── Fiscalité des plus-values mobilières ─────────────────────────────────────
+@callback(
+    Output("tax-tmi-display",  "children"),
+    Output("table-tax-years",  "data"),
+    Output("table-tax-lots",   "data"),
+    Input("table-transactions", "data"),
+    Input("tax-income",         "value"),
+    Input("tax-parts",          "value"),
+)
+@instrument
+def update_tax_tab(rows, income, parts):
+    # Durées de détention au jour : la date fait partie de la clé de mémoïsation
+    return _tax_outputs(rows, income, parts, date.today().isoformat())
+
+
+@memoize
+def _tax_outputs(rows, income, parts, today):
+    tmi = float(marginal_rate(income or 0, parts or 1))
+    snapshot = STORE.load(rows)
+    # Seules les positions dont une transaction a changé sont rejouées
+    ledger, _ = LEDGER.update(snapshot)
+    today = np.datetime64(today, "D")
+    lots = [
+        {"Compte": account, "Ticker": ticker, "Quantité": f"{q:g}",
+         "PRU": f"{pos['pru']:,.2f} €", "Achat": str(day),
+         "Détention": f"{(today - day).astype(int) / 365.25:.1f} ans"}
+        for (account, ticker), pos in ledger.items() for day, q in pos["lots"]
+    ]
+    result = yearly_tax(ledger, tmi)
+    if result is None:
+        return f"TMI {tmi:.0%}", [], lots
+
+    def _eur(x):
+        return f"{x:,.0f} €"
+
+    years = [
+        {"Année": int(y), "Plus-values nettes": _eur(g), "Dividendes": _eur(d),
+         "PFU": _eur(p), "Barème": _eur(b), "Régime conseillé": best if p > 0 else "—"}
+        for y, g, d, p, b, best in zip(result["years"], result["net_gains"],
+                                       result["dividends"], result["pfu"],
+                                       result["bareme"], result["best"])
+    ][::-1]
+    carried = (f" · moins-values reportables {result['carried_loss']:,.0f} €"
+               if result["carried_loss"] else "")
+    return f"TMI {tmi:.0%}{carried}", years, lots
+
+
+# ── Simulation d'investissement (DCA) ─────────────────────────────────────────
+@callback(
+    Output("dca-source", "options"),
+    Input("prices-version", "data"),
+)
+def update_dca_sources(prices_version):
+    return [{"label": "Hypothèse saisie", "value": ""}] + [
+        {"label": f"Historique {t}", "value": t} for t in PRICES.tickers()
+    ]
+
+
+@callback(
+    Output("dca-final-display",     "children"),
+    Output("dca-lump-display",      "children"),
+    Output("dca-lump-wins-display", "children"),
+    Output("graph-dca-bands",       "figure"),
+    Output("graph-dca-heatmap",     "figure"),
+    Input("dca-monthly",    "value"),
+    Input("dca-initial",    "value"),
+    Input("dca-return",     "value"),
+    Input("dca-volatility", "value"),
+    Input("dca-horizon",    "value"),
+    Input("dca-source",     "value"),
+    Input("prices-version", "data"),
+)
+@instrument
+@memoize
+def update_dca_tab(monthly, initial, return_pct, vol_pct, horizon, source, prices_version):
+    monthly, initial = max(float(monthly or 0), 0.0), max(float(initial or 0), 0.0)
+    if not monthly and not initial:
+        return ("—",) * 3 + (build_dca_bands_figure(None), build_dca_heatmap_figure(None))
+    horizon = int(min(max(horizon or 20, 1), DCA_MAX_HORIZON))
+    return_pct = float(return_pct or 0)
+    months = horizon * 12
+
+    history = monthly_returns(*PRICES.range(source)) if source else None
+    if history is not None and history.size >= 12:
+        returns = bootstrap_paths(history, months)
+    else:
+        returns = lognormal_paths(return_pct / 100, max(float(vol_pct or 0), 0.0) / 100, months)
+    paths = simulate_paths(returns, monthly, initial)
+
+    start, stop, step = DCA_RETURN_RANGE
+    grid = simulate_grid([monthly], np.arange(start, stop + step / 2, step) / 100,
+                         np.arange(1, DCA_MAX_HORIZON + 1), initial)
+    mid = len(paths["percentiles"]) // 2
+    return (
+        f"{paths['dca'][mid, -1]:,.0f} €",
+        f"{paths['lump'][mid, -1]:,.0f} €",
+        f"{paths['lump_wins']:.0%} des cas",
+        build_dca_bands_figure(paths),
+        build_dca_heatmap_figure(grid, return_pct, horizon),
+    )
+
+
+# ── Analyse du risque ─────────────────────────────────────────────────────────
+@callback(
+    Output("risk-vol-display",       "children"),
+    Output("risk-var-display",       "children"),
+    Output("risk-period-display",    "children"),
+    Output("table-risk",             "data"),
+    Output("graph-risk-correlation", "figure"),
+    Input("table-transactions", "data"),
+    Input("table-quotes",       "data"),
+    Input("prices-version",     "data"),
+    Input("risk-horizon",       "value"),
+)
+@instrument
+@memoize
+def update_risk_tab(rows, quote_rows, prices_version, horizon):
+    snapshot = STORE.load(rows)
+    quotes = {**PRICES.latest(snapshot.tickers), **parse_quotes(quote_rows)}
+    positions = snapshot.positions(quotes)
+    holdings: dict[str, float] = {}
+    for ticker, value in zip(positions["ticker"], positions["value"]):
+        holdings[ticker] = holdings.get(ticker, 0.0) + float(value)
+
+    # Seules les cotations postérieures au dernier appel sont relues
+    stats = RISK.update(sorted(holdings))
+    if stats is None or stats["n"] < 2:
+        return "—", "—", "Aucun historique", [], build_correlation_figure(None)
+    report = risk_report(stats, holdings, RISK_LEVELS, max(int(horizon or 1), 1))
+
+    table = []
+    for key, name in (("historical", "Historique"), ("parametric", "Paramétrique"),
+                      ("monte_carlo", "Monte Carlo")):
+        var, cvar = report[key]
+        row = {"Méthode": name}
+        for a, v, cv in zip(RISK_LEVELS, var, cvar):
+            row[f"VaR {a:.0%}"], row[f"CVaR {a:.0%}"] = f"{v:,.0f} €", f"{cv:,.0f} €"
+        table.append(row)
+    start, end = (str(d.astype("datetime64[Y]")) for d in (stats["start"], stats["end"]))
+    missing = len(holdings) - len(stats["tickers"])
+    return (
+        f"{report['portfolio_volatility']:.1%}",
+        f"{report['historical'][0][0]:,.0f} €",
+        f"{start}–{end}" + (f" · {missing} ligne(s) sans historique" if missing else ""),
+        table,
+        build_correlation_figure(report),
+    )
+
+
+# ── Scénarios de stress ───────────────────────────────────────────────────────
+@callback(
+    Output("stress-worst-display", "children"),
+    Output("stress-loss-display",  "children"),
+    Output("table-stress",         "data"),
+    Output("graph-stress",         "figure"),
+    Input("table-transactions", "data"),
+    Input("table-quotes",       "data"),
+    Input("prices-version",     "data"),
+    *[Input(f"stress-{f.lower()}", "value") for f in STRESS_FACTORS],
+)
+@instrument
+@memoize
+def update_stress_tab(rows, quote_rows, prices_version, equity, rates, inflation):
+    # Lignes tirées de l'instantané propre à cette requête, jamais de l'état partagé
+    snapshot = STORE.load(rows)
+    quotes = {**PRICES.latest(snapshot.tickers), **parse_quotes(quote_rows)}
+    positions = snapshot.positions(quotes)
+    holdings: dict[str, float] = {}
+    for ticker, value in zip(positions["ticker"], positions["value"]):
+        holdings[ticker] = holdings.get(ticker, 0.0) + float(value)
+    classes = {str(q.get("Ticker")): q.get("Classe") for q in quote_rows or []}
+
+    custom = {"name": "Scénario personnalisé", "kind": HYPOTHETICAL,
+              "moves": (float(equity or 0) / 100, float(rates or 0) / 100,
+                        float(inflation or 0) / 100)}
+    # Seuls les scénarios absents du cache (nouveau portefeuille, choc modifié) sont évalués
+    results, _ = STRESS.run(holdings, classes, scenario_library() + [custom])
+    held = sum(1 for v in holdings.values() if v)
+    table = [
+        {"Scénario": r["name"], "Type": r["kind"], "Impact": f"{r['pnl']:+,.0f} €",
+         "Impact (%)": f"{r['share']:+.1%}", "Valeur après": f"{r['after']:,.0f} €",
+         "Ligne la plus touchée": f"{r['worst']} ({r['worst_pnl']:+,.0f} €)",
+         "Rejeu": f"{r['replayed']}/{held}" if r["kind"] != HYPOTHETICAL else "—"}
+        for r in results
+    ]
+    worst = min(results, key=lambda r: r["pnl"])
+    if worst["pnl"] >= 0:
+        return "—", "—", table, build_stress_figure(results)
+    return (worst["name"], f"{worst['pnl']:,.0f} € ({worst['share']:.1%})",
+            table, build_stress_figure(results))
+
+
+# ── Cumul patrimoine total (bandeau) ──────────────────────────────────────────
+@callback(
+    Output("networth-display", "children"),
+    Output("graph-total",      "figure"),
+    Input("budget-store",       "data"),
+    Input("slider-growth",      "value"),
+    Input("slider-horizon",     "value"),
+    Input("table-properties",   "data"),
+    Input("table-zones",        "data"),
+    Input("table-transactions", "data"),
+    Input("table-quotes",       "data"),
+    Input("prices-version",     "data"),
+)
+@instrument
+@memoize
+def update_networth(budget, growth_pct, horizon, property_rows, zone_rows,
+                    rows, quote_rows, prices_version):
+    years = NETWORTH.years
+    # Chaque module ne publie qu'une empreinte de ses entrées : seules les
+    # séries dont l'empreinte n'est pas encore en cache sont calculées, et le
+    # cumul n'assemble que les séries de cette requête
+    monthly_savings = sum(float(v or 0) for v in ((budget or _DEFAULT_BUDGET)
+                                                  .get("Épargne") or {}).values())
+    growth = float(growth_pct or 0)
+
+    def _property():
+        projection = PORTFOLIO.update(property_rows, parse_zones(zone_rows))
+        scenarios = projection["scenarios"]
+        central = scenarios.index("Central") if "Central" in scenarios else len(scenarios) // 2
+        return property_series(portfolio_totals(projection), central)
+
+    portfolio = STORE.load(rows)
+    quotes = {**PRICES.latest(portfolio.tickers), **parse_quotes(quote_rows)}
+    snapshot = NETWORTH.snapshot({
+        "Épargne": (
+            canonical_key("networth/savings", (monthly_savings, growth)),
+            lambda: (years, savings_series(years, monthly_savings, growth)),
+        ),
+        "Immobilier": (
+            canonical_key("networth/property", (property_rows, zone_rows)), _property,
+        ),
+        "Investissements": (
+            canonical_key("networth/investments", (portfolio.version, quotes)),
+            lambda: (years, flat_series(years, portfolio.positions(quotes)["value"].sum())),
+        ),
+    })
+    horizon = min(int(horizon or 20), len(years) - 1)
+    if not np.any(snapshot["series"]):
+        return "", build_total_figure()
+    now, later = snapshot["total"][0], snapshot["total"][horizon]
+    return (f"{now:,.0f} € aujourd'hui · {later:,.0f} € en {years[horizon]}",
+            build_total_figure(snapshot, horizon))
@@ -4,6 +4,7 @@ config.py
 Constantes globales : palette, données INSEE, styles CSS partagés.
 """
 
+import os
 from datetime import datetime
 
 # ─── Données salaires France · INSEE 2021 ─────────────────────────────────────
@@ -29,6 +30,37 @@ PROPORTIONS = {
 
 CURRENT_YEAR = datetime.now().year
 
+# ─── Cache des callbacks (memo.py) ────────────────────────────────────────────
+# CACHE_DIR active le tier disque partagé entre workers (désactivé si vide).
+CACHE_VERSION          = "1"
+CACHE_MAX_ENTRIES      = int(os.environ.get("PATRIMOINE_CACHE_SIZE", "256"))
+CACHE_DISK_MAX_ENTRIES = int(os.environ.get("PATRIMOINE_CACHE_DISK_SIZE", "4096"))
+CACHE_DIR              = os.environ.get("PATRIMOINE_CACHE_DIR") or None
+
+# ─── Encodage des figures (figure_encoding.py) ────────────────────────────────
+# Nombre maximal de points transmis par courbe (≈ largeur rendue en pixels).
+FIGURE_MAX_POINTS = 480
+
+# ─── Compression HTTP (http_cache.py) ─────────────────────────────────────────
+COMPRESS_MIN_BYTES      = 1_024
+COMPRESS_GZIP_LEVEL     = 6
+COMPRESS_BROTLI_QUALITY = 5
+
+# ─── Callbacks en arrière-plan (jobs.py) ──────────────────────────────────────
+BACKGROUND_ENABLED     = os.environ.get("PATRIMOINE_BACKGROUND", "") not in ("", "0", "false")
+BACKGROUND_CACHE_DIR   = os.environ.get("PATRIMOINE_BACKGROUND_DIR") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".jobs",
+)
+BACKGROUND_INTERVAL_MS = 250
+
+# ─── Historique de cours (prices.py) ──────────────────────────────────────────
+PRICES_DIR = os.environ.get("PATRIMOINE_PRICES_DIR") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "prices",
+)
+
+# ─── Instrumentation (metrics.py) ─────────────────────────────────────────────
+METRICS_ENABLED = os.environ.get("PATRIMOINE_METRICS", "") not in ("", "0", "false")
+
 # ─── Palette ──────────────────────────────────────────────────────────────────
 COLORS = {
     "bg_app":        "#080c14",
@@ -54,20 +86,262 @@ COLORS = {
 # ─── Tableau salarial ──────────────────────────────────────────────────────────
 N_ROWS = 8
 
+# Montant saisi brut ou net : les lignes brutes sont converties en net (payroll.py)
+SALARY_BASES = ["Net", "Brut"]
+
 INITIAL_DATA = [
-    {"Salaire": 37_000, "Date de début": "01/01/2023", "Date de fin": "31/12/2023"},
-    {"Salaire": 39_000, "Date de début": "01/01/2024", "Date de fin": "31/12/2024"},
-    {"Salaire": 41_000, "Date de début": "01/01/2025", "Date de fin": "31/12/2025"},
+    {"Salaire": 37_000, "Base": "Net", "Date de début": "01/01/2023", "Date de fin": "31/12/2023"},
+    {"Salaire": 39_000, "Base": "Net", "Date de début": "01/01/2024", "Date de fin": "31/12/2024"},
+    {"Salaire": 41_000, "Base": "Net", "Date de début": "01/01/2025", "Date de fin": "31/12/2025"},
 ]
 while len(INITIAL_DATA) < N_ROWS:
     INITIAL_DATA.append({"Salaire": None, "Date de début": None, "Date de fin": None})
 
 TABLE_COLS = [
     {"name": "Salaire (€)",   "id": "Salaire",       "editable": True, "type": "numeric"},
+    {"name": "Montant",       "id": "Base",          "editable": True, "presentation": "dropdown"},
     {"name": "Date de début", "id": "Date de début",  "editable": True},
     {"name": "Date de fin",   "id": "Date de fin",    "editable": True},
 ]
 
+# Plages des sliders de projection (min, max, pas) — grille de sensitivity.py
+SALARY_GROWTH_RANGE     = (-5.0, 15.0, 0.5)   # taux annuel projeté (%)
+SALARY_HORIZON_RANGE    = (1, 40, 1)          # horizon (années)
+SALARY_CONFIDENCE_RANGE = (0, 30, 1)          # intervalle de confiance (%/an)
+
+# ─── Déflateurs (deflators.py) ────────────────────────────────────────────────
+# Salaire net annuel moyen INSEE (tc08.csv, colonne MOYENNE, ensemble des salariés)
+WAGE_INDEX_PATH       = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tc08.csv")
+WAGE_INDEX_COLUMN     = "MOYENNE"
+WAGE_INDEX_POPULATION = "E"
+WAGE_TREND_YEARS      = 10      # tendance prolongeant le salaire moyen après la dernière année publiée
+DEFLATOR_INFLATION    = 2.0     # inflation annuelle supposée pour les euros constants (%)
+DEFLATOR_VIEWS = {
+    "nominal":  "Euros courants",
+    "constant": f"Euros constants {CURRENT_YEAR}",
+    "wage":     "Multiple du salaire moyen",
+}
+
+# Classement dans la distribution INSEE de chaque année (percentiles.py)
+PERCENTILE_POPULATIONS = {"E": "Ensemble", "H": "Hommes", "F": "Femmes"}
+
+# ─── Sensibilité de la projection (sensitivity.py) ────────────────────────────
+SENSITIVITY_GROWTH_SWING  = 2.0    # ± points de taux autour du réglage (tornado)
+SENSITIVITY_HORIZON_SWING = 5      # ± années autour du réglage (tornado)
+SENSITIVITY_CACHE_ENTRIES = 16     # historiques salariaux dont la grille est gardée
+
+# ─── Mode multi-scénarios (scenarios.py) ──────────────────────────────────────
+SCENARIO_CACHE_ENTRIES = 256                 # résultats de scénarios gardés en cache
+SCENARIO_DEFAULT_MONTHLY_SALARY = 2_800.0    # salaire mensuel sans historique ni saisie
+
+# ─── Parc immobilier (properties.py) ──────────────────────────────────────────
+# Revalorisation annuelle centrale par zone (%/an), modifiable dans l'onglet.
+PROPERTY_ZONES = {
+    "Paris":              2.0,
+    "Grandes métropoles": 1.5,
+    "Villes moyennes":    1.0,
+    "Zone rurale":        0.5,
+}
+
+# Scénarios : écart (en points de %/an) appliqué au taux de chaque zone
+PROPERTY_SCENARIOS = {
+    "Pessimiste": -1.5,
+    "Central":     0.0,
+    "Optimiste":   1.5,
+}
+
+PROPERTY_MAX_HORIZON = 40
+PROPERTY_CACHE_ROWS  = 256  # tranches de biens gardées (toutes sessions, par contenu)
+NETWORTH_CACHE_ROWS  = 64   # séries de modules gardées (toutes sessions, par empreinte)
+
+INITIAL_PROPERTIES = [
+    {"Bien": "Résidence principale", "Zone": "Grandes métropoles", "Valeur": 280_000,
+     "Capital": 220_000, "Taux": 3.5, "Durée": 25, "Début": CURRENT_YEAR - 2},
+]
+
+PROPERTY_COLS = [
+    {"name": "Bien",               "id": "Bien",    "editable": True},
+    {"name": "Zone",               "id": "Zone",    "editable": True, "presentation": "dropdown"},
+    {"name": "Valeur estimée (€)", "id": "Valeur",  "editable": True, "type": "numeric"},
+    {"name": "Capital emprunté",   "id": "Capital", "editable": True, "type": "numeric"},
+    {"name": "Taux (%)",           "id": "Taux",    "editable": True, "type": "numeric"},
+    {"name": "Durée (ans)",        "id": "Durée",   "editable": True, "type": "numeric"},
+    {"name": "Année du prêt",      "id": "Début",   "editable": True, "type": "numeric"},
+]
+
+# Rachat de crédit (refinancing.py) : grilles (début, fin, pas)
+REFI_DISCOUNT_RATE = 2.0                # actualisation des flux (%/an)
+REFI_RATE_RANGE    = (0.5, 7.0, 0.05)   # nouveau taux (%)
+REFI_YEARS         = (5, 30)            # nouvelle durée (années, pas de 1)
+REFI_FEES          = (0, 6_000, 500)    # frais de dossier, courtage, garantie (€)
+REFI_SWITCH_MONTHS = (0, 60, 3)         # date du rachat (mois à partir d'aujourd'hui)
+
+RENTAL_COLS = [
+    {"name": "Bien",              "id": "Bien",       "editable": True, "presentation": "dropdown"},
+    {"name": "Loyer mensuel (€)", "id": "Loyer",      "editable": True, "type": "numeric"},
+    {"name": "Charges / an (€)",  "id": "Charges",    "editable": True, "type": "numeric"},
+    {"name": "Occupation (%)",    "id": "Occupation", "editable": True, "type": "numeric"},
+    {"name": "Prix d'achat (€)",  "id": "Prix",       "editable": True, "type": "numeric"},
+    {"name": "Année d'achat",     "id": "Achat",      "editable": True, "type": "numeric"},
+]
+
+ZONE_COLS = [
+    {"name": "Zone",                  "id": "Zone", "editable": True},
+    {"name": "Revalorisation (%/an)", "id": "Taux", "editable": True, "type": "numeric"},
+]
+
+# ─── Portefeuille boursier (portfolio.py) ─────────────────────────────────────
+INVEST_ACCOUNTS   = ["PEA", "CTO", "Assurance-vie"]
+TRANSACTION_TYPES = ["Achat", "Vente", "Dividende"]
+PORTFOLIO_CACHE_SNAPSHOTS     = 32   # jeux de transactions gardés en mémoire
+PORTFOLIO_PERFORMANCE_ENTRIES = 16   # performances gardées par jeu (cours, date de valorisation)
+
+INITIAL_TRANSACTIONS = [
+    {"Date": f"15/01/{CURRENT_YEAR - 3}", "Compte": "PEA", "Ticker": "CW8", "Type": "Achat",
+     "Quantité": 10, "Prix": 380.0, "Frais": 2.0},
+    {"Date": f"15/01/{CURRENT_YEAR - 1}", "Compte": "PEA", "Ticker": "CW8", "Type": "Achat",
+     "Quantité": 5, "Prix": 450.0, "Frais": 2.0},
+]
+
+# Dividende : Quantité = titres détenus, Prix = dividende par titre
+TRANSACTION_COLS = [
+    {"name": "Date",          "id": "Date",     "editable": True},
+    {"name": "Compte",        "id": "Compte",   "editable": True, "presentation": "dropdown"},
+    {"name": "Ticker",        "id": "Ticker",   "editable": True},
+    {"name": "Type",          "id": "Type",     "editable": True, "presentation": "dropdown"},
+    {"name": "Quantité",      "id": "Quantité", "editable": True, "type": "numeric"},
+    {"name": "Prix (€)",      "id": "Prix",     "editable": True, "type": "numeric"},
+    {"name": "Frais (€)",     "id": "Frais",    "editable": True, "type": "numeric"},
+]
+
+QUOTE_COLS = [
+    {"name": "Ticker",          "id": "Ticker",  "editable": False},
+    {"name": "Cours actuel (€)", "id": "Cours",   "editable": True, "type": "numeric"},
+    {"name": "Classe",          "id": "Classe",  "editable": True, "presentation": "dropdown"},
+    {"name": "Secteur",         "id": "Secteur", "editable": True},
+    {"name": "Zone",            "id": "Zone",    "editable": True, "presentation": "dropdown"},
+]
+
+# Allocation (allocation.py) : libellé de la dimension → colonne de classification
+ALLOCATION_DIMENSIONS = {
+    "Classe d'actifs":   "Classe",
+    "Secteur":           "Secteur",
+    "Zone géographique": "Zone",
+    "Compte":            "Compte",
+}
+ASSET_CLASSES = ["Actions", "Obligations", "Monétaire", "Immobilier coté",
+                 "Matières premières", "Crypto-actifs"]
+GEO_ZONES = ["Monde", "France", "Europe", "Amérique du Nord", "Asie-Pacifique", "Émergents"]
+
+INITIAL_ALLOCATION_TARGETS = [
+    {"Classe": "Actions",     "Cible": 70},
+    {"Classe": "Obligations", "Cible": 20},
+    {"Classe": "Monétaire",   "Cible": 10},
+]
+TARGET_COLS = [
+    {"name": "Classe",    "id": "Classe", "editable": True, "presentation": "dropdown"},
+    {"name": "Cible (%)", "id": "Cible",  "editable": True, "type": "numeric"},
+]
+
+# Simulation DCA / versement unique (dca.py)
+DCA_RETURN_RANGE  = (-2.0, 12.0, 0.25)   # rendement annuel de la heatmap (%)
+DCA_MAX_HORIZON   = 40                   # années
+DCA_PATHS         = 2_000                # trajectoires simulées
+DCA_BLOCK_MONTHS  = 12                   # longueur des blocs du bootstrap
+DCA_PERCENTILES   = (10, 50, 90)
+
+# Risque (risk.py)
+TRADING_DAYS   = 252                     # annualisation de la volatilité
+RISK_LEVELS    = (0.95, 0.99)            # niveaux de confiance de la VaR
+RISK_MC_PATHS  = 20_000                  # tirages Monte Carlo
+RISK_CACHE_TICKER_SETS = 16     # ensembles de tickers dont les moments sont gardés
+
+# Scénarios de stress (stress.py)
+# Facteurs : marché actions (variation), taux longs et inflation (variation en points)
+STRESS_FACTORS = ["Actions", "Taux", "Inflation"]
+# Sensibilité de chaque classe d'actifs aux facteurs (rendement par unité de choc)
+STRESS_EXPOSURES = {
+    "Actions":            (1.0, -2.0, -1.0),
+    "Obligations":        (0.0, -6.0, -1.0),   # duration ≈ 6 ans
+    "Monétaire":          (0.0,  0.0,  0.0),
+    "Immobilier coté":    (0.8, -8.0,  0.5),
+    "Matières premières": (0.3,  0.0,  3.0),
+    "Crypto-actifs":      (2.0, -5.0,  0.0),
+}
+STRESS_DEFAULT_CLASS = "Actions"           # lignes non classées
+STRESS_SCENARIOS = [
+    # (nom, chocs des facteurs)
+    ("Krach actions −30 %",      (-0.30, 0.00, 0.00)),
+    ("Hausse des taux +2 pts",   (-0.10, 0.02, 0.00)),
+    ("Choc d'inflation +4 pts",  (-0.15, 0.015, 0.04)),
+    ("Stagflation",              (-0.25, 0.03, 0.05)),
+]
+# Rejeux historiques : (nom, début, fin, chocs de repli pour les lignes sans historique)
+STRESS_HISTORY = [
+    ("Bulle internet 2000–2002",  "2000-03-24", "2002-10-09", (-0.49, -0.02, 0.00)),
+    ("Crise financière 2008",     "2007-10-09", "2009-03-09", (-0.55, -0.02, -0.01)),
+    ("Crise des dettes 2011",     "2011-05-02", "2011-09-22", (-0.25, -0.01, 0.00)),
+    ("Krach Covid 2020",          "2020-02-19", "2020-03-23", (-0.34, -0.01, 0.00)),
+    ("Hausse des taux 2022",      "2022-01-03", "2022-10-12", (-0.25, 0.03, 0.06)),
+]
+STRESS_CACHE_PORTFOLIOS = 8               # versions de portefeuille gardées en cache
+
+# ─── Fiscalité (rental.py) ────────────────────────────────────────────────────
+# Barème de l'impôt sur le revenu par part : (seuil bas, taux marginal)
+IR_BRACKETS = [
+    (0,       0.00),
+    (11_497,  0.11),
+    (29_315,  0.30),
+    (83_823,  0.41),
+    (180_294, 0.45),
+]
+SOCIAL_TAX_RATE = 0.172            # prélèvements sociaux sur revenus du patrimoine
+
+MICRO_FONCIER_CEILING   = 15_000   # loyers bruts annuels du foyer
+MICRO_FONCIER_ALLOWANCE = 0.30     # abattement forfaitaire
+FONCIER_DEFICIT_CAP     = 10_700   # déficit imputable sur le revenu global
+FONCIER_DEFICIT_YEARS   = 10       # report sur les revenus fonciers suivants
+
+CAPITAL_GAINS_IR_RATE   = 0.19
+ACQUISITION_FEES_FLAT   = 0.075    # frais d'acquisition forfaitaires (prix d'achat)
+WORKS_FLAT              = 0.15     # travaux forfaitaires si détention > 5 ans
+
+RENT_INDEXATION = 1.5              # revalorisation annuelle des loyers (%/an)
+
+# Plus-values mobilières et dividendes (tax_lots.py)
+PFU_IR_RATE              = 0.128   # part impôt sur le revenu du PFU (+ SOCIAL_TAX_RATE)
+DIVIDEND_ALLOWANCE       = 0.40    # abattement sur dividendes (option barème)
+SECURITIES_ALLOWANCES    = [(2, 0.50), (8, 0.65)]   # (années de détention, abattement)
+ALLOWANCE_CUTOFF_YEAR    = 2018    # abattement réservé aux titres acquis avant cette année
+CAPITAL_LOSS_CARRY_YEARS = 10      # report des moins-values
+SHELTERED_ACCOUNTS       = ("PEA", "Assurance-vie")   # imposés au retrait, pas à la cession
+TAX_LEDGER_POSITIONS     = 256     # positions rejouées gardées en cache (toutes sessions)
+
+# ─── Paie et impôt sur le salaire (payroll.py) ────────────────────────────────
+PASS = 47_100                      # plafond annuel de la sécurité sociale
+
+# Cotisations salariales : (libellé, assiette de … à … en PASS, taux)
+EMPLOYEE_CONTRIBUTIONS = [
+    ("Vieillesse plafonnée",          0, 1,    0.0690),
+    ("Vieillesse déplafonnée",        0, None, 0.0040),
+    ("Retraite complémentaire T1",    0, 1,    0.0401),   # AGIRC-ARRCO + CEG
+    ("Retraite complémentaire T2",    1, 8,    0.0986),
+]
+CSG_BASE_RATE      = 0.9825        # assiette CSG / CRDS (abattement frais pro.)
+CSG_BASE_CAP       = 4             # abattement limité à 4 PASS
+CSG_DEDUCTIBLE     = 0.068
+CSG_NON_DEDUCTIBLE = 0.024         # réintégrée au net imposable, comme la CRDS
+CRDS_RATE          = 0.005
+
+SALARY_ALLOWANCE        = 0.10             # déduction forfaitaire pour frais professionnels
+SALARY_ALLOWANCE_BOUNDS = (504, 14_171)    # minimum, maximum (€)
+QF_HALF_PART_CAP        = 1_791            # avantage maximal par demi-part (quotient familial)
+# Décote : {parts du foyer de référence: (seuil d'impôt, forfait)}
+DECOTE = {1: (1_964, 889), 2: (3_248, 1_470)}
+DECOTE_RATE = 0.4525
+
+PAYROLL_VIEWS = {"gross": "Brut", "net": "Net", "after_tax": "Net après impôt"}
+
 # ─── Styles tableau Dash ──────────────────────────────────────────────────────
 TABLE_STYLE_CELL = {
     "backgroundColor": COLORS["bg_surface"],
@@ -0,0 +1,116 @@
+"""
+dca.py
+======
+Simulation d'investissement : apports mensuels (DCA) contre versement unique.
+
+Grille déterministe
+  Capital final pour toute la grille apport × rendement × horizon en un seul
+  calcul diffusé (formule fermée de la rente, apports en début de mois).
+  Le versement unique de même montant total est calculé sur la même grille.
+
+Trajectoires aléatoires
+  Rendements mensuels tirés soit d'une loi log-normale (rendement et
+  volatilité saisis), soit par bootstrap par blocs d'un historique de cours
+  (prices.py), ce qui conserve la dépendance entre mois consécutifs.
+  La richesse DCA étant linéaire en l'apport,
+      W_t = c · G_t · Σ_{s≤t} 1 / G_{s−1}      (G : croissance cumulée),
+  une seule passe de produits cumulés sert pour tous les montants.
+"""
+
+import numpy as np
+
+from config import DCA_BLOCK_MONTHS, DCA_PATHS, DCA_PERCENTILES
+
+
+def _monthly_rate(annual_rate) -> np.ndarray:
+    return (1 + np.asarray(annual_rate, dtype=float)) ** (1 / 12) - 1
+
+
+# ─── Grille déterministe ──────────────────────────────────────────────────────
+
+def simulate_grid(contributions, annual_returns, horizons_years, initial: float = 0.0) -> dict:
+    """
+    Capital final sur la grille C × R × H (rendements en décimal, horizons en années).
+
+    dca  : apports mensuels c en début de mois + capital initial placé à t = 0
+    lump : même montant total (initial + c · n) placé en une fois à t = 0
+    """
+    c = np.asarray(contributions, dtype=float)[:, None, None]
+    r = _monthly_rate(annual_returns)[None, :, None]
+    n = (np.asarray(horizons_years, dtype=float) * 12)[None, None, :]
+
+    growth = (1 + r) ** n
+    # Σ_{k=1..n} (1+r)^k, limite n quand r → 0
+    safe_r = np.where(np.abs(r) < 1e-12, 1.0, r)
+    annuity = np.where(np.abs(r) < 1e-12, n, (growth - 1) / safe_r * (1 + r))
+    invested = initial + c * n
+    return {
+        "contributions": np.asarray(contributions, dtype=float),
+        "returns":       np.asarray(annual_returns, dtype=float),
+        "horizons":      np.asarray(horizons_years),
+        "invested":      invested,                                            # C × 1 × H
+        "dca":           initial * growth + c * annuity,
+        "lump":          invested * growth,
+    }
+
+
+# ─── Rendements mensuels ──────────────────────────────────────────────────────
+
+def monthly_returns(dates: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """Rendements mensuels à partir des derniers cours de chaque mois."""
+    months = np.asarray(dates).astype("datetime64[M]")
+    if months.size < 2:
+        return np.array([])
+    last = np.r_[months[1:] != months[:-1], True]
+    month_end = np.asarray(close, dtype=float)[last]
+    return month_end[1:] / month_end[:-1] - 1
+
+
+def lognormal_paths(annual_return: float, annual_vol: float, months: int,
+                    n_paths: int = DCA_PATHS, seed: int = 0) -> np.ndarray:
+    """Rendements mensuels n_paths × months d'espérance `annual_return`."""
+    rng = np.random.default_rng(seed)
+    sigma = annual_vol / np.sqrt(12)
+    mu = np.log1p(_monthly_rate(annual_return)) - sigma ** 2 / 2
+    return np.expm1(rng.normal(mu, sigma, (n_paths, months)))
+
+
+def bootstrap_paths(history: np.ndarray, months: int, n_paths: int = DCA_PATHS,
+                    block: int = DCA_BLOCK_MONTHS, seed: int = 0) -> np.ndarray:
+    """Bootstrap par blocs circulaires de l'historique mensuel : n_paths × months."""
+    history = np.asarray(history, dtype=float)
+    if history.size == 0:
+        raise ValueError("historique de rendements vide")
+    rng = np.random.default_rng(seed)
+    block = max(1, min(block, history.size))
+    n_blocks = -(-months // block)
+    starts = rng.integers(0, history.size, (n_paths, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block)[None, None, :]) % history.size
+    return history[idx.reshape(n_paths, -1)[:, :months]]
+
+
+# ─── Trajectoires ─────────────────────────────────────────────────────────────
+
+def simulate_paths(returns: np.ndarray, contribution: float, initial: float = 0.0,
+                   percentiles=DCA_PERCENTILES) -> dict:
+    """
+    Percentiles mois par mois du DCA et du versement unique de même montant total.
+
+    returns : rendements mensuels n_paths × months.
+    """
+    returns = np.atleast_2d(returns)
+    months = returns.shape[1]
+    growth = np.cumprod(1 + returns, axis=1)                                   # G_t
+    prev = np.hstack([np.ones((returns.shape[0], 1)), growth[:, :-1]])         # G_{t-1}
+    unit = growth * np.cumsum(1 / prev, axis=1)            # richesse pour 1 € / mois
+    dca = initial * growth + contribution * unit
+    lump = (initial + contribution * months) * growth
+    pct = np.asarray(percentiles)
+    return {
+        "months":      np.arange(1, months + 1),
+        "percentiles": pct,
+        "invested":    initial + contribution * np.arange(1, months + 1),
+        "dca":         np.percentile(dca, pct, axis=0),                     # P × months
+        "lump":        np.percentile(lump, pct, axis=0),
+        "lump_wins":   float((lump[:, -1] > dca[:, -1]).mean()),
+    }
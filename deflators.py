@@ -0,0 +1,98 @@
+"""
+deflators.py
+============
+Conversion des montants salariaux : euros courants, euros constants ou
+multiple du salaire moyen.
+
+Chaque série d'indices est construite une seule fois (par taux d'inflation
+pour les euros constants) sur tout l'axe des années couvert par l'historique
+et les projections :
+
+  constant : 1 / (1 + π)^(année − année courante)   → euros de l'année courante
+  wage     : 1 / salaire net moyen de l'année       → multiple du salaire moyen
+             (INSEE tc08.csv, prolongé par sa tendance récente)
+
+Convertir une série revient alors à lire les facteurs de ses années et à
+faire une seule multiplication vectorisée.
+"""
+
+import csv
+from functools import lru_cache
+
+import numpy as np
+
+from config import (
+    CURRENT_YEAR, DEFLATOR_INFLATION, DEFLATOR_VIEWS, SALARY_HORIZON_RANGE,
+    WAGE_INDEX_COLUMN, WAGE_INDEX_PATH, WAGE_INDEX_POPULATION, WAGE_TREND_YEARS,
+)
+
+# Axe des années : premières données INSEE → horizon maximal des projections
+_FIRST_YEAR = 1950
+_LAST_YEAR = CURRENT_YEAR + SALARY_HORIZON_RANGE[1] + 1
+YEARS = np.arange(_FIRST_YEAR, _LAST_YEAR + 1)
+
+
+def load_wage_index(path: str = WAGE_INDEX_PATH) -> tuple[np.ndarray, np.ndarray]:
+    """(années, salaire net annuel moyen) de l'ensemble des salariés ; vide si absent."""
+    years, values = [], []
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row.get("SEXE") != WAGE_INDEX_POPULATION:
+                    continue
+                try:
+                    years.append(int(row["ANNEE10"]))
+                    values.append(float(row[WAGE_INDEX_COLUMN]))
+                except (KeyError, TypeError, ValueError):
+                    continue
+    except OSError:
+        pass
+    order = np.argsort(years)
+    return np.asarray(years, dtype=int)[order], np.asarray(values, dtype=float)[order]
+
+
+@lru_cache(maxsize=None)
+def _wage_levels() -> np.ndarray | None:
+    """Salaire moyen sur YEARS : interpolé, puis prolongé au taux moyen des dernières années."""
+    years, values = load_wage_index()
+    if len(years) < 2:
+        return None
+    levels = np.interp(YEARS, years, values)
+    span = min(WAGE_TREND_YEARS, len(years) - 1)
+    trend = (values[-1] / values[-1 - span]) ** (1 / span)
+    after = YEARS > years[-1]
+    levels[after] = values[-1] * trend ** (YEARS[after] - years[-1])
+    return levels
+
+
+def wage_levels(years) -> np.ndarray | None:
+    """Salaire net moyen (série prolongée) aux années `years` ; None sans données."""
+    levels = _wage_levels()
+    if levels is None:
+        return None
+    return levels[np.clip(np.asarray(years, dtype=int) - _FIRST_YEAR, 0, len(YEARS) - 1)]
+
+
+@lru_cache(maxsize=32)
+def index(view: str, inflation: float = DEFLATOR_INFLATION) -> np.ndarray:
+    """Facteurs de conversion sur YEARS (tableau partagé : ne pas modifier)."""
+    if view == "constant":
+        factors = (1 + inflation / 100) ** -(YEARS - CURRENT_YEAR).astype(float)
+    elif view == "wage" and _wage_levels() is not None:
+        factors = 1 / _wage_levels()
+    else:
+        factors = np.ones(len(YEARS))
+    factors.setflags(write=False)
+    return factors
+
+
+def deflate(view: str, years, *series, inflation: float = DEFLATOR_INFLATION) -> list[np.ndarray]:
+    """
+    Séries de mêmes années converties dans la vue `view`, en une multiplication
+    (années hors axe : facteur de l'extrémité).
+    """
+    stacked = np.asarray(series, dtype=float).reshape(len(series), -1)
+    if view in DEFLATOR_VIEWS and view != "nominal":
+        idx = np.clip(np.asarray(years, dtype=int) - _FIRST_YEAR, 0, len(YEARS) - 1)
+        stacked = stacked * index(view, float(inflation))[idx]
+    return list(stacked)
@@ -0,0 +1,64 @@
+"""
+figure_encoding.py
+==================
+Encodage compact des données de figures envoyées au navigateur.
+
+  - `lttb`        : décimation Largest-Triangle-Three-Buckets — conserve la
+                    forme visuelle d'une courbe avec ~1 point par pixel rendu.
+  - `typed_array` : tableau binaire base64 (spec Plotly {dtype, bdata, shape}),
+                    au lieu d'une liste de nombres JSON ; float32 par défaut.
+"""
+
+import base64
+
+import numpy as np
+
+from config import FIGURE_MAX_POINTS
+
+
+def lttb(x, y, n_out: int = FIGURE_MAX_POINTS) -> tuple[np.ndarray, np.ndarray]:
+    """Réduit (x, y) à n_out points ; premier et dernier points conservés."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    # Bornes des n_out - 2 seaux intermédiaires (hors extrémités)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep  = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Point « suivant » : moyenne du seau d'après (ou dernier point)
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        # Aire du triangle (a, candidat, moyenne suivante) pour chaque candidat
+        area = np.abs(
+            (x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a])
+        )
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
+
+def typed_array(values, dtype: str = "f4") -> dict:
+    """
+    Tableau numérique → {"dtype", "bdata"} (base64 little-endian) pour Plotly.
+
+    Au-delà d'une dimension, la forme est transmise (clé "shape", au format de
+    plotly.py) : sans elle, plotly.js lit une matrice de heatmap comme une
+    seule ligne.
+
+    >>> typed_array([[1, 2, 3], [4, 5, 6]], "i2")["shape"]
+    '2, 3'
+    >>> "shape" in typed_array([1.0, 2.0])
+    False
+    """
+    arr = np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder("<"))
+    spec = {"dtype": dtype, "bdata": base64.b64encode(arr.tobytes()).decode("ascii")}
+    if arr.ndim > 1:
+        spec["shape"] = ", ".join(map(str, arr.shape))
+    return spec
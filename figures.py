@@ -6,21 +6,51 @@ La mention de source INSEE est affichée dans un html.Div
 sous le graphique (layout.py), pas dans la figure Plotly.
 """
 
+from functools import lru_cache
+
 import numpy as np
+# Import immédiat volontaire : `import dash` charge déjà plotly.graph_objects
+# (dcc.Graph), le différer ne retirerait rien au démarrage à froid
 import plotly.graph_objects as go
-from scipy.interpolate import PchipInterpolator
 
-from config import COLORS, SALARY_DIST, PROPORTIONS, CURRENT_YEAR
+from config import (
+    COLORS, SALARY_DIST, PROPORTIONS, CURRENT_YEAR, DEFLATOR_INFLATION, DEFLATOR_VIEWS,
+    PAYROLL_VIEWS,
+)
+from deflators import deflate
+from figure_encoding import lttb, typed_array
+from loans import amortization_schedule, loan_totals, yearly_summary
+from payroll import convert
+from properties import portfolio_totals
+from stress import HYPOTHETICAL
 
 
 # ─── Helpers ───────────────────────────────────────────────────────────────────
 
+@lru_cache(maxsize=1)
 def _build_cdf():
+    # Import différé : scipy.interpolate pèse ~0,4 s au démarrage du process
+    from scipy.interpolate import PchipInterpolator
+
     x_pts = np.array([0] + list(SALARY_DIST.values()) + [SALARY_DIST["C99"] * 1.6])
     y_pts = np.array([0.0] + list(PROPORTIONS.values()) + [1.0])
     return PchipInterpolator(x_pts, y_pts)
 
 
+# Template minimal : le thème « plotly » par défaut (~7 Ko) serait répété dans
+# chaque figure alors que toutes les couleurs sont fixées explicitement.
+_TEMPLATE = dict(layout=dict(
+    colorway=[COLORS["accent"], COLORS["secondary"], COLORS["success"], COLORS["danger"]],
+    hoverlabel=dict(align="left"),
+    xaxis=dict(automargin=True, ticks=""),
+    yaxis=dict(automargin=True, ticks=""),
+))
+
+
+def _new_figure(data=None) -> go.Figure:
+    return go.Figure(data, layout=dict(template=_TEMPLATE))
+
+
 def _base_layout(bg: str, title: str, extra: dict | None = None) -> dict:
     layout = dict(
         paper_bgcolor=bg,
@@ -49,6 +79,18 @@ def _hex_to_rgba(hex_color: str, alpha: float) -> str:
     return f"rgba(148,163,184,{alpha})"
 
 
+def _empty_figure(title: str, message: str) -> go.Figure:
+    fig = _new_figure()
+    fig.update_layout(**_base_layout(
+        COLORS["bg_card"], title,
+        extra=dict(annotations=[dict(
+            text=message, showarrow=False, font=dict(color=COLORS["text_muted"], size=12),
+            x=0.5, y=0.5, xref="paper", yref="paper",
+        )], xaxis=dict(visible=False), yaxis=dict(visible=False)),
+    ))
+    return fig
+
+
 # ─── Palette catégories budget ─────────────────────────────────────────────────
 
 _CATEGORY_COLORS = {
@@ -106,15 +148,18 @@ def build_pdf_figure(salary_compare: float | None = None) -> go.Figure:
         y_pdf /= area
     y_max = float(y_pdf.max())
 
-    fig = go.Figure()
+    # Courbe transmise : décimée à la largeur rendue, en float32 binaire
+    x_plot, y_plot = lttb(x_fine, y_pdf)
+
+    fig = _new_figure()
 
     if salary_compare is not None:
         pct  = float(np.clip(cdf(salary_compare), 0, 1))
-        mask = x_fine <= salary_compare
+        mask = x_plot <= salary_compare
         if mask.any():
             fig.add_trace(go.Scatter(
-                x=np.concatenate([[x_fine[mask][0]], x_fine[mask], [x_fine[mask][-1]]]),
-                y=np.concatenate([[0], y_pdf[mask], [0]]),
+                x=typed_array(np.concatenate([[x_plot[mask][0]], x_plot[mask], [x_plot[mask][-1]]])),
+                y=typed_array(np.concatenate([[0], y_plot[mask], [0]])),
                 fill="toself", fillcolor="rgba(59,130,246,0.14)",
                 line=dict(width=0), showlegend=True,
                 name=f"{pct * 100:.1f} % de la population",
@@ -122,25 +167,27 @@ def build_pdf_figure(salary_compare: float | None = None) -> go.Figure:
             ))
 
     fig.add_trace(go.Scatter(
-        x=x_fine, y=y_pdf, mode="lines",
+        x=typed_array(x_plot), y=typed_array(y_plot), mode="lines",
         line=dict(color=COLORS["accent"], width=2.5),
         name="Densité estimée",
         hovertemplate="<b>%{x:,.0f} €</b><extra></extra>",
     ))
 
-    for lbl in PROPORTIONS:
-        xv = SALARY_DIST[lbl]
-        yv = float(np.clip(pdf(xv), 0, None)) / (area if area > 0 else 1)
-        fig.add_trace(go.Scatter(
-            x=[xv], y=[yv], mode="markers+text",
-            marker=dict(color=COLORS["accent"], size=6,
-                        line=dict(color=COLORS["bg_card"], width=2)),
-            text=[lbl], textposition="top center",
-            textfont=dict(color=COLORS["text_muted"], size=8, family="DM Mono, monospace"),
-            showlegend=False,
-            hovertemplate=f"<b>{lbl}</b> : {xv:,} €<extra></extra>",
-        ))
-        fig.add_shape(type="line", x0=xv, x1=xv, y0=0, y1=yv,
+    # Repères déciles : une seule trace pour tous les marqueurs
+    labels = list(PROPORTIONS)
+    xs = np.array([SALARY_DIST[lbl] for lbl in labels], dtype=float)
+    ys = np.clip(pdf(xs), 0, None) / (area if area > 0 else 1)
+    fig.add_trace(go.Scatter(
+        x=xs.tolist(), y=ys.tolist(), mode="markers+text",
+        marker=dict(color=COLORS["accent"], size=6,
+                    line=dict(color=COLORS["bg_card"], width=2)),
+        text=labels, textposition="top center",
+        textfont=dict(color=COLORS["text_muted"], size=8, family="DM Mono, monospace"),
+        showlegend=False,
+        hovertemplate="<b>%{text}</b> : %{x:,} €<extra></extra>",
+    ))
+    for xv, yv in zip(xs, ys):
+        fig.add_shape(type="line", x0=xv, x1=xv, y0=0, y1=float(yv),
                       line=dict(color=COLORS["border_glow"], dash="dot", width=1))
 
     if salary_compare is not None:
@@ -186,22 +233,36 @@ def build_projection_figure(
     horizon: int,
     current_year: int = CURRENT_YEAR,
     confidence_pct: float = 5.0,
+    view: str = "nominal",
+    inflation: float = DEFLATOR_INFLATION,
+    basis: str = "net",
+    parts: float = 1.0,
 ) -> go.Figure:
-    fig = go.Figure()
+    """
+    Historique et projection salariale ; `view` (voir deflators.py) : euros
+    courants, euros constants au taux `inflation` ou multiple du salaire moyen ;
+    `basis` (voir payroll.py) : montants bruts, nets ou nets après impôt.
+    """
+    fig = _new_figure()
     all_years = []
+    # Format des montants selon la vue
+    hover = "%{y:.2f}×" if view == "wage" else "%{y:,.0f} €"
 
     if past_df is not None and len(past_df) > 0:
         past_years    = [d.year for d in past_df["Date"]]
-        past_salaries = past_df["Salaire"].tolist()
+        past_salaries = past_df["Salaire"].to_numpy(dtype=float)
+        past_display, = deflate(view, past_years, *convert(basis, past_salaries, parts=parts),
+                                inflation=inflation)
         all_years.extend(past_years)
 
         fig.add_trace(go.Scatter(
-            x=past_years, y=past_salaries, mode="lines+markers",
+            x=typed_array(past_years, "i2"), y=typed_array(past_display),
+            mode="lines+markers",
             line=dict(color=COLORS["accent"], width=2.5),
             marker=dict(size=8, color=COLORS["accent"],
                         line=dict(color=COLORS["bg_card"], width=2)),
             name="Historique",
-            hovertemplate="<b>%{x}</b><br>%{y:,.0f} €<extra></extra>",
+            hovertemplate="<b>%{x}</b><br>" + hover + "<extra></extra>",
         ))
 
         if future_growth is not None and horizon:
@@ -209,29 +270,35 @@ def build_projection_figure(
             last_salary = past_salaries[-1]
             gr = 1 + future_growth / 100
 
-            future_years = list(range(last_year, last_year + horizon + 1))
-            n = len(future_years)
+            future_years = np.arange(last_year, last_year + horizon + 1)
+            steps = np.arange(len(future_years))
             # Taux haut et bas : growth_rate ± confidence_pct (en absolu sur le taux)
             gr_high = 1 + (future_growth + confidence_pct) / 100
             gr_low  = 1 + (future_growth - confidence_pct) / 100
-            proj_values = [last_salary * (gr      ** i) for i in range(n)]
-            proj_high   = [last_salary * (gr_high ** i) for i in range(n)]
-            proj_low    = [last_salary * (gr_low  ** i) for i in range(n)]
-            all_years.extend(future_years)
+            proj_values = last_salary * gr      ** steps
+            proj_high   = last_salary * gr_high ** steps
+            proj_low    = last_salary * gr_low  ** steps
+            proj_values, proj_high, proj_low = deflate(
+                view, future_years,
+                *convert(basis, proj_values, proj_high, proj_low, parts=parts),
+                inflation=inflation,
+            )
+            all_years.extend([int(future_years[0]), int(future_years[-1])])
 
             fig.add_trace(go.Scatter(
-                x=future_years + future_years[::-1],
-                y=proj_high + proj_low[::-1],
+                x=typed_array(np.concatenate([future_years, future_years[::-1]]), "i2"),
+                y=typed_array(np.concatenate([proj_high, proj_low[::-1]])),
                 fill="toself", fillcolor="rgba(245,158,11,0.09)",
                 line=dict(width=0), showlegend=True,
                 name=f"Intervalle ±{confidence_pct:.0f}%/an",
                 hoverinfo="skip",
             ))
             fig.add_trace(go.Scatter(
-                x=future_years, y=proj_values, mode="lines",
+                x=typed_array(future_years, "i2"), y=typed_array(proj_values),
+                mode="lines",
                 line=dict(color=COLORS["secondary"], width=2.5, dash="dash"),
                 name=f"Projection {future_growth:+.1f}%/an",
-                hovertemplate="<b>%{x}</b><br>%{y:,.0f} €<extra></extra>",
+                hovertemplate="<b>%{x}</b><br>" + hover + "<extra></extra>",
             ))
 
     fig.add_vline(
@@ -259,10 +326,11 @@ def build_projection_figure(
                 zeroline=False, tickfont=dict(size=9, family="DM Mono, monospace"),
             ),
             yaxis=dict(
-                title=dict(text="Salaire net annuel (€)",
+                title=dict(text=f"Salaire annuel {PAYROLL_VIEWS.get(basis, 'Net').lower()} · "
+                                f"{DEFLATOR_VIEWS.get(view, DEFLATOR_VIEWS['nominal'])}",
                            font=dict(size=10, color=COLORS["text_label"])),
                 gridcolor=COLORS["grid"], color=COLORS["text_muted"],
-                zeroline=False, tickformat=",.0f",
+                zeroline=False, tickformat=".2f" if view == "wage" else ",.0f",
                 tickfont=dict(size=9, family="DM Mono, monospace"),
             ),
             hovermode="x unified",
@@ -271,6 +339,132 @@ def build_projection_figure(
     return fig
 
 
+# ─── Graphiques sensibilité de la projection ──────────────────────────────────
+
+_MULTIPLE_TICKS = (0.25, 0.5, 1, 2, 5, 10, 25, 50, 100)
+
+
+def build_tornado_figure(bars: list[dict] | None = None, central: float | None = None) -> go.Figure:
+    """Tornado : salaire final quand un seul réglage varie autour de sa valeur."""
+    title = "Réglage le plus influent sur le salaire final"
+    if not bars or not central:
+        return _empty_figure(title, "Renseignez l'historique salarial")
+
+    bars = bars[::-1]                                     # plus influent en haut
+    names = [b["parameter"] for b in bars]
+    fig = _new_figure()
+    for side, color in (("low", COLORS["danger"]), ("high", COLORS["success"])):
+        fig.add_trace(go.Bar(
+            y=names, x=typed_array(np.array([b[side] - central for b in bars])),
+            base=central, orientation="h", marker_color=_hex_to_rgba(color, 0.8),
+            customdata=[[b[side], b[f"{side}_label"]] for b in bars],
+            hovertemplate="%{y} · %{customdata[1]}<br>%{customdata[0]:,.0f} €<extra></extra>",
+            showlegend=False,
+        ))
+    fig.add_vline(x=central, line_color=COLORS["text_secondary"], line_width=1, line_dash="dot")
+    fig.update_layout(**_base_layout(
+        COLORS["bg_card"], title,
+        extra=dict(
+            barmode="overlay",
+            xaxis=_loan_axis("Salaire net annuel final (€)", tickformat=",.0f"),
+            yaxis=_loan_axis(""),
+        ),
+    ))
+    return fig
+
+
+def build_sensitivity_heatmap_figure(grid: dict | None = None, growth: float | None = None,
+                                     horizon: int | None = None) -> go.Figure:
+    """Salaire final (multiple du dernier salaire) selon le taux et l'horizon."""
+    title = "Salaire final selon taux et horizon"
+    if not grid or not grid["salary"]:
+        return _empty_figure(title, "Renseignez l'historique salarial")
+
+    central = grid["central"].T                                      # horizons × taux
+    multiple = central / grid["salary"]
+    ticks = [t for t in _MULTIPLE_TICKS if multiple.min() <= t <= multiple.max()]
+    fig = _new_figure(go.Heatmap(
+        x=typed_array(grid["growth"]), y=typed_array(grid["horizon"], "i2"),
+        z=typed_array(np.log10(np.clip(multiple, 1e-6, None))),
+        colorscale=[[0, COLORS["danger"]], [0.5, COLORS["bg_surface"]],
+                    [1, COLORS["success"]]],
+        zmid=0,
+        colorbar=dict(thickness=8, tickvals=np.log10(ticks).tolist(),
+                      ticktext=[f"×{t:g}" for t in ticks],
+                      tickfont=dict(size=9, color=COLORS["text_muted"])),
+        customdata=typed_array(central),
+        hovertemplate="%{x:+.1f} %/an · %{y} ans<br>%{customdata:,.0f} €<extra></extra>",
+    ))
+    if growth is not None and horizon is not None:
+        fig.add_trace(go.Scatter(
+            x=[growth], y=[horizon], mode="markers", showlegend=False, hoverinfo="skip",
+            marker=dict(size=11, symbol="circle-open", color=COLORS["text_primary"],
+                        line=dict(width=2)),
+        ))
+    fig.update_layout(**_base_layout(
+        COLORS["bg_card"], title,
+        extra=dict(
+            xaxis=_loan_axis("Taux annuel projeté (%)", ticksuffix=" %"),
+            yaxis=_loan_axis("Horizon (années)", dtick=5),
+        ),
+    ))
+    return fig
+
+
+# ─── Graphique percentile au fil du temps ─────────────────────────────────────
+
+def build_percentile_figure(path: dict | None = None, basis: str = "net",
+                            parts: float = 1.0) -> go.Figure:
+    """
+    Percentile de l'historique (distribution INSEE de chaque année) et projeté.
+    Le classement se fait en net ; `basis` ne change que les montants affichés.
+    """
+    title = "Percentile au fil du temps"
+    if not path or not len(path["years"]):
+        return _empty_figure(title, "Renseignez l'historique salarial")
+
+    n = len(path["years"])
+    amounts, = convert(basis, np.r_[path["salaries"], path["future_salaries"]], parts=parts)
+    salaries, future_salaries = amounts[:n], amounts[n:]
+    fig = _new_figure()
+    hover = ("<b>%{x}</b><br>%{y:.1f}ᵉ percentile · %{customdata:,.0f} € "
+             f"{PAYROLL_VIEWS.get(basis, 'Net').lower()}<extra></extra>")
+    fig.add_trace(go.Scatter(
+        x=typed_array(path["years"], "i2"), y=typed_array(path["percentiles"]),
+        customdata=typed_array(salaries),
+        mode="lines+markers", name="Historique",
+        line=dict(color=COLORS["accent"], width=2.5),
+        marker=dict(size=8, color=COLORS["accent"],
+                    line=dict(color=COLORS["bg_card"], width=2)),
+        hovertemplate=hover,
+    ))
+    if len(path["future_years"]):
+        # La projection part du dernier point connu
+        fig.add_trace(go.Scatter(
+            x=typed_array(np.r_[path["years"][-1], path["future_years"]], "i2"),
+            y=typed_array(np.r_[path["percentiles"][-1], path["future_percentiles"]]),
+            customdata=typed_array(np.r_[salaries[-1], future_salaries]),
+            mode="lines", name="Projection",
+            line=dict(color=COLORS["secondary"], width=2.5, dash="dash"),
+            hovertemplate=hover,
+        ))
+    for level, label in ((50, "Médiane"), (90, "D9")):
+        fig.add_hline(
+            y=level, line_color="rgba(255,255,255,0.10)", line_width=1, line_dash="dot",
+            annotation_text=label, annotation_position="bottom right",
+            annotation_font=dict(color=COLORS["text_muted"], size=10),
+        )
+    fig.update_layout(**_base_layout(
+        COLORS["bg_card"], f"{title} · {path['population']}",
+        extra=dict(
+            xaxis=_loan_axis("Année"),
+            yaxis=_loan_axis("Percentile", range=[0, 100], dtick=10),
+            hovermode="x unified",
+        ),
+    ))
+    return fig
+
+
 # ─── Graphique Sankey · Flux budgétaire mensuel ───────────────────────────────
 
 def build_sankey_figure(
@@ -286,7 +480,7 @@ def build_sankey_figure(
         budget = _DEFAULT_BUDGET
 
     if not budget:
-        fig = go.Figure()
+        fig = _new_figure()
         fig.update_layout(
             paper_bgcolor=COLORS["bg_card"], plot_bgcolor=COLORS["bg_card"],
             margin=dict(l=10, r=10, t=44, b=20),
@@ -335,7 +529,7 @@ def build_sankey_figure(
             value.append(round(max(amount, 0.01), 2))
             link_colors.append(_hex_to_rgba(c, 0.20))
 
-    fig = go.Figure(go.Sankey(
+    fig = _new_figure(go.Sankey(
         arrangement="snap",
         node=dict(
             pad=16, thickness=18,
@@ -360,21 +554,586 @@ def build_sankey_figure(
     return fig
 
 
-# ─── Graphique patrimoine total (placeholder) ──────────────────────────────────
+# ─── Graphique comparaison de scénarios ───────────────────────────────────────
 
-def build_total_figure() -> go.Figure:
-    fig = go.Figure()
-    fig.update_layout(
+def build_scenarios_figure(results: list[dict] | None = None) -> go.Figure:
+    """Projection salariale centrale de chaque scénario comparé."""
+    title = "Projection salariale par scénario"
+    if not results or not any(r["last_salary"] for r in results):
+        return _empty_figure(title, "Enregistrez un scénario pour le comparer")
+
+    fig = _new_figure()
+    for i, r in enumerate(results):
+        color = _COLOR_CYCLE[i % len(_COLOR_CYCLE)]
+        fig.add_trace(go.Scatter(
+            x=typed_array(r["years"], "i2"), y=typed_array(r["salary"]), mode="lines",
+            name=r["name"], line=dict(color=color, width=2.5, dash="dot" if i == 0 else "solid"),
+            hovertemplate="<b>%{x}</b><br>%{y:,.0f} €<extra>" + r["name"] + "</extra>",
+        ))
+    fig.update_layout(**_base_layout(
+        COLORS["bg_card"], title,
+        extra=dict(
+            xaxis=_loan_axis("Année"),
+            yaxis=_loan_axis("Salaire net annuel (€)", tickformat=",.0f"),
+            legend=dict(orientation="h", x=0, y=-0.2, bgcolor="rgba(0,0,0,0)",
+                        font=dict(color=COLORS["text_secondary"], size=10)),
+        ),
+    ))
+    return fig
+
+
+# ─── Graphique patrimoine total ───────────────────────────────────────────────
+
+_NETWORTH_COLORS = {
+    "Épargne":         COLORS["accent"],
+    "Immobilier":      COLORS["secondary"],
+    "Investissements": COLORS["success"],
+}
+
+
+def build_total_figure(snapshot: dict | None = None, horizon: int | None = None) -> go.Figure:
+    """Aires empilées par module (voir networth.py) et courbe du total."""
+    fig = _new_figure()
+    layout = dict(
         paper_bgcolor=COLORS["bg_card_alt"], plot_bgcolor=COLORS["bg_card_alt"],
         font=dict(color=COLORS["text_muted"]),
         margin=dict(l=10, r=10, t=10, b=40),
         xaxis=dict(gridcolor=COLORS["grid"], zeroline=False),
         yaxis=dict(gridcolor=COLORS["grid"], zeroline=False, tickformat=",.0f"),
-        annotations=[dict(
+    )
+    if snapshot is None or not np.any(snapshot["series"]):
+        fig.update_layout(**layout, annotations=[dict(
             text="Renseignez les données des 3 onglets pour afficher le cumul",
             showarrow=False,
             font=dict(color=COLORS["text_muted"], size=12, family="Syne, sans-serif"),
             x=0.5, y=0.5, xref="paper", yref="paper",
-        )],
+        )])
+        return fig
+
+    n = len(snapshot["years"]) if horizon is None else int(horizon) + 1
+    x = typed_array(snapshot["years"][:n], "i2")
+    for source, series in zip(snapshot["sources"], snapshot["series"]):
+        if not np.any(series[:n]):
+            continue
+        color = _NETWORTH_COLORS.get(source, COLORS["text_muted"])
+        fig.add_trace(go.Scatter(
+            x=x, y=typed_array(series[:n]), mode="lines", stackgroup="total",
+            name=source, line=dict(color=color, width=1),
+            fillcolor=_hex_to_rgba(color, 0.35),
+            hovertemplate="%{y:,.0f} €<extra>" + source + "</extra>",
+        ))
+    fig.add_trace(go.Scatter(
+        x=x, y=typed_array(snapshot["total"][:n]), mode="lines", name="Total",
+        line=dict(color=COLORS["text_primary"], width=2),
+        hovertemplate="<b>%{x}</b><br>%{y:,.0f} €<extra>Total</extra>",
+    ))
+    fig.update_layout(
+        **layout, hovermode="x unified",
+        legend=dict(orientation="h", x=0, y=1.12, font=dict(size=10)),
     )
-    return fig
\ No newline at end of file
+    return fig
+
+
+# ─── Graphiques crédit immobilier ──────────────────────────────────────────────
+
+# Grille d'alternatives : écart de taux autour du taux saisi × durées possibles
+_LOAN_GRID_RATE_OFFSETS = np.arange(-1.5, 1.5001, 0.25)
+_LOAN_GRID_YEARS        = np.arange(10, 31)
+
+
+def _loan_axis(title: str, **extra) -> dict:
+    return dict(
+        title=dict(text=title, font=dict(size=10, color=COLORS["text_label"])),
+        gridcolor=COLORS["grid"], color=COLORS["text_muted"], zeroline=False,
+        tickfont=dict(size=9, family="DM Mono, monospace"), **extra,
+    )
+
+
+def build_amortization_figure(
+    principal: float,
+    rate_pct: float,
+    years: int,
+    insurance_pct: float = 0.0,
+) -> go.Figure:
+    """Intérêts / capital / assurance payés par année et capital restant dû."""
+    schedule = amortization_schedule(principal, rate_pct / 100, int(years) * 12,
+                                     insurance_rate=insurance_pct / 100)
+    summary = yearly_summary(schedule)
+    x = typed_array(summary["year"], "i2")
+
+    fig = _new_figure()
+    for key, name, color in (
+        ("principal", "Capital remboursé", COLORS["accent"]),
+        ("interest",  "Intérêts",          COLORS["secondary"]),
+        ("insurance", "Assurance",         COLORS["text_muted"]),
+    ):
+        fig.add_trace(go.Bar(
+            x=x, y=typed_array(summary[key]), name=name, marker_color=color,
+            hovertemplate="%{y:,.0f} €<extra>" + name + "</extra>",
+        ))
+    fig.add_trace(go.Scatter(
+        x=x, y=typed_array(summary["balance"]), yaxis="y2",
+        mode="lines", line=dict(color=COLORS["success"], width=2.5),
+        name="Capital restant dû",
+        hovertemplate="%{y:,.0f} €<extra>Capital restant dû</extra>",
+    ))
+
+    fig.update_layout(**_base_layout(
+        COLORS["bg_card"], "Amortissement annuel",
+        extra=dict(
+            barmode="stack", bargap=0.25, hovermode="x unified",
+            xaxis=_loan_axis("Année de prêt", dtick=5),
+            yaxis=_loan_axis("Payé dans l'année (€)", tickformat=",.0f"),
+            yaxis2=_loan_axis("Capital restant dû (€)", tickformat=",.0f",
+                              overlaying="y", side="right", showgrid=False,
+                              rangemode="tozero"),
+            legend=dict(orientation="h", y=-0.22, bgcolor="rgba(0,0,0,0)",
+                        font=dict(color=COLORS["text_secondary"], size=10)),
+        ),
+    ))
+    return fig
+
+
+def build_loan_grid_figure(
+    principal: float,
+    rate_pct: float,
+    years: int,
+    insurance_pct: float = 0.0,
+) -> go.Figure:
+    """Coût total du crédit (intérêts + assurance) pour une grille taux × durée."""
+    rates = np.maximum(rate_pct + _LOAN_GRID_RATE_OFFSETS, 0.0)
+    # Une seule évaluation diffusée : durées en lignes, taux en colonnes
+    totals = loan_totals(principal, rates[None, :] / 100,
+                         _LOAN_GRID_YEARS[:, None] * 12, insurance_pct / 100)
+
+    fig = _new_figure(go.Heatmap(
+        x=typed_array(rates), y=typed_array(_LOAN_GRID_YEARS, "i2"),
+        z=typed_array(totals["total_cost"]),
+        colorscale=[[0, COLORS["bg_surface"]], [0.5, COLORS["accent"]],
+                    [1, COLORS["secondary"]]],
+        colorbar=dict(thickness=8, tickformat=",.0f",
+                      tickfont=dict(size=9, color=COLORS["text_muted"])),
+        customdata=typed_array(totals["monthly_payment"]),
+        hovertemplate="%{x:.2f} % · %{y} ans<br>Coût %{z:,.0f} €"
+                      "<br>Mensualité %{customdata:,.0f} €<extra></extra>",
+    ))
+    fig.add_trace(go.Scatter(
+        x=[rate_pct], y=[years], mode="markers", showlegend=False, hoverinfo="skip",
+        marker=dict(size=11, symbol="circle-open", color=COLORS["text_primary"],
+                    line=dict(width=2)),
+    ))
+    fig.update_layout(**_base_layout(
+        COLORS["bg_card"], "Coût total selon taux et durée",
+        extra=dict(
+            xaxis=_loan_axis("Taux nominal (%)", ticksuffix=" %"),
+            yaxis=_loan_axis("Durée (années)", dtick=5),
+        ),
+    ))
+    return fig
+
+
+def build_refinancing_figure(result: dict | None = None, fees: float = 0.0) -> go.Figure:
+    """
+    Frontière de rentabilité d'un rachat : taux maximal à obtenir selon la
+    date du rachat et la nouvelle durée, pour le niveau de frais le plus proche.
+    """
+    title = "Taux maximal pour qu'un rachat soit rentable"
+    if not result or not len(result["switch"]):
+        return _empty_figure(title, "Prêt déjà remboursé ou paramètres incomplets")
+
+    fi = int(np.abs(result["fees"] - fees).argmin())
+    z = result["frontier"][:, fi, :].T * 100                       # durées × dates
+    fig = _new_figure(go.Heatmap(
+        x=typed_array(result["switch"], "i2"),
+        y=typed_array(result["durations"] // 12, "i2"),
+        z=typed_array(z),
+        colorscale=[[0, COLORS["bg_surface"]], [0.5, COLORS["accent"]],
+                    [1, COLORS["success"]]],
+        colorbar=dict(thickness=8, ticksuffix=" %",
+                      tickfont=dict(size=9, color=COLORS["text_muted"])),
+        hovertemplate="Rachat dans %{x} mois · %{y} ans"
+                      "<br>Rentable sous %{z:.2f} %<extra></extra>",
+    ))
+    best = result["best"]
+    if best is not None:
+        fig.add_trace(go.Scatter(
+            x=[best["switch_month"]], y=[best["months"] // 12], mode="markers",
+            showlegend=False, hoverinfo="skip",
+            marker=dict(size=11, symbol="circle-open", color=COLORS["text_primary"],
+                        line=dict(width=2)),
+        ))
+    fig.update_layout(**_base_layout(
+        COLORS["bg_card"], title,
+        extra=dict(
+            xaxis=_loan_axis("Rachat dans (mois)"),
+            yaxis=_loan_axis("Nouvelle durée (années)", dtick=5),
+        ),
+    ))
+    return fig
+
+
+# ─── Graphique parc immobilier ────────────────────────────────────────────────
+
+def build_property_figure(projection: dict | None = None, horizon: int = 20) -> go.Figure:
+    """
+    Valeur projetée de chaque bien (scénario central, aires empilées),
+    capital restant dû et valeur nette du parc avec l'enveloppe des scénarios.
+    """
+    if not projection or not projection["properties"]:
+        return _empty_figure("Projection du parc immobilier",
+                             "Ajoutez un bien avec une valeur estimée")
+
+    fig = _new_figure()
+    n = int(horizon) + 1
+    scenarios = projection["scenarios"]
+    central = scenarios.index("Central") if "Central" in scenarios else len(scenarios) // 2
+    x = typed_array(projection["years"][:n], "i2")
+
+    for i, prop in enumerate(projection["properties"]):
+        color = _COLOR_CYCLE[i % len(_COLOR_CYCLE)]
+        fig.add_trace(go.Scatter(
+            x=x, y=typed_array(projection["value"][i, :n, central]),
+            mode="lines", stackgroup="value", name=prop["name"],
+            line=dict(width=0.5, color=color), fillcolor=_hex_to_rgba(color, 0.35),
+            hovertemplate="%{y:,.0f} €<extra>" + prop["name"] + "</extra>",
+        ))
+
+    totals = portfolio_totals(projection, horizon)
+    equity = totals["equity"]
+    fig.add_trace(go.Scatter(
+        x=typed_array(np.concatenate([totals["years"], totals["years"][::-1]]), "i2"),
+        y=typed_array(np.concatenate([equity.max(axis=1), equity.min(axis=1)[::-1]])),
+        fill="toself", fillcolor="rgba(16,185,129,0.10)", line=dict(width=0),
+        name=f"Valeur nette ({scenarios[0]} – {scenarios[-1]})", hoverinfo="skip",
+    ))
+    fig.add_trace(go.Scatter(
+        x=x, y=typed_array(equity[:, central]), mode="lines",
+        line=dict(color=COLORS["success"], width=2.5), name="Valeur nette",
+        hovertemplate="%{y:,.0f} €<extra>Valeur nette</extra>",
+    ))
+    fig.add_trace(go.Scatter(
+        x=x, y=typed_array(totals["balance"]), mode="lines",
+        line=dict(color=COLORS["danger"], width=2, dash="dot"), name="Capital restant dû",
+        hovertemplate="%{y:,.0f} €<extra>Capital restant dû</extra>",
+    ))
+
+    fig.update_layout(**_base_layout(
+        COLORS["bg_card"], "Projection du parc immobilier",
+        extra=dict(
+            hovermode="x unified",
+            xaxis=_loan_axis("Année", dtick=max(1, n // 10)),
+            yaxis=_loan_axis("Montant (€)", tickformat=",.0f"),
+            legend=dict(orientation="h", y=-0.2, bgcolor="rgba(0,0,0,0)",
+                        font=dict(color=COLORS["text_secondary"], size=10)),
+        ),
+    ))
+    return fig
+
+
+# ─── Graphiques fiscalité locative ────────────────────────────────────────────
+
+def build_rental_tax_figure(result: dict | None = None) -> go.Figure:
+    """Impôt foncier annuel du foyer (IR + PS) : micro-foncier contre réel."""
+    title = "Impôt sur les revenus fonciers"
+    if not result:
+        return _empty_figure(title, "Renseignez un loyer pour comparer les régimes")
+
+    x = typed_array(result["years"], "i2")
+    fig = _new_figure()
+    fig.add_trace(go.Bar(
+        x=x, y=typed_array(result["gross"].sum(axis=0)), name="Loyers encaissés",
+        marker_color=_hex_to_rgba(COLORS["accent"], 0.25),
+        hovertemplate="%{y:,.0f} €<extra>Loyers</extra>",
+    ))
+    for key, name, color in (("tax_micro", "Micro-foncier", COLORS["secondary"]),
+                             ("tax_reel",  "Réel",          COLORS["success"])):
+        fig.add_trace(go.Scatter(
+            x=x, y=typed_array(result[key]), mode="lines", name=name,
+            line=dict(color=color, width=2.5), connectgaps=False,
+            hovertemplate="%{y:,.0f} €<extra>" + name + "</extra>",
+        ))
+    fig.update_layout(**_base_layout(
+        COLORS["bg_card"], title,
+        extra=dict(
+            hovermode="x unified",
+            xaxis=_loan_axis("Année"),
+            yaxis=_loan_axis("€ / an", tickformat=",.0f"),
+            legend=dict(orientation="h", y=-0.22, bgcolor="rgba(0,0,0,0)",
+                        font=dict(color=COLORS["text_secondary"], size=10)),
+        ),
+    ))
+    return fig
+
+
+def build_capital_gains_figure(result: dict | None = None) -> go.Figure:
+    """Impôt de plus-value (IR + PS + surtaxe) selon l'année de revente, par bien."""
+    title = "Impôt de plus-value selon l'année de revente"
+    if not result:
+        return _empty_figure(title, "Renseignez un bien loué et son prix d'achat")
+
+    x = typed_array(result["years"], "i2")
+    fig = _new_figure()
+    for i, name in enumerate(result["names"]):
+        color = _COLOR_CYCLE[i % len(_COLOR_CYCLE)]
+        fig.add_trace(go.Scatter(
+            x=x, y=typed_array(result["capital_gains_tax"][i]), mode="lines", name=name,
+            line=dict(color=color, width=2, shape="hv"),
+            hovertemplate="%{y:,.0f} €<extra>" + name + "</extra>",
+        ))
+    fig.update_layout(**_base_layout(
+        COLORS["bg_card"], title,
+        extra=dict(
+            hovermode="x unified",
+            xaxis=_loan_axis("Année de revente"),
+            yaxis=_loan_axis("Impôt (€)", tickformat=",.0f", rangemode="tozero"),
+            legend=dict(orientation="h", y=-0.22, bgcolor="rgba(0,0,0,0)",
+                        font=dict(color=COLORS["text_secondary"], size=10)),
+        ),
+    ))
+    return fig
+
+
+# ─── Graphique portefeuille boursier ──────────────────────────────────────────
+
+def build_portfolio_figure(performance: dict | None = None) -> go.Figure:
+    """Valeur du portefeuille à chaque date de flux contre le capital net investi."""
+    title = "Valeur du portefeuille"
+    if not performance:
+        return _empty_figure(title, "Saisissez des transactions (date, ticker, quantité, prix)")
+
+    x = np.datetime_as_string(performance["dates"]).tolist()
+    fig = _new_figure()
+    fig.add_trace(go.Scatter(
+        x=x, y=typed_array(performance["invested_history"]), mode="lines",
+        line=dict(color=COLORS["text_muted"], width=2, dash="dot", shape="hv"),
+        name="Capital net investi",
+        hovertemplate="%{y:,.0f} €<extra>Investi</extra>",
+    ))
+    fig.add_trace(go.Scatter(
+        x=x, y=typed_array(performance["history"]), mode="lines+markers",
+        line=dict(color=COLORS["success"], width=2.5), marker=dict(size=4),
+        fill="tonexty", fillcolor="rgba(16,185,129,0.10)", name="Valeur",
+        hovertemplate="%{y:,.0f} €<extra>Valeur</extra>",
+    ))
+    fig.update_layout(**_base_layout(
+        COLORS["bg_card"], title,
+        extra=dict(
+            hovermode="x unified",
+            xaxis=_loan_axis("Date"),
+            yaxis=_loan_axis("Montant (€)", tickformat=",.0f"),
+            legend=dict(orientation="h", y=-0.2, bgcolor="rgba(0,0,0,0)",
+                        font=dict(color=COLORS["text_secondary"], size=10)),
+        ),
+    ))
+    return fig
+
+
+# ─── Graphiques simulation d'investissement ───────────────────────────────────
+
+def build_dca_heatmap_figure(grid: dict | None = None, return_pct: float | None = None,
+                             horizon: int | None = None) -> go.Figure:
+    """Capital final du DCA selon le rendement annuel et l'horizon (premier apport de la grille)."""
+    title = "Capital final selon rendement et horizon"
+    if not grid:
+        return _empty_figure(title, "Saisissez un apport mensuel")
+
+    z = grid["dca"][0].T                                            # horizons × rendements
+    lump = grid["lump"][0].T
+    fig = _new_figure(go.Heatmap(
+        x=typed_array(grid["returns"] * 100), y=typed_array(grid["horizons"], "i2"),
+        z=typed_array(z),
+        colorscale=[[0, COLORS["bg_surface"]], [0.5, COLORS["accent"]],
+                    [1, COLORS["success"]]],
+        colorbar=dict(thickness=8, tickformat=",.0f",
+                      tickfont=dict(size=9, color=COLORS["text_muted"])),
+        customdata=typed_array(lump),
+        hovertemplate="%{x:.2f} %/an · %{y} ans<br>DCA %{z:,.0f} €"
+                      "<br>Versement unique %{customdata:,.0f} €<extra></extra>",
+    ))
+    if return_pct is not None and horizon is not None:
+        fig.add_trace(go.Scatter(
+            x=[return_pct], y=[horizon], mode="markers", showlegend=False, hoverinfo="skip",
+            marker=dict(size=11, symbol="circle-open", color=COLORS["text_primary"],
+                        line=dict(width=2)),
+        ))
+    fig.update_layout(**_base_layout(
+        COLORS["bg_card"], title,
+        extra=dict(
+            xaxis=_loan_axis("Rendement annuel (%)", ticksuffix=" %"),
+            yaxis=_loan_axis("Horizon (années)", dtick=5),
+        ),
+    ))
+    return fig
+
+
+def build_dca_bands_figure(paths: dict | None = None) -> go.Figure:
+    """Percentiles du capital : DCA contre versement unique du même montant total."""
+    title = "DCA contre versement unique · percentiles"
+    if not paths:
+        return _empty_figure(title, "Saisissez un apport mensuel et un horizon")
+
+    x = typed_array(paths["months"] / 12)
+    x_band = typed_array(np.concatenate([paths["months"], paths["months"][::-1]]) / 12)
+    low, high = paths["percentiles"][0], paths["percentiles"][-1]
+    fig = _new_figure()
+    for key, name, color in (
+        ("lump", "Versement unique", COLORS["secondary"]),
+        ("dca",  "DCA",              COLORS["success"]),
+    ):
+        band = paths[key]
+        fig.add_trace(go.Scatter(
+            x=x_band, y=typed_array(np.concatenate([band[-1], band[0][::-1]])),
+            fill="toself", fillcolor=_hex_to_rgba(color, 0.12), line=dict(width=0),
+            name=f"{name} (P{low}–P{high})", hoverinfo="skip",
+        ))
+        fig.add_trace(go.Scatter(
+            x=x, y=typed_array(band[len(band) // 2]), mode="lines",
+            line=dict(color=color, width=2.5), name=f"{name} (médiane)",
+            hovertemplate="%{y:,.0f} €<extra>" + name + "</extra>",
+        ))
+    fig.add_trace(go.Scatter(
+        x=x, y=typed_array(paths["invested"]), mode="lines",
+        line=dict(color=COLORS["text_muted"], width=1.5, dash="dot"),
+        name="Apports cumulés", hovertemplate="%{y:,.0f} €<extra>Apports</extra>",
+    ))
+    fig.update_layout(**_base_layout(
+        COLORS["bg_card"], title,
+        extra=dict(
+            hovermode="x unified",
+            xaxis=_loan_axis("Années"),
+            yaxis=_loan_axis("Capital (€)", tickformat=",.0f"),
+            legend=dict(orientation="h", y=-0.2, bgcolor="rgba(0,0,0,0)",
+                        font=dict(color=COLORS["text_secondary"], size=10)),
+        ),
+    ))
+    return fig
+
+
+# ─── Graphique allocation ─────────────────────────────────────────────────────
+
+def build_allocation_figure(rollup: dict | None = None) -> go.Figure:
+    """Treemap : groupes de la dimension choisie, puis lignes (compte · ticker)."""
+    title = "Allocation du portefeuille"
+    if not rollup or not rollup["total"]:
+        return _empty_figure(title, "Aucune position détenue")
+
+    root = "Portefeuille"
+    ids, labels, parents = [root], [root], [""]
+    values, colors = [rollup["total"]], [COLORS["bg_surface"]]
+    group_color = {}
+    for i, (group, value) in enumerate(zip(rollup["groups"], rollup["values"])):
+        group_color[group] = _COLOR_CYCLE[i % len(_COLOR_CYCLE)]
+        ids.append(f"g/{group}")
+        labels.append(group)
+        parents.append(root)
+        values.append(float(value))
+        colors.append(group_color[group])
+    for (account, ticker), group, value in zip(rollup["lines"], rollup["line_groups"],
+                                               rollup["line_values"]):
+        ids.append(f"l/{group}/{account}/{ticker}")
+        labels.append(f"{ticker} · {account}")
+        parents.append(f"g/{group}")
+        values.append(float(value))
+        colors.append(_hex_to_rgba(group_color[group], 0.55))
+
+    fig = _new_figure(go.Treemap(
+        ids=ids, labels=labels, parents=parents, values=values, branchvalues="total",
+        marker=dict(colors=colors, line=dict(color=COLORS["bg_card"], width=1)),
+        textinfo="label+percent root",
+        hovertemplate="%{label}<br>%{value:,.0f} € · %{percentRoot:.1%}<extra></extra>",
+    ))
+    fig.update_layout(**_base_layout(COLORS["bg_card"], f"{title} · {rollup['dimension']}"))
+    return fig
+
+
+# ─── Graphique risque ─────────────────────────────────────────────────────────
+
+def build_correlation_figure(report: dict | None = None) -> go.Figure:
+    """Matrice de corrélation des rendements quotidiens des lignes détenues."""
+    title = "Corrélation entre actifs"
+    if not report or len(report["tickers"]) < 2:
+        return _empty_figure(title, "Importez l'historique de cours d'au moins deux lignes")
+
+    tickers = report["tickers"]
+    fig = _new_figure(go.Heatmap(
+        x=tickers, y=tickers, z=typed_array(report["correlation"]), zmin=-1, zmax=1,
+        colorscale=[[0, COLORS["danger"]], [0.5, COLORS["bg_surface"]],
+                    [1, COLORS["accent"]]],
+        colorbar=dict(thickness=8, tickfont=dict(size=9, color=COLORS["text_muted"])),
+        hovertemplate="%{y} · %{x}<br>ρ = %{z:.2f}<extra></extra>",
+    ))
+    fig.update_layout(**_base_layout(
+        COLORS["bg_card"], title,
+        extra=dict(
+            xaxis=_loan_axis(""),
+            yaxis=_loan_axis("", autorange="reversed"),
+        ),
+    ))
+    return fig
+
+
+# ─── Graphique scénarios de stress ────────────────────────────────────────────
+
+def build_stress_figure(results: list[dict] | None = None) -> go.Figure:
+    """P&L de chaque scénario de stress (barres horizontales, pire en bas)."""
+    title = "Scénarios de stress"
+    if not results or not any(r["pnl"] for r in results):
+        return _empty_figure(title, "Aucune position détenue")
+
+    results = sorted(results, key=lambda r: -r["pnl"])
+    fig = _new_figure(go.Bar(
+        x=typed_array(np.array([r["pnl"] for r in results])),
+        y=[r["name"] for r in results], orientation="h",
+        marker_color=[
+            _hex_to_rgba(COLORS["danger"] if r["pnl"] < 0 else COLORS["success"],
+                         1.0 if r["kind"] == HYPOTHETICAL else 0.6)
+            for r in results
+        ],
+        customdata=[[r["kind"], r["share"]] for r in results],
+        hovertemplate="%{y}<br>%{x:+,.0f} € · %{customdata[1]:+.1%}"
+                      "<extra>%{customdata[0]}</extra>",
+    ))
+    fig.update_layout(**_base_layout(
+        COLORS["bg_card"], title,
+        extra=dict(
+            xaxis=_loan_axis("Perte / gain (€)", ticksuffix=" €"),
+            yaxis=_loan_axis(""),
+            showlegend=False,
+        ),
+    ))
+    return fig
+
+
+# ─── Figures initiales (cache) ─────────────────────────────────────────────────
+# Figures sans données utilisateur affichées avant le premier callback.
+# Construites au premier rendu de la page puis servies depuis le cache :
+# un worker fraîchement lancé ne les calcule qu'une seule fois.
+
+_DEFAULT_FIGURE_BUILDERS = {
+    "pdf":           lambda: build_pdf_figure(),
+    "projection":    lambda: build_projection_figure(None, 3, 20),
+    "tornado":       lambda: build_tornado_figure(),
+    "sensitivity":   lambda: build_sensitivity_heatmap_figure(),
+    "percentile":    lambda: build_percentile_figure(),
+    "sankey":        lambda: build_sankey_figure(2800),
+    "total":         lambda: build_total_figure(),
+    "scenarios":     lambda: build_scenarios_figure(),
+    "amortization":  lambda: build_amortization_figure(200_000, 3.5, 25, 0.30),
+    "loan_grid":     lambda: build_loan_grid_figure(200_000, 3.5, 25, 0.30),
+    "property":      lambda: build_property_figure(),
+    "rental_tax":    lambda: build_rental_tax_figure(),
+    "capital_gains": lambda: build_capital_gains_figure(),
+    "refi_frontier": lambda: build_refinancing_figure(),
+    "portfolio":     lambda: build_portfolio_figure(),
+    "dca_heatmap":   lambda: build_dca_heatmap_figure(),
+    "dca_bands":     lambda: build_dca_bands_figure(),
+    "correlation":   lambda: build_correlation_figure(),
+    "allocation":    lambda: build_allocation_figure(),
+    "stress":        lambda: build_stress_figure(),
+}
+
+
+@lru_cache(maxsize=None)
+def default_figure(name: str) -> go.Figure:
+    """Figure initiale `name` (voir _DEFAULT_FIGURE_BUILDERS) — à ne pas muter."""
+    return _DEFAULT_FIGURE_BUILDERS[name]()
@@ -0,0 +1,175 @@
+"""
+http_cache.py
+=============
+Compression négociée et validateurs de cache HTTP pour le serveur Flask de Dash.
+
+Un hook `after_request` traite toutes les réponses :
+
+  - ETag : le layout initial (/_dash-layout), la page d'index et
+    /_dash-dependencies reçoivent un ETag calculé sur le contenu et
+    `Cache-Control: no-cache` ; une requête `If-None-Match` correspondante
+    reçoit un 304 sans corps. Les fichiers /assets/ empreints (?m=…) sont
+    mis en cache un an, comme les bundles JS déjà empreints par Dash.
+  - Compression : au-delà de COMPRESS_MIN_BYTES, les réponses textuelles
+    (JSON des callbacks, HTML, JS, CSS) sont compressées en brotli si le
+    client l'accepte et que le module `brotli` est installé, sinon en gzip.
+    Les corps statiques (ETag ou URL empreinte) compressés sont gardés en
+    mémoire pour ne pas recompresser plotly.js à chaque chargement.
+"""
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+from config import COMPRESS_BROTLI_QUALITY, COMPRESS_GZIP_LEVEL, COMPRESS_MIN_BYTES
+
+try:
+    import brotli
+except ImportError:   # dépendance optionnelle : gzip seul
+    brotli = None
+
+_COMPRESSIBLE = ("application/json", "application/javascript", "text/")
+
+# Routes dont le corps est déterministe pour un process donné
+_REVALIDATED_PATHS = ("/_dash-layout", "/_dash-dependencies")
+
+_STATIC_CACHE_SIZE = 64
+
+
+class _CompressedCache:
+    """LRU (etag, encodage) → corps compressé, pour les réponses statiques."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def set(self, key, data: bytes) -> None:
+        with self._lock:
+            self._entries[key] = data
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_STATIC = _CompressedCache(_STATIC_CACHE_SIZE)
+
+
+# ─── Négociation ──────────────────────────────────────────────────────────────
+
+def _accepted_encodings(header: str) -> set[str]:
+    """Encodages acceptés par le client (q=0 exclu)."""
+    accepted = set()
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        for p in params.split(";"):
+            name, _, value = p.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if token and q > 0:
+            accepted.add(token.lower())
+    return accepted
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    accepted = _accepted_encodings(accept_encoding or "")
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0)
+
+
+# ─── Hook Flask ───────────────────────────────────────────────────────────────
+
+def _is_compressible(response) -> bool:
+    mimetype = response.mimetype or ""
+    return (
+        mimetype.startswith(_COMPRESSIBLE)
+        and "Content-Encoding" not in response.headers
+        and not response.direct_passthrough
+        and not response.is_streamed
+        and 200 <= response.status_code < 300
+        and response.status_code != 204
+    )
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return f'"{etag}"' in tags or "*" in tags
+
+
+def register_http_caching(server) -> None:
+    """Installe compression et validateurs de cache sur le serveur Flask."""
+    from flask import request
+
+    @server.after_request
+    def _compress_and_validate(response):
+        path = request.path
+
+        # Fichiers /assets/ empreints par Dash (?m=<mtime>) : immuables
+        if path.startswith("/assets/") and "m" in request.args and response.status_code == 200:
+            response.cache_control.public  = True
+            response.cache_control.max_age = 31_536_000
+
+        if not _is_compressible(response):
+            return response
+
+        # ETag sur le contenu pour les réponses déterministes (layout, index…)
+        revalidate = request.method == "GET" and (
+            path in _REVALIDATED_PATHS or response.mimetype == "text/html"
+        )
+        etag, _ = response.get_etag()
+        if revalidate and etag is None:
+            etag = hashlib.sha1(response.get_data()).hexdigest()
+            response.cache_control.no_cache = True
+
+        # Réponse négociée selon Accept-Encoding, quelle que soit l'issue (304,
+        # corps trop court, identité) : les caches partagés doivent le savoir
+        response.vary.add("Accept-Encoding")
+        data = response.get_data()
+        encoding = choose_encoding(request.headers.get("Accept-Encoding", ""))
+        if len(data) < COMPRESS_MIN_BYTES:
+            encoding = None
+        variant_etag = f"{etag}-{encoding}" if etag and encoding else etag
+
+        if variant_etag is not None:
+            response.set_etag(variant_etag)
+            if _matches(request.headers.get("If-None-Match", ""), variant_etag):
+                response.status_code = 304
+                response.set_data(b"")
+                response.headers.pop("Content-Length", None)
+                return response
+
+        if encoding is None:
+            return response
+
+        # Corps statique : identifié par son ETag, ou par son URL empreinte
+        immutable = (response.cache_control.max_age or 0) >= 86_400
+        static_key = variant_etag or (request.full_path if immutable else None)
+        cached = _STATIC.get((static_key, encoding)) if static_key else None
+        if cached is None:
+            cached = compress(data, encoding)
+            if static_key:
+                _STATIC.set((static_key, encoding), cached)
+
+        response.set_data(cached)
+        response.headers["Content-Encoding"] = encoding
+        return response
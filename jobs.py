@@ -0,0 +1,78 @@
+"""
+jobs.py
+=======
+Callbacks en arrière-plan pour les calculs lourds.
+
+`@background_callback(...)` s'utilise comme `dash.callback`. Lorsque le mode
+arrière-plan est actif (PATRIMOINE_BACKGROUND=1 et `diskcache` installé), le
+calcul est exécuté hors du thread de requête via le DiskcacheManager de Dash :
+la file d'attente et les résultats vivent dans un cache disque local
+(BACKGROUND_CACHE_DIR), sans broker externe.
+
+  - progression : la fonction reçoit `set_progress` en premier argument ;
+  - annulation  : si les entrées changent pendant le calcul (nouveau
+    mouvement de slider), le navigateur relance le callback et Dash
+    interrompt le job précédent, devenu obsolète.
+
+Sans gestionnaire disponible, le callback reste synchrone et `set_progress`
+est un no-op : la fonction décorée s'écrit de la même façon dans les deux cas.
+
+En mode arrière-plan, la fonction s'exécute dans les process workers du
+DiskcacheManager : les décorateurs qu'elle porte (`@memoize`, `@instrument`)
+y gardent leur cache et leurs mesures. Le cache du process principal et
+l'endpoint /metrics ne voient donc pas ces appels ; le cache mémoïsé reste
+utile d'un job à l'autre au sein d'un même worker.
+"""
+
+from functools import wraps
+
+from dash import callback
+
+from config import BACKGROUND_CACHE_DIR, BACKGROUND_ENABLED, BACKGROUND_INTERVAL_MS
+
+
+def _build_manager():
+    if not BACKGROUND_ENABLED:
+        return None
+    try:
+        import diskcache
+        from dash import DiskcacheManager
+    except ImportError:
+        return None
+    return DiskcacheManager(diskcache.Cache(BACKGROUND_CACHE_DIR))
+
+
+BACKGROUND_MANAGER = _build_manager()
+
+
+def _ignore_progress(*_):
+    pass
+
+
+def background_callback(*args, progress=None, running=None, cancel=None, **kwargs):
+    """
+    Déclare un callback exécuté en arrière-plan si possible, sinon synchrone.
+
+    progress : Output(s) mis à jour par `set_progress(valeur)` pendant le calcul.
+    running  : liste de (Output, valeur pendant, valeur après) comme dans Dash.
+    cancel   : Input(s) supplémentaires qui annulent le job en cours.
+    """
+    def decorator(func):
+        if BACKGROUND_MANAGER is None:
+            @wraps(func)
+            def synchronous(*cb_args, **cb_kwargs):
+                return func(_ignore_progress, *cb_args, **cb_kwargs)
+            return callback(*args, **kwargs)(synchronous)
+
+        return callback(
+            *args,
+            background=True,
+            manager=BACKGROUND_MANAGER,
+            progress=progress,
+            running=running,
+            cancel=cancel,
+            interval=BACKGROUND_INTERVAL_MS,
+            **kwargs,
+        )(func)
+
+    return decorator
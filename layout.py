@@ -7,7 +7,10 @@ Corrections & nouveautés :
 - Source INSEE : html.Div en bas à droite du container (hors figure Plotly)
 - Éditeur budget avec renommer / supprimer / créer catégories et sous-catégories
 - Bouton sauvegarde CSV dans l'en-tête
-- Onglets Immobilier / Investissement avec contenu descriptif détaillé
+- Onglet Immobilier : parc, simulation de crédit, revenus locatifs et fiscalité
+- Onglet Investissement : transactions, positions et performance (TWR / MWR)
+- Les trois onglets sont montés une seule fois ; le changement d'onglet ne
+  fait que basculer leur visibilité côté navigateur (callbacks.py)
 """
 
 from dash import html, dcc, dash_table
@@ -15,12 +18,15 @@ from dash import html, dcc, dash_table
 from config import (
     COLORS, INITIAL_DATA, TABLE_COLS,
     TABLE_STYLE_CELL, TABLE_STYLE_HEADER, TABLE_STYLE_DATA_COND,
-    TAB_STYLE, TAB_SELECTED, LABEL_STYLE, VALUE_STYLE, card, CURRENT_YEAR,
-)
-from figures import (
-    build_pdf_figure, build_projection_figure, build_total_figure,
-    build_sankey_figure, _DEFAULT_BUDGET, _CATEGORY_COLORS,
+    TAB_STYLE, TAB_SELECTED, LABEL_STYLE, VALUE_STYLE, INPUT_STYLE, card, CURRENT_YEAR,
+    INITIAL_PROPERTIES, PROPERTY_COLS, PROPERTY_MAX_HORIZON, PROPERTY_ZONES, ZONE_COLS,
+    RENTAL_COLS, DCA_MAX_HORIZON, INITIAL_TRANSACTIONS, INVEST_ACCOUNTS, QUOTE_COLS, TRANSACTION_COLS,
+    TRANSACTION_TYPES, RISK_LEVELS, ALLOCATION_DIMENSIONS, ASSET_CLASSES, GEO_ZONES,
+    INITIAL_ALLOCATION_TARGETS, TARGET_COLS, STRESS_FACTORS,
+    SALARY_GROWTH_RANGE, SALARY_HORIZON_RANGE, SALARY_CONFIDENCE_RANGE,
+    DEFLATOR_INFLATION, DEFLATOR_VIEWS, PERCENTILE_POPULATIONS, PAYROLL_VIEWS, SALARY_BASES,
 )
+from figures import default_figure, _DEFAULT_BUDGET, _CATEGORY_COLORS
 
 _CATEGORY_COLOR_MAP = _CATEGORY_COLORS
 
@@ -52,13 +58,17 @@ INDEX_STRING = """<!DOCTYPE html>
             box-shadow: 0 0 0 4px rgba(59,130,246,0.25) !important;
         }
         .rc-slider-rail { background: #1e2d40 !important; }
+        #salary-progress {
+            width: 100%; height: 3px; border: none; margin-bottom: 6px;
+            accent-color: #3B82F6; background: #1e2d40;
+        }
         .dash-tab { transition: color 0.2s ease; }
         .dash-tab:hover { color: #94A3B8 !important; }
         @keyframes fadeUp {
             from { opacity: 0; transform: translateY(8px); }
             to   { opacity: 1; transform: translateY(0); }
         }
-        #tab-content { animation: fadeUp 0.25s ease; }
+        .tab-panel { animation: fadeUp 0.25s ease; }
         body::before {
             content: ''; position: fixed; top: 0; left: 0; right: 0; height: 1px;
             background: linear-gradient(90deg, transparent, #3B82F6, #F59E0B, transparent);
@@ -110,32 +120,87 @@ def _slider(sid, mn, mx, step, val, marks_dict, label, width="260px"):
     ], style={"width": width})
 
 
-# ─── Feature card (onglets À venir) ───────────────────────────────────────────
+def _number_input(sid, label, value, step, width="150px"):
+    return html.Div([
+        html.Div(label, style={**LABEL_STYLE, "marginBottom": "4px"}),
+        dcc.Input(id=sid, type="number", value=value, step=step, min=0,
+                  debounce=True, style={**INPUT_STYLE, "width": width}),
+    ])
 
-def _feature_item(title, desc, color):
-    return html.Div(
-        style={
-            "padding": "14px 16px",
-            "backgroundColor": COLORS["bg_surface"],
-            "borderRadius": "10px",
-            "border": f"1px solid {COLORS['border']}",
-            "borderLeft": f"3px solid {color}",
-        },
-        children=[
-            html.Div(title, style={
-                "color": COLORS["text_primary"], "fontSize": "13px",
-                "fontWeight": "600", "fontFamily": "Syne, sans-serif", "marginBottom": "4px",
-            }),
-            html.Div(desc, style={
-                "color": COLORS["text_muted"], "fontSize": "11px",
-                "fontFamily": "DM Mono, monospace", "lineHeight": "1.5",
-            }),
-        ],
-    )
+
+def _kpi(label, value_id, color):
+    return html.Div(style={"flex": "1", "minWidth": "160px"}, children=[
+        html.Div(label, style=LABEL_STYLE),
+        html.Div(id=value_id, style={**VALUE_STYLE, "fontSize": "22px", "color": color}),
+    ])
 
 
 # ─── Onglet Salaire ────────────────────────────────────────────────────────────
 
+def _scenario_panel():
+    return html.Div(style=card({"marginBottom": "16px"}), children=[
+        dcc.Store(id="scenario-store", data=[]),
+        html.Div(
+            style={"display": "flex", "justifyContent": "space-between",
+                   "alignItems": "flex-end", "marginBottom": "16px",
+                   "flexWrap": "wrap", "gap": "14px"},
+            children=[
+                html.Div([
+                    html.Div("Comparaison de scénarios", style=LABEL_STYLE),
+                    html.Div(
+                        "Historique, projection et budget figés sous un nom · "
+                        "la colonne « Actuel » suit les réglages en cours",
+                        style={"color": COLORS["text_muted"], "fontSize": "10px",
+                               "fontFamily": "DM Mono, monospace"},
+                    ),
+                ]),
+                html.Div(
+                    style={"display": "flex", "gap": "10px", "alignItems": "flex-end",
+                           "flexWrap": "wrap"},
+                    children=[
+                        html.Div([
+                            html.Div("Nom du scénario", style={**LABEL_STYLE, "marginBottom": "4px"}),
+                            dcc.Input(id="scenario-name", type="text", placeholder="ex : Promotion 2027",
+                                      style={**INPUT_STYLE, "width": "180px"}),
+                        ]),
+                        html.Button("+ Enregistrer", id="btn-save-scenario",
+                                    className="btn-budget", n_clicks=0),
+                        html.Div([
+                            html.Div("Scénarios comparés", style={**LABEL_STYLE, "marginBottom": "4px"}),
+                            dcc.Dropdown(id="scenario-select", multi=True, value=[], options=[],
+                                         style={"width": "320px", "fontSize": "12px"}),
+                        ]),
+                        html.Button("Supprimer la sélection", id="btn-delete-scenarios",
+                                    className="btn-budget", n_clicks=0),
+                        html.Div(id="scenario-feedback", style={
+                            "fontSize": "11px", "fontFamily": "DM Mono, monospace",
+                            "paddingBottom": "9px",
+                        }),
+                    ],
+                ),
+            ],
+        ),
+        html.Div(
+            style={"display": "flex", "gap": "16px", "alignItems": "flex-start"},
+            children=[
+                html.Div(style={"width": "45%", "overflowX": "auto"}, children=[
+                    dash_table.DataTable(
+                        id="table-scenarios", data=[], columns=[],
+                        style_cell=TABLE_STYLE_CELL, style_header=TABLE_STYLE_HEADER,
+                        style_data_conditional=TABLE_STYLE_DATA_COND,
+                    ),
+                ]),
+                html.Div(style={"flex": "1"}, children=[
+                    dcc.Graph(
+                        id="graph-scenarios", figure=default_figure("scenarios"),
+                        style={"height": "340px"}, config={"displayModeBar": False},
+                    ),
+                ]),
+            ],
+        ),
+    ])
+
+
 def _tab_salaire():
     return html.Div([
 
@@ -155,6 +220,8 @@ def _tab_salaire():
                             dash_table.DataTable(
                                 id="table-salary",
                                 data=INITIAL_DATA, columns=TABLE_COLS,
+                                dropdown={"Base": {"options": [{"label": b, "value": b}
+                                                               for b in SALARY_BASES]}},
                                 editable=True, row_deletable=True,
                                 style_table={"height": "200px", "overflowY": "auto"},
                                 style_cell=TABLE_STYLE_CELL,
@@ -187,7 +254,7 @@ def _tab_salaire():
                     html.Div("Position relative dans la distribution nationale",
                              style=LABEL_STYLE),
                     dcc.Graph(
-                        id="graph-pdf", figure=build_pdf_figure(),
+                        id="graph-pdf", figure=default_figure("pdf"),
                         style={"height": "calc(33vh + 60px)"},
                         config={"displayModeBar": False},
                     ),
@@ -219,25 +286,128 @@ def _tab_salaire():
                         style={"display": "flex", "gap": "24px",
                                "alignItems": "flex-end", "flexWrap": "wrap"},
                         children=[
-                            _slider("slider-growth", -5, 15, 0.5, 3,
+                            _slider("slider-growth", *SALARY_GROWTH_RANGE, 3,
                                     {i: f"{i}%" for i in range(-5, 16, 5)},
                                     "Taux annuel projeté", "280px"),
-                            _slider("slider-horizon", 1, 40, 1, 20,
+                            _slider("slider-horizon", *SALARY_HORIZON_RANGE, 20,
                                     {i: str(i) for i in [1, 10, 20, 30, 40]},
                                     "Horizon (années)", "240px"),
-                            _slider("slider-confidence", 0, 30, 1, 5,
+                            _slider("slider-confidence", *SALARY_CONFIDENCE_RANGE, 5,
                                     {i: f"±{i}%" for i in [0, 10, 20, 30]},
                                     "Intervalle de confiance (%/an)", "240px"),
+                            html.Div([
+                                html.Div("Affichage", style={**LABEL_STYLE, "marginBottom": "4px"}),
+                                dcc.RadioItems(
+                                    id="projection-view", value="nominal",
+                                    options=[{"label": v, "value": k}
+                                             for k, v in DEFLATOR_VIEWS.items()],
+                                    inline=True,
+                                    labelStyle={"marginRight": "12px", "fontSize": "11px",
+                                                "color": COLORS["text_secondary"],
+                                                "fontFamily": "DM Mono, monospace"},
+                                ),
+                            ]),
+                            _number_input("projection-inflation", "Inflation (%/an)",
+                                          DEFLATOR_INFLATION, 0.1, "90px"),
+                            html.Div([
+                                html.Div("Montants", style={**LABEL_STYLE, "marginBottom": "4px"}),
+                                dcc.RadioItems(
+                                    id="projection-basis", value="net",
+                                    options=[{"label": v, "value": k}
+                                             for k, v in PAYROLL_VIEWS.items()],
+                                    inline=True,
+                                    labelStyle={"marginRight": "12px", "fontSize": "11px",
+                                                "color": COLORS["text_secondary"],
+                                                "fontFamily": "DM Mono, monospace"},
+                                ),
+                            ]),
+                            _number_input("projection-parts", "Parts fiscales", 1, 0.5, "80px"),
                         ],
                     ),
                 ],
             ),
+            # Progression du calcul (visible uniquement en mode arrière-plan)
+            html.Progress(id="salary-progress", value="0", max="3",
+                          style={"display": "none"}),
             dcc.Graph(
-                id="graph-projection", figure=build_projection_figure(None, 3, 20),
+                id="graph-projection", figure=default_figure("projection"),
                 style={"height": "300px"}, config={"displayModeBar": False},
             ),
         ]),
 
+        # ── PERCENTILE AU FIL DU TEMPS ────────────────────────────────────────
+        html.Div(style=card({"marginBottom": "16px"}), children=[
+            html.Div(
+                style={"display": "flex", "justifyContent": "space-between",
+                       "alignItems": "flex-end", "marginBottom": "12px",
+                       "flexWrap": "wrap", "gap": "12px"},
+                children=[
+                    html.Div([
+                        html.Div("Percentile au fil du temps", style=LABEL_STYLE),
+                        html.Div(
+                            "Chaque année classée dans la distribution INSEE de son année · "
+                            "au-delà, distribution indexée sur le salaire moyen",
+                            style={"color": COLORS["text_muted"], "fontSize": "10px",
+                                   "fontFamily": "DM Mono, monospace"},
+                        ),
+                    ]),
+                    dcc.RadioItems(
+                        id="percentile-sex", value="E",
+                        options=[{"label": v, "value": k}
+                                 for k, v in PERCENTILE_POPULATIONS.items()],
+                        inline=True,
+                        labelStyle={"marginRight": "12px", "fontSize": "11px",
+                                    "color": COLORS["text_secondary"],
+                                    "fontFamily": "DM Mono, monospace"},
+                    ),
+                ],
+            ),
+            dcc.Graph(
+                id="graph-percentile", figure=default_figure("percentile"),
+                style={"height": "280px"}, config={"displayModeBar": False},
+            ),
+        ]),
+
+        # ── SENSIBILITÉ ───────────────────────────────────────────────────────
+        html.Div(style=card({"marginBottom": "16px"}), children=[
+            html.Div([
+                html.Div("Sensibilité de la projection", style=LABEL_STYLE),
+                html.Div(
+                    "Salaire final précalculé sur toute la grille des réglages · "
+                    "bornes : taux ± intervalle",
+                    style={"color": COLORS["text_muted"], "fontSize": "10px",
+                           "fontFamily": "DM Mono, monospace", "marginBottom": "16px"},
+                ),
+            ]),
+            html.Div(
+                style={"display": "flex", "gap": "16px", "flexWrap": "wrap",
+                       "marginBottom": "12px"},
+                children=[
+                    _kpi("Salaire final · central", "sensitivity-central-display",
+                         COLORS["secondary"]),
+                    _kpi("Borne basse", "sensitivity-low-display", COLORS["danger"]),
+                    _kpi("Borne haute", "sensitivity-high-display", COLORS["success"]),
+                ],
+            ),
+            html.Div(
+                style={"display": "flex", "gap": "16px", "alignItems": "flex-start"},
+                children=[
+                    html.Div(style={"width": "45%"}, children=[
+                        dcc.Graph(
+                            id="graph-tornado", figure=default_figure("tornado"),
+                            style={"height": "300px"}, config={"displayModeBar": False},
+                        ),
+                    ]),
+                    html.Div(style={"flex": "1"}, children=[
+                        dcc.Graph(
+                            id="graph-sensitivity", figure=default_figure("sensitivity"),
+                            style={"height": "300px"}, config={"displayModeBar": False},
+                        ),
+                    ]),
+                ],
+            ),
+        ]),
+
         # ── FLUX BUDGÉTAIRE ───────────────────────────────────────────────────
         html.Div(style=card({"marginBottom": "16px"}), children=[
 
@@ -286,7 +456,7 @@ def _tab_salaire():
                     html.Div(id="budget-editor-container", style={"width": "32%"}),
                     html.Div(style={"flex": "1"}, children=[
                         dcc.Graph(
-                            id="graph-sankey", figure=build_sankey_figure(2800),
+                            id="graph-sankey", figure=default_figure("sankey"),
                             style={"height": "420px"}, config={"displayModeBar": False},
                         ),
                     ]),
@@ -299,119 +469,711 @@ def _tab_salaire():
                 "color": COLORS["text_muted"],
             }),
         ]),
+
+        # ── SCÉNARIOS ─────────────────────────────────────────────────────────
+        _scenario_panel(),
     ])
 
 
 # ─── Onglet Immobilier ────────────────────────────────────────────────────────
 
+def _loan_simulator(color):
+    return html.Div(style=card({"marginBottom": "16px"}), children=[
+        html.Div(
+            style={"display": "flex", "justifyContent": "space-between",
+                   "alignItems": "flex-end", "marginBottom": "16px",
+                   "flexWrap": "wrap", "gap": "14px"},
+            children=[
+                html.Div("Simulation de crédit", style=LABEL_STYLE),
+                html.Div(
+                    style={"display": "flex", "gap": "14px",
+                           "alignItems": "flex-end", "flexWrap": "wrap"},
+                    children=[
+                        _number_input("loan-principal", "Capital emprunté (€)", 200_000, 1000),
+                        _number_input("loan-rate", "Taux nominal (%)", 3.5, 0.05, "110px"),
+                        _number_input("loan-years", "Durée (années)", 25, 1, "110px"),
+                        _number_input("loan-insurance", "Assurance (%)", 0.30, 0.01, "110px"),
+                    ],
+                ),
+            ],
+        ),
+        html.Div(
+            style={"display": "flex", "gap": "16px", "flexWrap": "wrap",
+                   "marginBottom": "12px"},
+            children=[
+                _kpi("Mensualité (hors assurance)", "loan-monthly-display", color),
+                _kpi("Coût total des intérêts", "loan-interest-display", COLORS["text_primary"]),
+                _kpi("Coût total de l'assurance", "loan-insurance-display", COLORS["text_primary"]),
+            ],
+        ),
+        html.Div(
+            style={"display": "flex", "gap": "16px", "alignItems": "flex-start"},
+            children=[
+                html.Div(style={"width": "58%"}, children=[
+                    dcc.Graph(
+                        id="graph-amortization", figure=default_figure("amortization"),
+                        style={"height": "340px"}, config={"displayModeBar": False},
+                    ),
+                ]),
+                html.Div(style={"flex": "1"}, children=[
+                    dcc.Graph(
+                        id="graph-loan-grid", figure=default_figure("loan_grid"),
+                        style={"height": "340px"}, config={"displayModeBar": False},
+                    ),
+                ]),
+            ],
+        ),
+    ])
+
+
+def _property_inventory(color):
+    table_style = dict(
+        editable=True, row_deletable=True,
+        style_cell=TABLE_STYLE_CELL, style_header=TABLE_STYLE_HEADER,
+        style_data_conditional=TABLE_STYLE_DATA_COND,
+    )
+    return html.Div(style=card({"marginBottom": "16px"}), children=[
+        html.Div(
+            style={"display": "flex", "justifyContent": "space-between",
+                   "alignItems": "flex-end", "marginBottom": "16px",
+                   "flexWrap": "wrap", "gap": "14px"},
+            children=[
+                html.Div([
+                    html.Div("Parc immobilier", style=LABEL_STYLE),
+                    html.Div(
+                        "Valeur projetée par zone · enveloppe pessimiste / optimiste",
+                        style={"color": COLORS["text_muted"], "fontSize": "10px",
+                               "fontFamily": "DM Mono, monospace"},
+                    ),
+                ]),
+                _slider("slider-property-horizon", 5, PROPERTY_MAX_HORIZON, 1, 20,
+                        {i: str(i) for i in range(10, PROPERTY_MAX_HORIZON + 1, 10)},
+                        "Horizon (années)", "260px"),
+            ],
+        ),
+        html.Div(
+            style={"display": "flex", "gap": "16px", "flexWrap": "wrap",
+                   "marginBottom": "12px"},
+            children=[
+                _kpi("Valeur du parc", "property-value-display", color),
+                _kpi("Capital restant dû", "property-debt-display", COLORS["danger"]),
+                _kpi("Valeur nette", "property-equity-display", COLORS["success"]),
+            ],
+        ),
+        html.Div(
+            style={"display": "flex", "gap": "16px", "alignItems": "flex-start"},
+            children=[
+                html.Div(style={"width": "46%", "display": "flex",
+                                "flexDirection": "column", "gap": "12px"}, children=[
+                    dash_table.DataTable(
+                        id="table-properties", data=INITIAL_PROPERTIES,
+                        columns=PROPERTY_COLS,
+                        dropdown={"Zone": {"options": [
+                            {"label": z, "value": z} for z in PROPERTY_ZONES
+                        ]}},
+                        style_table={"overflowX": "auto"},
+                        **table_style,
+                    ),
+                    html.Button("+ Ajouter un bien", id="btn-add-property",
+                                className="btn-budget", n_clicks=0,
+                                style={"alignSelf": "flex-start"}),
+                    html.Div("Hypothèses par zone", style={**LABEL_STYLE, "marginTop": "6px"}),
+                    dash_table.DataTable(
+                        id="table-zones", columns=ZONE_COLS,
+                        data=[{"Zone": z, "Taux": t} for z, t in PROPERTY_ZONES.items()],
+                        **table_style,
+                    ),
+                ]),
+                html.Div(style={"flex": "1"}, children=[
+                    dcc.Graph(
+                        id="graph-property-projection", figure=default_figure("property"),
+                        style={"height": "420px"}, config={"displayModeBar": False},
+                    ),
+                ]),
+            ],
+        ),
+    ])
+
+
+def _refinancing_panel(color):
+    return html.Div(style=card({"marginBottom": "16px"}), children=[
+        html.Div(
+            style={"display": "flex", "justifyContent": "space-between",
+                   "alignItems": "flex-end", "marginBottom": "16px",
+                   "flexWrap": "wrap", "gap": "14px"},
+            children=[
+                html.Div([
+                    html.Div("Rachat de crédit", style=LABEL_STYLE),
+                    html.Div(
+                        "Prêt actuel : paramètres de la simulation ci-dessus · "
+                        "mensualité plafonnée à la mensualité actuelle",
+                        style={"color": COLORS["text_muted"], "fontSize": "10px",
+                               "fontFamily": "DM Mono, monospace"},
+                    ),
+                ]),
+                html.Div(
+                    style={"display": "flex", "gap": "14px",
+                           "alignItems": "flex-end", "flexWrap": "wrap"},
+                    children=[
+                        _number_input("loan-elapsed", "Échéances déjà payées", 36, 1, "130px"),
+                        _number_input("refi-rate", "Taux proposé (%)", 3.0, 0.05, "110px"),
+                        _number_input("refi-fees", "Frais du rachat (€)", 2_000, 100, "130px"),
+                    ],
+                ),
+            ],
+        ),
+        html.Div(id="refi-best-display", style={
+            "color": COLORS["text_secondary"], "fontSize": "12px",
+            "fontFamily": "DM Mono, monospace", "lineHeight": "1.7",
+            "marginBottom": "10px", "borderLeft": f"3px solid {color}",
+            "paddingLeft": "14px",
+        }),
+        dcc.Graph(
+            id="graph-refi-frontier", figure=default_figure("refi_frontier"),
+            style={"height": "340px"}, config={"displayModeBar": False},
+        ),
+    ])
+
+
+def _rental_analysis(color):
+    return html.Div(style=card({"marginBottom": "16px"}), children=[
+        html.Div(
+            style={"display": "flex", "justifyContent": "space-between",
+                   "alignItems": "flex-end", "marginBottom": "16px",
+                   "flexWrap": "wrap", "gap": "14px"},
+            children=[
+                html.Div([
+                    html.Div("Revenus locatifs & fiscalité", style=LABEL_STYLE),
+                    html.Div(
+                        "Micro-foncier ou réel · impôt de plus-value selon l'année de revente",
+                        style={"color": COLORS["text_muted"], "fontSize": "10px",
+                               "fontFamily": "DM Mono, monospace"},
+                    ),
+                ]),
+                html.Div(
+                    style={"display": "flex", "gap": "14px", "alignItems": "flex-end"},
+                    children=[
+                        _number_input("rental-income", "Revenu imposable du foyer (€)",
+                                      40_000, 1000, "170px"),
+                        _number_input("rental-parts", "Parts fiscales", 1, 0.5, "100px"),
+                        html.Div(id="rental-tmi-display", style={
+                            "color": COLORS["text_secondary"], "fontSize": "11px",
+                            "fontFamily": "DM Mono, monospace", "paddingBottom": "9px",
+                        }),
+                    ],
+                ),
+            ],
+        ),
+        html.Div(
+            style={"display": "flex", "gap": "16px", "alignItems": "flex-start",
+                   "marginBottom": "12px"},
+            children=[
+                html.Div(style={"width": "55%", "display": "flex",
+                                "flexDirection": "column", "gap": "12px"}, children=[
+                    dash_table.DataTable(
+                        id="table-rentals", data=[], columns=RENTAL_COLS,
+                        editable=True, row_deletable=True,
+                        style_table={"overflowX": "auto"},
+                        style_cell=TABLE_STYLE_CELL, style_header=TABLE_STYLE_HEADER,
+                        style_data_conditional=TABLE_STYLE_DATA_COND,
+                    ),
+                    html.Button("+ Ajouter un bien loué", id="btn-add-rental",
+                                className="btn-budget", n_clicks=0,
+                                style={"alignSelf": "flex-start"}),
+                ]),
+                html.Div(style={"flex": "1"}, children=[
+                    dash_table.DataTable(
+                        id="table-rental-yields", data=[],
+                        columns=[{"name": n, "id": n} for n in
+                                 ("Bien", "Brut", "Net", "Net-net")],
+                        style_cell=TABLE_STYLE_CELL, style_header=TABLE_STYLE_HEADER,
+                        style_data_conditional=TABLE_STYLE_DATA_COND,
+                    ),
+                ]),
+            ],
+        ),
+        html.Div(
+            style={"display": "flex", "gap": "16px", "alignItems": "flex-start"},
+            children=[
+                html.Div(style={"width": "50%"}, children=[
+                    dcc.Graph(
+                        id="graph-rental-tax", figure=default_figure("rental_tax"),
+                        style={"height": "320px"}, config={"displayModeBar": False},
+                    ),
+                ]),
+                html.Div(style={"flex": "1"}, children=[
+                    dcc.Graph(
+                        id="graph-capital-gains", figure=default_figure("capital_gains"),
+                        style={"height": "320px"}, config={"displayModeBar": False},
+                    ),
+                ]),
+            ],
+        ),
+    ])
+
+
 def _tab_immobilier():
     color = "#F59E0B"
-    features = [
-        ("Inventaire de biens",
-         "Ajoutez vos propriétés (résidence principale, investissements locatifs) avec "
-         "leur valeur d'acquisition, date d'achat et valeur estimée actuelle."),
-        ("Simulation de crédit",
-         "Renseignez votre emprunt (capital, taux, durée) pour visualiser l'amortissement, "
-         "le coût total des intérêts et le capital restant dû année par année."),
-        ("Revenus locatifs",
-         "Suivez vos loyers mensuels, charges déductibles et taux d'occupation "
-         "pour calculer la rentabilité nette de chaque bien."),
-        ("Évolution du parc immobilier",
-         "Projection de la valeur de vos biens avec hypothèses de revalorisation "
-         "annuelle personnalisables par zone géographique."),
-        ("Analyse fiscale",
-         "Estimation de l'imposition sur revenus fonciers, plus-values immobilières "
-         "et impact de la fiscalité sur votre rendement net après impôts."),
-    ]
-    return html.Div([html.Div(style=card({"minHeight": "50vh"}), children=[
-        html.Div(style={"display": "flex", "gap": "20px", "alignItems": "flex-start",
-                        "marginBottom": "28px"}, children=[
-            html.Div(style={"flex": "1"}, children=[
-                html.Div("Module Immobilier", style={
-                    **VALUE_STYLE, "color": color, "marginBottom": "8px",
-                }),
+    intro = html.Div(style=card({"marginBottom": "16px"}), children=[
+        html.Div("Module Immobilier", style={
+            **VALUE_STYLE, "color": color, "marginBottom": "8px",
+        }),
+        html.Div(
+            "Centralisez et analysez votre patrimoine immobilier. Suivez vos biens, "
+            "crédits et revenus locatifs pour piloter votre stratégie avec précision.",
+            style={"color": COLORS["text_secondary"], "fontSize": "13px",
+                   "fontFamily": "DM Mono, monospace", "lineHeight": "1.7",
+                   "maxWidth": "600px"},
+        ),
+    ])
+    return html.Div([
+        intro, _property_inventory(color), _loan_simulator(color),
+        _refinancing_panel(color), _rental_analysis(color),
+    ])
+
+
+# ─── Onglet Investissement ────────────────────────────────────────────────────
+
+def _portfolio_panel(color):
+    table_style = dict(
+        style_cell=TABLE_STYLE_CELL, style_header=TABLE_STYLE_HEADER,
+        style_data_conditional=TABLE_STYLE_DATA_COND,
+    )
+    return html.Div(style=card({"marginBottom": "16px"}), children=[
+        html.Div([
+            html.Div("Portefeuilles & performance", style=LABEL_STYLE),
+            html.Div(
+                "TWR : performance des titres, indépendante des apports · "
+                "MWR : rendement annualisé de vos flux (TRI)",
+                style={"color": COLORS["text_muted"], "fontSize": "10px",
+                       "fontFamily": "DM Mono, monospace", "marginBottom": "16px"},
+            ),
+        ]),
+        html.Div(
+            style={"display": "flex", "gap": "16px", "flexWrap": "wrap",
+                   "marginBottom": "12px"},
+            children=[
+                _kpi("Valeur actuelle", "portfolio-value-display", color),
+                _kpi("Capital net investi", "portfolio-invested-display",
+                     COLORS["text_secondary"]),
+                _kpi("Plus-value latente", "portfolio-gain-display", COLORS["secondary"]),
+                _kpi("TWR (cumulé)", "portfolio-twr-display", COLORS["accent"]),
+                _kpi("MWR (annualisé)", "portfolio-mwr-display", COLORS["accent"]),
+            ],
+        ),
+        html.Div(
+            style={"display": "flex", "gap": "16px", "alignItems": "flex-start",
+                   "marginBottom": "12px"},
+            children=[
+                html.Div(style={"width": "62%", "display": "flex",
+                                "flexDirection": "column", "gap": "12px"}, children=[
+                    dash_table.DataTable(
+                        id="table-transactions", data=INITIAL_TRANSACTIONS,
+                        columns=TRANSACTION_COLS, editable=True, row_deletable=True,
+                        dropdown={
+                            "Compte": {"options": [{"label": a, "value": a}
+                                                   for a in INVEST_ACCOUNTS]},
+                            "Type":   {"options": [{"label": t, "value": t}
+                                                   for t in TRANSACTION_TYPES]},
+                        },
+                        page_size=15, style_table={"overflowX": "auto"},
+                        **table_style,
+                    ),
+                    html.Button("+ Ajouter une transaction", id="btn-add-transaction",
+                                className="btn-budget", n_clicks=0,
+                                style={"alignSelf": "flex-start"}),
+                ]),
+                html.Div(style={"flex": "1", "display": "flex",
+                                "flexDirection": "column", "gap": "12px"}, children=[
+                    html.Div("Lignes : cours et classification", style=LABEL_STYLE),
+                    dash_table.DataTable(
+                        id="table-quotes", data=[], columns=QUOTE_COLS, editable=True,
+                        dropdown={
+                            "Classe": {"options": [{"label": c, "value": c}
+                                                   for c in ASSET_CLASSES]},
+                            "Zone":   {"options": [{"label": z, "value": z}
+                                                   for z in GEO_ZONES]},
+                        },
+                        style_table={"overflowX": "auto"}, **table_style,
+                    ),
+                    # Historique local (prices.py) : sert à valoriser chaque sous-période
+                    dcc.Store(id="prices-version"),
+                    dcc.Upload(
+                        id="upload-prices", multiple=True, accept=".csv,text/csv",
+                        children=html.Button("⇪ Importer un historique de cours (CSV)",
+                                             className="btn-budget"),
+                    ),
+                    html.Div(id="prices-import-feedback", style={
+                        "color": COLORS["text_muted"], "fontSize": "10px",
+                        "fontFamily": "DM Mono, monospace", "lineHeight": "1.6",
+                    }),
+                ]),
+            ],
+        ),
+        dash_table.DataTable(
+            id="table-portfolio-performance", data=[],
+            columns=[{"name": n, "id": n} for n in
+                     ("Série", "Valeur", "Investi", "Dividendes", "TWR", "MWR")],
+            style_table={"overflowX": "auto", "marginBottom": "12px"},
+            **table_style,
+        ),
+        dcc.Graph(
+            id="graph-portfolio", figure=default_figure("portfolio"),
+            style={"height": "340px"}, config={"displayModeBar": False},
+        ),
+    ])
+
+
+def _dca_simulator(color):
+    return html.Div(style=card({"marginBottom": "16px"}), children=[
+        html.Div(
+            style={"display": "flex", "justifyContent": "space-between",
+                   "alignItems": "flex-end", "marginBottom": "16px",
+                   "flexWrap": "wrap", "gap": "14px"},
+            children=[
+                html.Div([
+                    html.Div("Simulation d'investissement", style=LABEL_STYLE),
+                    html.Div(
+                        "Apports mensuels (DCA) contre versement unique du même montant · "
+                        "hypothèse log-normale ou bootstrap d'un historique importé",
+                        style={"color": COLORS["text_muted"], "fontSize": "10px",
+                               "fontFamily": "DM Mono, monospace"},
+                    ),
+                ]),
                 html.Div(
-                    "Centralisez et analysez votre patrimoine immobilier. Suivez vos biens, "
-                    "crédits et revenus locatifs pour piloter votre stratégie avec précision.",
-                    style={"color": COLORS["text_secondary"], "fontSize": "13px",
-                           "fontFamily": "DM Mono, monospace", "lineHeight": "1.7",
-                           "maxWidth": "600px"},
+                    style={"display": "flex", "gap": "14px",
+                           "alignItems": "flex-end", "flexWrap": "wrap"},
+                    children=[
+                        _number_input("dca-monthly", "Apport mensuel (€)", 200, 50, "120px"),
+                        _number_input("dca-initial", "Capital initial (€)", 0, 1000, "120px"),
+                        _number_input("dca-return", "Rendement (%/an)", 6.0, 0.25, "110px"),
+                        _number_input("dca-volatility", "Volatilité (%/an)", 15.0, 1, "110px"),
+                        html.Div([
+                            html.Div("Rendements", style={**LABEL_STYLE, "marginBottom": "4px"}),
+                            dcc.Dropdown(
+                                id="dca-source", value="", clearable=False,
+                                options=[{"label": "Hypothèse saisie", "value": ""}],
+                                style={"width": "180px", "fontSize": "12px"},
+                            ),
+                        ]),
+                        _slider("dca-horizon", 1, DCA_MAX_HORIZON, 1, 20,
+                                {i: str(i) for i in range(10, DCA_MAX_HORIZON + 1, 10)},
+                                "Horizon (années)", "220px"),
+                    ],
                 ),
-            ]),
-            html.Div("À venir", style={
-                "backgroundColor": "rgba(245,158,11,0.12)",
-                "border": "1px solid rgba(245,158,11,0.3)",
-                "borderRadius": "20px", "padding": "4px 14px",
-                "color": color, "fontSize": "10px",
-                "fontFamily": "DM Mono, monospace", "fontWeight": "600",
-                "letterSpacing": "0.08em", "whiteSpace": "nowrap", "alignSelf": "flex-start",
-            }),
-        ]),
+            ],
+        ),
         html.Div(
-            style={"display": "grid",
-                   "gridTemplateColumns": "repeat(auto-fill, minmax(340px, 1fr))",
-                   "gap": "12px"},
-            children=[_feature_item(t, d, color) for t, d in features],
+            style={"display": "flex", "gap": "16px", "flexWrap": "wrap",
+                   "marginBottom": "12px"},
+            children=[
+                _kpi("DCA · capital médian", "dca-final-display", color),
+                _kpi("Versement unique · médian", "dca-lump-display", COLORS["secondary"]),
+                _kpi("Versement unique gagnant", "dca-lump-wins-display", COLORS["accent"]),
+            ],
+        ),
+        html.Div(
+            style={"display": "flex", "gap": "16px", "alignItems": "flex-start"},
+            children=[
+                html.Div(style={"width": "50%"}, children=[
+                    dcc.Graph(
+                        id="graph-dca-bands", figure=default_figure("dca_bands"),
+                        style={"height": "360px"}, config={"displayModeBar": False},
+                    ),
+                ]),
+                html.Div(style={"flex": "1"}, children=[
+                    dcc.Graph(
+                        id="graph-dca-heatmap", figure=default_figure("dca_heatmap"),
+                        style={"height": "360px"}, config={"displayModeBar": False},
+                    ),
+                ]),
+            ],
         ),
-    ])])
+    ])
 
 
-# ─── Onglet Investissement ────────────────────────────────────────────────────
+def _allocation_panel(color):
+    table_style = dict(
+        style_cell=TABLE_STYLE_CELL, style_header=TABLE_STYLE_HEADER,
+        style_data_conditional=TABLE_STYLE_DATA_COND,
+    )
+    return html.Div(style=card({"marginBottom": "16px"}), children=[
+        html.Div(
+            style={"display": "flex", "justifyContent": "space-between",
+                   "alignItems": "flex-end", "marginBottom": "16px",
+                   "flexWrap": "wrap", "gap": "14px"},
+            children=[
+                html.Div([
+                    html.Div("Allocation d'actifs", style=LABEL_STYLE),
+                    html.Div(
+                        "Classification saisie dans le tableau des lignes · "
+                        "rééquilibrage par classe d'actifs",
+                        style={"color": COLORS["text_muted"], "fontSize": "10px",
+                               "fontFamily": "DM Mono, monospace"},
+                    ),
+                ]),
+                html.Div(
+                    style={"display": "flex", "gap": "14px", "alignItems": "flex-end"},
+                    children=[
+                        html.Div([
+                            html.Div("Regrouper par", style={**LABEL_STYLE, "marginBottom": "4px"}),
+                            dcc.Dropdown(
+                                id="allocation-dimension", clearable=False,
+                                value=next(iter(ALLOCATION_DIMENSIONS)),
+                                options=[{"label": d, "value": d} for d in ALLOCATION_DIMENSIONS],
+                                style={"width": "190px", "fontSize": "12px"},
+                            ),
+                        ]),
+                        _number_input("allocation-cash", "Apport à investir (€)", 0, 100, "140px"),
+                    ],
+                ),
+            ],
+        ),
+        html.Div(
+            style={"display": "flex", "gap": "16px", "alignItems": "flex-start"},
+            children=[
+                html.Div(style={"width": "55%"}, children=[
+                    dcc.Store(id="allocation-rollups"),
+                    dcc.Graph(
+                        id="graph-allocation", figure=default_figure("allocation"),
+                        style={"height": "400px"}, config={"displayModeBar": False},
+                    ),
+                ]),
+                html.Div(style={"flex": "1", "display": "flex",
+                                "flexDirection": "column", "gap": "12px"}, children=[
+                    html.Div("Cibles par classe", style=LABEL_STYLE),
+                    dash_table.DataTable(
+                        id="table-allocation-targets", data=INITIAL_ALLOCATION_TARGETS,
+                        columns=TARGET_COLS, editable=True, row_deletable=True,
+                        dropdown={"Classe": {"options": [{"label": c, "value": c}
+                                                         for c in ASSET_CLASSES]}},
+                        **table_style,
+                    ),
+                    html.Button("+ Ajouter une cible", id="btn-add-target",
+                                className="btn-budget", n_clicks=0,
+                                style={"alignSelf": "flex-start"}),
+                    html.Div("Suggestions de rééquilibrage", style=LABEL_STYLE),
+                    dash_table.DataTable(
+                        id="table-rebalancing", data=[],
+                        columns=[{"name": n, "id": n} for n in
+                                 ("Classe", "Actuel", "Cible", "Ordre", "Apport seul")],
+                        **table_style,
+                    ),
+                ]),
+            ],
+        ),
+    ])
 
-def _tab_investissement():
-    color = "#10B981"
-    features = [
-        ("Portefeuilles & lignes",
-         "Enregistrez vos portefeuilles (PEA, CTO, assurance-vie) avec le détail "
-         "de chaque position : ticker, quantité, PRU et valeur de marché actuelle."),
-        ("Performance & rendement",
-         "Calcul automatique de la performance globale et par ligne (TWR, MWR), "
-         "dividendes perçus et comparaison avec des indices de référence (CAC40, S&P500…)."),
-        ("Allocation d'actifs",
-         "Visualisez votre répartition géographique, sectorielle et par classe d'actifs. "
-         "Identifiez les déséquilibres et opportunités de rééquilibrage."),
-        ("Simulation d'investissement",
-         "Projetez l'impact d'apports réguliers (DCA) ou ponctuels sur votre capital "
-         "à long terme, avec hypothèses de rendement annuel personnalisables."),
-        ("Analyse du risque",
-         "Indicateurs de volatilité, corrélation entre actifs, Value-at-Risk et "
-         "résistance aux scénarios de stress (krach, hausse des taux, inflation)."),
-        ("Fiscalité des plus-values",
-         "Estimation du PFU (30%) ou option barème progressif selon votre tranche "
-         "marginale, avec simulation de l'abattement pour durée de détention."),
-    ]
-    return html.Div([html.Div(style=card({"minHeight": "50vh"}), children=[
-        html.Div(style={"display": "flex", "gap": "20px", "alignItems": "flex-start",
-                        "marginBottom": "28px"}, children=[
-            html.Div(style={"flex": "1"}, children=[
-                html.Div("Module Investissement", style={
-                    **VALUE_STYLE, "color": color, "marginBottom": "8px",
-                }),
+
+def _tax_panel(color):
+    table_style = dict(
+        style_cell=TABLE_STYLE_CELL, style_header=TABLE_STYLE_HEADER,
+        style_data_conditional=TABLE_STYLE_DATA_COND,
+    )
+    return html.Div(style=card({"marginBottom": "16px"}), children=[
+        html.Div(
+            style={"display": "flex", "justifyContent": "space-between",
+                   "alignItems": "flex-end", "marginBottom": "16px",
+                   "flexWrap": "wrap", "gap": "14px"},
+            children=[
+                html.Div([
+                    html.Div("Fiscalité des plus-values", style=LABEL_STYLE),
+                    html.Div(
+                        "Comptes-titres : PRU, détention FIFO, moins-values reportées 10 ans · "
+                        "PEA et assurance-vie imposés au retrait",
+                        style={"color": COLORS["text_muted"], "fontSize": "10px",
+                               "fontFamily": "DM Mono, monospace"},
+                    ),
+                ]),
                 html.Div(
-                    "Gérez et optimisez vos portefeuilles financiers. De la saisie des "
-                    "positions à la simulation long terme, maîtrisez chaque dimension "
-                    "de votre stratégie d'investissement.",
-                    style={"color": COLORS["text_secondary"], "fontSize": "13px",
-                           "fontFamily": "DM Mono, monospace", "lineHeight": "1.7",
-                           "maxWidth": "600px"},
+                    style={"display": "flex", "gap": "14px", "alignItems": "flex-end"},
+                    children=[
+                        _number_input("tax-income", "Revenu imposable du foyer (€)",
+                                      40_000, 1000, "170px"),
+                        _number_input("tax-parts", "Parts fiscales", 1, 0.5, "100px"),
+                        html.Div(id="tax-tmi-display", style={
+                            "color": COLORS["text_secondary"], "fontSize": "11px",
+                            "fontFamily": "DM Mono, monospace", "paddingBottom": "9px",
+                        }),
+                    ],
                 ),
-            ]),
-            html.Div("À venir", style={
-                "backgroundColor": "rgba(16,185,129,0.10)",
-                "border": "1px solid rgba(16,185,129,0.3)",
-                "borderRadius": "20px", "padding": "4px 14px",
-                "color": color, "fontSize": "10px",
-                "fontFamily": "DM Mono, monospace", "fontWeight": "600",
-                "letterSpacing": "0.08em", "whiteSpace": "nowrap", "alignSelf": "flex-start",
-            }),
-        ]),
+            ],
+        ),
         html.Div(
-            style={"display": "grid",
-                   "gridTemplateColumns": "repeat(auto-fill, minmax(340px, 1fr))",
-                   "gap": "12px"},
-            children=[_feature_item(t, d, color) for t, d in features],
+            style={"display": "flex", "gap": "16px", "alignItems": "flex-start"},
+            children=[
+                html.Div(style={"width": "55%"}, children=[
+                    html.Div("Impôt par année de cession", style=LABEL_STYLE),
+                    dash_table.DataTable(
+                        id="table-tax-years", data=[],
+                        columns=[{"name": n, "id": n} for n in
+                                 ("Année", "Plus-values nettes", "Dividendes",
+                                  "PFU", "Barème", "Régime conseillé")],
+                        page_size=10, **table_style,
+                    ),
+                ]),
+                html.Div(style={"flex": "1"}, children=[
+                    html.Div("Lots ouverts", style=LABEL_STYLE),
+                    dash_table.DataTable(
+                        id="table-tax-lots", data=[],
+                        columns=[{"name": n, "id": n} for n in
+                                 ("Compte", "Ticker", "Quantité", "PRU", "Achat", "Détention")],
+                        page_size=10, style_table={"overflowX": "auto"}, **table_style,
+                    ),
+                ]),
+            ],
         ),
-    ])])
+    ])
+
+
+def _risk_panel(color):
+    return html.Div(style=card({"marginBottom": "16px"}), children=[
+        html.Div(
+            style={"display": "flex", "justifyContent": "space-between",
+                   "alignItems": "flex-end", "marginBottom": "16px",
+                   "flexWrap": "wrap", "gap": "14px"},
+            children=[
+                html.Div([
+                    html.Div("Analyse du risque", style=LABEL_STYLE),
+                    html.Div(
+                        "Lignes disposant d'un historique de cours importé · "
+                        "VaR : perte non dépassée au niveau de confiance · "
+                        "CVaR : perte moyenne au-delà",
+                        style={"color": COLORS["text_muted"], "fontSize": "10px",
+                               "fontFamily": "DM Mono, monospace"},
+                    ),
+                ]),
+                _number_input("risk-horizon", "Horizon (jours de bourse)", 1, 1, "150px"),
+            ],
+        ),
+        html.Div(
+            style={"display": "flex", "gap": "16px", "flexWrap": "wrap",
+                   "marginBottom": "12px"},
+            children=[
+                _kpi("Volatilité annualisée", "risk-vol-display", color),
+                _kpi(f"VaR {RISK_LEVELS[0]:.0%} historique", "risk-var-display",
+                     COLORS["danger"]),
+                _kpi("Historique couvert", "risk-period-display", COLORS["text_secondary"]),
+            ],
+        ),
+        html.Div(
+            style={"display": "flex", "gap": "16px", "alignItems": "flex-start"},
+            children=[
+                html.Div(style={"width": "45%"}, children=[
+                    dash_table.DataTable(
+                        id="table-risk", data=[],
+                        columns=[{"name": "Méthode", "id": "Méthode"}] + [
+                            {"name": f"{m} {a:.0%}", "id": f"{m} {a:.0%}"}
+                            for a in RISK_LEVELS for m in ("VaR", "CVaR")
+                        ],
+                        style_cell=TABLE_STYLE_CELL, style_header=TABLE_STYLE_HEADER,
+                        style_data_conditional=TABLE_STYLE_DATA_COND,
+                    ),
+                ]),
+                html.Div(style={"flex": "1"}, children=[
+                    dcc.Graph(
+                        id="graph-risk-correlation", figure=default_figure("correlation"),
+                        style={"height": "360px"}, config={"displayModeBar": False},
+                    ),
+                ]),
+            ],
+        ),
+    ])
+
+
+def _stress_panel(color):
+    # Chocs du scénario personnalisé, un champ par facteur (valeurs négatives admises)
+    units = {"Actions": ("Actions (%)", -20), "Taux": ("Taux (pts)", 1),
+             "Inflation": ("Inflation (pts)", 2)}
+    shocks = [
+        html.Div([
+            html.Div(units[f][0], style={**LABEL_STYLE, "marginBottom": "4px"}),
+            dcc.Input(id=f"stress-{f.lower()}", type="number", value=units[f][1], step=0.5,
+                      debounce=True, style={**INPUT_STYLE, "width": "110px"}),
+        ])
+        for f in STRESS_FACTORS
+    ]
+    return html.Div(style=card({"marginBottom": "16px"}), children=[
+        html.Div(
+            style={"display": "flex", "justifyContent": "space-between",
+                   "alignItems": "flex-end", "marginBottom": "16px",
+                   "flexWrap": "wrap", "gap": "14px"},
+            children=[
+                html.Div([
+                    html.Div("Scénarios de stress", style=LABEL_STYLE),
+                    html.Div(
+                        "Chocs de facteurs appliqués selon la classe d'actifs · rejeux "
+                        "historiques sur les cours importés, choc de repli sinon",
+                        style={"color": COLORS["text_muted"], "fontSize": "10px",
+                               "fontFamily": "DM Mono, monospace"},
+                    ),
+                ]),
+                html.Div(style={"display": "flex", "gap": "14px", "alignItems": "flex-end"},
+                         children=[html.Div("Scénario personnalisé", style={
+                             **LABEL_STYLE, "paddingBottom": "9px"})] + shocks),
+            ],
+        ),
+        html.Div(
+            style={"display": "flex", "gap": "16px", "flexWrap": "wrap",
+                   "marginBottom": "12px"},
+            children=[
+                _kpi("Pire scénario", "stress-worst-display", COLORS["danger"]),
+                _kpi("Perte maximale", "stress-loss-display", COLORS["danger"]),
+            ],
+        ),
+        html.Div(
+            style={"display": "flex", "gap": "16px", "alignItems": "flex-start"},
+            children=[
+                html.Div(style={"width": "55%"}, children=[
+                    dash_table.DataTable(
+                        id="table-stress", data=[],
+                        columns=[{"name": n, "id": n} for n in
+                                 ("Scénario", "Type", "Impact", "Impact (%)",
+                                  "Valeur après", "Ligne la plus touchée", "Rejeu")],
+                        style_cell=TABLE_STYLE_CELL, style_header=TABLE_STYLE_HEADER,
+                        style_data_conditional=TABLE_STYLE_DATA_COND,
+                    ),
+                ]),
+                html.Div(style={"flex": "1"}, children=[
+                    dcc.Graph(
+                        id="graph-stress", figure=default_figure("stress"),
+                        style={"height": "360px"}, config={"displayModeBar": False},
+                    ),
+                ]),
+            ],
+        ),
+    ])
+
+
+def _tab_investissement():
+    color = "#10B981"
+    intro = html.Div(style=card({"marginBottom": "16px"}), children=[
+        html.Div("Module Investissement", style={
+            **VALUE_STYLE, "color": color, "marginBottom": "8px",
+        }),
+        html.Div(
+            "Gérez et optimisez vos portefeuilles financiers. De la saisie des "
+            "positions à la simulation long terme, maîtrisez chaque dimension "
+            "de votre stratégie d'investissement.",
+            style={"color": COLORS["text_secondary"], "fontSize": "13px",
+                   "fontFamily": "DM Mono, monospace", "lineHeight": "1.7",
+                   "maxWidth": "600px"},
+        ),
+    ])
+    return html.Div([
+        intro, _portfolio_panel(color), _allocation_panel(color), _tax_panel(color),
+        _dca_simulator(color), _risk_panel(color), _stress_panel(color),
+    ])
+
+
+# ─── Onglets ──────────────────────────────────────────────────────────────────
+# valeur de dcc.Tab → constructeur du panneau (id : tab-panel-<valeur>)
+
+TAB_BUILDERS = {
+    "salaire":    _tab_salaire,
+    "immobilier": _tab_immobilier,
+    "boursier":   _tab_investissement,
+}
 
 
 # ─── Layout principal ──────────────────────────────────────────────────────────
@@ -425,8 +1187,14 @@ def build_layout():
             # Initialisés au démarrage depuis le fichier de sauvegarde (app.py).
             # salary-store : list de dicts [{Salaire, Date de début, Date de fin}]
             # app-budget-store : dict {catégorie: {sous-poste: montant_euros}}
+            # app-property-store : dict {"properties": [lignes], "zones": [lignes]}
+            # app-investment-store : dict {"transactions": [lignes], "quotes": [lignes]}
+            # app-scenario-store : list de scénarios nommés (voir scenarios.py)
             dcc.Store(id="salary-store"),
             dcc.Store(id="app-budget-store"),
+            dcc.Store(id="app-property-store"),
+            dcc.Store(id="app-investment-store"),
+            dcc.Store(id="app-scenario-store"),
 
             # En-tête avec bouton sauvegarde
             html.Div(
@@ -472,7 +1240,11 @@ def build_layout():
                        "marginBottom": "22px", "backgroundColor": "transparent"},
             ),
 
-            html.Div(id="tab-content"),
+            html.Div(id="tab-content", children=[
+                html.Div(builder(), id=f"tab-panel-{tab}", className="tab-panel",
+                         style={} if tab == "salaire" else {"display": "none"})
+                for tab, builder in TAB_BUILDERS.items()
+            ]),
 
             # Bandeau total
             html.Div(style=card({
@@ -481,24 +1253,21 @@ def build_layout():
             }), children=[
                 html.Div(style={"display": "flex", "justifyContent": "space-between",
                                 "alignItems": "center", "marginBottom": "12px"}, children=[
-                    html.Div("Cumul patrimoine total", style=LABEL_STYLE),
-                    html.Div("Salaire · Immobilier · Investissements", style={
+                    html.Div(style={"display": "flex", "gap": "14px", "alignItems": "baseline"},
+                             children=[
+                        html.Div("Cumul patrimoine total", style=LABEL_STYLE),
+                        html.Div(id="networth-display", style={
+                            "color": COLORS["text_secondary"], "fontSize": "11px",
+                            "fontFamily": "DM Mono, monospace",
+                        }),
+                    ]),
+                    html.Div("Épargne · Immobilier · Investissements", style={
                         "color": COLORS["text_muted"], "fontSize": "9px",
                         "fontFamily": "DM Mono, monospace", "letterSpacing": "0.08em",
                     }),
                 ]),
-                dcc.Graph(id="graph-total", figure=build_total_figure(),
+                dcc.Graph(id="graph-total", figure=default_figure("total"),
                           style={"height": "200px"}, config={"displayModeBar": False}),
             ]),
         ],
     )
-
-
-# ─── Sélecteur d'onglet ───────────────────────────────────────────────────────
-
-def get_tab_content(tab: str):
-    if tab == "salaire":
-        return _tab_salaire()
-    if tab == "immobilier":
-        return _tab_immobilier()
-    return _tab_investissement()
\ No newline at end of file
@@ -0,0 +1,459 @@
+"""
+loadtest.py
+===========
+Banc de charge local de l'endpoint /_dash-update-component.
+
+Simule N sessions concurrentes (asyncio, client HTTP minimal sur la
+bibliothèque standard) qui rejouent des séquences d'interactions réalistes :
+
+  - edit_table   : modification d'une ligne de l'historique salarial ;
+  - slider_drag  : glissement d'un slider (rafale de valeurs successives) ;
+  - budget_edit  : modification d'un montant du budget puis rendu du Sankey ;
+  - budget_crud  : ajout / suppression de sous-postes et de catégories ;
+  - save         : sauvegarde (uniquement sur une instance lancée par l'outil).
+
+Les corps de requêtes sont construits à partir de /_dash-dependencies, comme
+le ferait le navigateur. Le tirage des actions est déterministe (--seed) :
+deux exécutions avec les mêmes paramètres rejouent exactement les mêmes
+séquences, et `--compare` affiche l'écart avec un rapport JSON précédent.
+
+Usage :
+    python loadtest.py --start --sessions 200 --duration 30 --out run.json
+    python loadtest.py --url http://127.0.0.1:8050 --compare run.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from config import (
+    DEFLATOR_INFLATION, INITIAL_DATA, SALARY_CONFIDENCE_RANGE, SALARY_GROWTH_RANGE,
+    SALARY_HORIZON_RANGE,
+)
+
+# ─── Client HTTP minimal ──────────────────────────────────────────────────────
+
+async def _http(host: str, port: int, method: str, path: str,
+                body: bytes | None = None) -> tuple[int, bytes]:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        head = [f"{method} {path} HTTP/1.1", f"Host: {host}:{port}",
+                "Connection: close", "Accept: application/json"]
+        if body is not None:
+            head += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + (body or b""))
+        await writer.drain()
+        raw = await reader.read()
+    finally:
+        writer.close()
+    header, _, payload = raw.partition(b"\r\n\r\n")
+    status = int(header.split(b" ", 2)[1]) if header else 0
+    if b"transfer-encoding: chunked" in header.lower():
+        payload = _dechunk(payload)
+    return status, payload
+
+
+def _dechunk(data: bytes) -> bytes:
+    out, pos = bytearray(), 0
+    while True:
+        eol  = data.index(b"\r\n", pos)
+        size = int(data[pos:eol].split(b";")[0], 16)
+        if size == 0:
+            return bytes(out)
+        out += data[eol + 2:eol + 2 + size]
+        pos = eol + 2 + size + 2
+
+
+# ─── Construction des requêtes Dash ───────────────────────────────────────────
+
+def _stringify_id(cid) -> str:
+    if isinstance(cid, dict):
+        return json.dumps(cid, sort_keys=True, separators=(",", ":"))
+    return cid
+
+
+def _parse_outputs(output: str) -> list[dict]:
+    """'..a.b...c.d..' ou 'a.b' → [{id, property}]."""
+    parts = output[2:-2].split("...") if output.startswith("..") else [output]
+    outs = []
+    for p in parts:
+        cid, prop = p.rsplit(".", 1)
+        outs.append({"id": cid, "property": prop})
+    return outs
+
+
+class _Callbacks:
+    """Index des callbacks serveur, repérés par une sortie caractéristique."""
+
+    SIGNATURES = {
+        "update_salary_tab":   lambda d: "graph-projection.figure" in d["output"],
+        "render_budget_ui":    lambda d: "graph-sankey.figure" in d["output"],
+        "update_budget_store": lambda d: any(i["property"] == "n_clicks" and "add-cat-btn" == i["id"]
+                                             for i in d["inputs"]),
+        "save_data":           lambda d: "save-feedback.children" in d["output"],
+    }
+
+    def __init__(self, dependencies: list[dict]):
+        self.deps = {}
+        for name, match in self.SIGNATURES.items():
+            found = [d for d in dependencies if d.get("clientside_function") is None and match(d)]
+            if found:
+                self.deps[name] = found[0]
+
+    def body(self, name: str, values: dict, changed: list[str]) -> bytes:
+        """values : {(id, propriété): valeur} ; liste de {id, value} pour un id ALL."""
+        dep  = self.deps[name]
+        outs = _parse_outputs(dep["output"])
+
+        def _items(specs):
+            items = []
+            for spec in specs:
+                key = (spec["id"], spec["property"])
+                if spec["id"].startswith("{"):   # pattern-matching ALL
+                    items.append([{"id": cid, "property": spec["property"], "value": v}
+                                  for cid, v in values.get(key, [])])
+                else:
+                    items.append({"id": spec["id"], "property": spec["property"],
+                                  "value": values.get(key)})
+            return items
+
+        payload = {
+            "output":         dep["output"],
+            "outputs":        outs if len(outs) > 1 else outs[0],
+            "inputs":         _items(dep["inputs"]),
+            "state":          _items(dep["state"]),
+            "changedPropIds": changed,
+        }
+        return json.dumps(payload).encode("utf-8")
+
+
+# ─── Session simulée ──────────────────────────────────────────────────────────
+
+_ACTIONS = (
+    ("slider_drag", 0.40),
+    ("edit_table",  0.20),
+    ("budget_edit", 0.25),
+    ("budget_crud", 0.10),
+    ("save",        0.05),
+)
+
+_CAT_NAME  = '{"cat":["ALL"],"type":"cat-name"}'
+_DEL_CAT   = '{"cat":["ALL"],"type":"del-cat"}'
+_SUB_NAME  = '{"cat":["ALL"],"sub":["ALL"],"type":"subcat-name"}'
+_DEL_SUB   = '{"cat":["ALL"],"sub":["ALL"],"type":"del-subcat"}'
+_AMOUNT    = '{"cat":["ALL"],"sub":["ALL"],"type":"budget-input"}'
+_ADD_SUB   = '{"cat":["ALL"],"type":"add-subcat"}'
+
+
+class _Session:
+    def __init__(self, runner: "_Runner", rng: random.Random):
+        self.runner  = runner
+        self.rng     = rng
+        self.rows    = [dict(r) for r in INITIAL_DATA]
+        self.sliders = {"slider-growth": 3, "slider-horizon": 20, "slider-confidence": 5}
+        self.budget  = json.loads(json.dumps(runner.initial_budget))
+        self.saves   = 0
+
+    # ── Valeurs courantes des composants ───────────────────────────────────
+    def _values(self) -> dict:
+        b = self.budget
+        cats = list(b)
+        subs = [(c, s) for c in cats for s in b[c]]
+        v = {
+            ("table-salary", "data"):            self.rows,
+            ("input-monthly-salary", "value"):   None,
+            ("projection-view", "value"):        "nominal",
+            ("projection-inflation", "value"):   DEFLATOR_INFLATION,
+            ("projection-basis", "value"):       "net",
+            ("projection-parts", "value"):       1,
+            ("budget-store", "data"):            b,
+            ("add-cat-btn", "n_clicks"):         0,
+            ("btn-save", "n_clicks"):            self.saves,
+            (_CAT_NAME, "value"):    [({"cat": c, "type": "cat-name"}, c) for c in cats],
+            (_CAT_NAME, "id"):       [({"cat": c, "type": "cat-name"}, {"cat": c, "type": "cat-name"})
+                                      for c in cats],
+            (_DEL_CAT, "n_clicks"):  [({"cat": c, "type": "del-cat"}, 0) for c in cats],
+            (_DEL_CAT, "id"):        [({"cat": c, "type": "del-cat"}, {"cat": c, "type": "del-cat"})
+                                      for c in cats],
+            (_ADD_SUB, "n_clicks"):  [({"cat": c, "type": "add-subcat"}, 0) for c in cats],
+            (_ADD_SUB, "id"):        [({"cat": c, "type": "add-subcat"},
+                                       {"cat": c, "type": "add-subcat"}) for c in cats],
+        }
+        for pattern, typ in ((_SUB_NAME, "subcat-name"), (_DEL_SUB, "del-subcat"),
+                             (_AMOUNT, "budget-input")):
+            ids = [{"cat": c, "sub": s, "type": typ} for c, s in subs]
+            v[(pattern, "id")] = [(i, i) for i in ids]
+        v[(_SUB_NAME, "value")] = [({"cat": c, "sub": s, "type": "subcat-name"}, s) for c, s in subs]
+        v[(_DEL_SUB, "n_clicks")] = [({"cat": c, "sub": s, "type": "del-subcat"}, 0) for c, s in subs]
+        v[(_AMOUNT, "value")] = [({"cat": c, "sub": s, "type": "budget-input"}, b[c][s])
+                                 for c, s in subs]
+        v.update({(k, "value"): val for k, val in self.sliders.items()})
+        return v
+
+    async def _call(self, name: str, changed: list[str], override: dict | None = None):
+        values = self._values()
+        if override:
+            values.update(override)
+        body = self.runner.callbacks.body(name, values, changed)
+        return await self.runner.request(name, body)
+
+    # ── Actions ────────────────────────────────────────────────────────────
+    async def slider_drag(self):
+        sid = self.rng.choice(list(self.sliders))
+        lo, hi, step = {"slider-growth": SALARY_GROWTH_RANGE, "slider-horizon": SALARY_HORIZON_RANGE,
+                        "slider-confidence": SALARY_CONFIDENCE_RANGE}[sid]
+        for _ in range(self.rng.randint(3, 8)):
+            val = self.sliders[sid] + self.rng.choice((-2, -1, 1, 2)) * step
+            self.sliders[sid] = min(hi, max(lo, val))
+            await self._call("update_salary_tab", [f"{sid}.value"])
+            await asyncio.sleep(self.rng.uniform(0.03, 0.12))
+
+    async def edit_table(self):
+        i = self.rng.randrange(len(self.rows))
+        year = 2015 + i
+        self.rows[i] = {"Salaire": self.rng.randrange(25_000, 90_000, 500),
+                        "Date de début": f"01/01/{year}", "Date de fin": f"31/12/{year}"}
+        await self._call("update_salary_tab", ["table-salary.data"])
+        await self._call("render_budget_ui", ["table-salary.data"])
+
+    async def _budget_update(self, trigger: str, override: dict | None = None):
+        status, payload = await self._call("update_budget_store", [trigger], override)
+        if status == 200:
+            try:
+                resp = json.loads(payload)["response"]
+                self.budget = next(iter(resp.values()))["data"]
+            except (ValueError, KeyError, StopIteration):
+                pass
+        await self._call("render_budget_ui", ["budget-store.data"])
+
+    async def budget_edit(self):
+        if not self.budget:
+            return await self.budget_crud()
+        cat = self.rng.choice(list(self.budget))
+        if not self.budget[cat]:
+            return await self.budget_crud()
+        sub = self.rng.choice(list(self.budget[cat]))
+        self.budget[cat][sub] = self.rng.randrange(0, 1_000, 10)
+        trigger = json.dumps({"cat": cat, "sub": sub, "type": "budget-input"},
+                             sort_keys=True, separators=(",", ":"))
+        await self._budget_update(f"{trigger}.value")
+
+    async def budget_crud(self):
+        cats = list(self.budget)
+        if len(cats) < 4 or self.rng.random() < 0.5:
+            if cats and self.rng.random() < 0.7:
+                cat = self.rng.choice(cats)
+                trigger = {"cat": cat, "type": "add-subcat"}
+                clicks = {(_ADD_SUB, "n_clicks"): [({"cat": c, "type": "add-subcat"}, int(c == cat))
+                                                   for c in cats]}
+            else:
+                trigger, clicks = "add-cat-btn", {("add-cat-btn", "n_clicks"): 1}
+        else:
+            cat = self.rng.choice(cats)
+            trigger = {"cat": cat, "type": "del-cat"}
+            clicks = {(_DEL_CAT, "n_clicks"): [({"cat": c, "type": "del-cat"}, int(c == cat))
+                                               for c in cats]}
+        prop = _stringify_id(trigger)
+        await self._budget_update(f"{prop}.n_clicks", clicks)
+
+    async def save(self):
+        if not self.runner.allow_save:
+            return await self.budget_edit()
+        self.saves += 1
+        await self._call("save_data", ["btn-save.n_clicks"])
+
+    async def run(self, deadline: float, think: float):
+        names, weights = zip(*_ACTIONS)
+        # Chargement initial : layout + premiers callbacks
+        await self.runner.request("layout", None, path="/_dash-layout", method="GET")
+        await self._call("update_salary_tab", [])
+        await self._call("render_budget_ui", [])
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.rng.expovariate(1 / think))
+            await getattr(self, self.rng.choices(names, weights)[0])()
+
+
+# ─── Orchestration ────────────────────────────────────────────────────────────
+
+class _Runner:
+    def __init__(self, url: str, allow_save: bool):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.allow_save = allow_save
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors:    dict[str, int] = defaultdict(int)
+        self.callbacks: _Callbacks | None = None
+        self.initial_budget: dict = {}
+
+    async def request(self, name: str, body: bytes | None,
+                      path: str = "/_dash-update-component", method: str = "POST"):
+        start = time.perf_counter()
+        try:
+            status, payload = await _http(self.host, self.port, method, path, body)
+        except OSError:
+            self.errors[name] += 1
+            return 0, b""
+        self.latencies[name].append(time.perf_counter() - start)
+        if status not in (200, 204):
+            self.errors[name] += 1
+        return status, payload
+
+    async def prepare(self):
+        _, deps = await _http(self.host, self.port, "GET", "/_dash-dependencies")
+        self.callbacks = _Callbacks(json.loads(deps))
+        _, layout = await _http(self.host, self.port, "GET", "/_dash-layout")
+        self.initial_budget = _find_prop(json.loads(layout), "app-budget-store", "data") or {}
+
+    async def run(self, sessions: int, duration: float, think: float, seed: int, ramp: float):
+        await self.prepare()
+        deadline = time.monotonic() + duration
+
+        async def _start(i):
+            await asyncio.sleep(ramp * i / max(sessions, 1))
+            await _Session(self, random.Random(seed * 100_003 + i)).run(deadline, think)
+
+        started = time.monotonic()
+        await asyncio.gather(*(_start(i) for i in range(sessions)))
+        return time.monotonic() - started
+
+
+def _find_prop(node, cid: str, prop: str):
+    """Recherche la propriété d'un composant dans le JSON du layout."""
+    if isinstance(node, dict):
+        props = node.get("props", {})
+        if props.get("id") == cid:
+            return props.get(prop)
+        for v in props.values():
+            found = _find_prop(v, cid, prop)
+            if found is not None:
+                return found
+    elif isinstance(node, list):
+        for v in node:
+            found = _find_prop(v, cid, prop)
+            if found is not None:
+                return found
+    return None
+
+
+# ─── Rapport ──────────────────────────────────────────────────────────────────
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+def build_report(runner: _Runner, elapsed: float, params: dict) -> dict:
+    per_callback = {}
+    for name, values in sorted(runner.latencies.items()):
+        values = sorted(values)
+        per_callback[name] = {
+            "count":      len(values),
+            "errors":     runner.errors.get(name, 0),
+            "throughput": len(values) / elapsed if elapsed else 0.0,
+            "p50_ms":     _percentile(values, 50) * 1_000,
+            "p95_ms":     _percentile(values, 95) * 1_000,
+            "p99_ms":     _percentile(values, 99) * 1_000,
+            "max_ms":     values[-1] * 1_000 if values else 0.0,
+        }
+    return {"params": params, "elapsed_s": elapsed, "callbacks": per_callback}
+
+
+def print_report(report: dict, previous: dict | None = None) -> None:
+    p = report["params"]
+    print(f"{p['sessions']} sessions · {report['elapsed_s']:.1f} s · seed {p['seed']}")
+    if previous and previous.get("params") != p:
+        print("⚠ paramètres différents du rapport de référence — comparaison indicative")
+    print(f"{'callback':<22}{'n':>7}{'err':>5}{'req/s':>8}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name, s in report["callbacks"].items():
+        line = (f"{name:<22}{s['count']:>7}{s['errors']:>5}{s['throughput']:>8.1f}"
+                f"{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}")
+        ref = (previous or {}).get("callbacks", {}).get(name)
+        if ref and ref["p95_ms"]:
+            line += f"   p95 {(s['p95_ms'] / ref['p95_ms'] - 1) * 100:+.0f} %"
+        print(line)
+    print("(latences en ms)")
+
+
+# ─── Lancement d'une instance locale ──────────────────────────────────────────
+
+def _port_in_use(port: int) -> bool:
+    try:
+        socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+        return True
+    except OSError:
+        return False
+
+
+def _start_app(port: int, save_path: str) -> subprocess.Popen:
+    """
+    Lance une instance dédiée. Refuse un port déjà occupé : le fils ne pourrait
+    pas s'y lier et le banc viserait l'instance existante (et ses sauvegardes).
+    """
+    if _port_in_use(port):
+        raise RuntimeError(f"Le port {port} est déjà utilisé : arrêtez l'instance en cours "
+                           "ou choisissez un autre port (--url)")
+    env = {**os.environ, "PATRIMOINE_SAVE_PATH": save_path}
+    # stderr hérité : les erreurs du fils restent visibles (journal d'accès coupé)
+    code = ("import logging, app; logging.getLogger('werkzeug').setLevel(logging.WARNING); "
+            f"app.app.run(debug=False, port={port}, threaded=True)")
+    proc = subprocess.Popen([sys.executable, "-c", code], env=env,
+                            cwd=os.path.dirname(os.path.abspath(__file__)),
+                            stdout=subprocess.DEVNULL)
+    for _ in range(100):
+        if proc.poll() is not None:
+            raise RuntimeError(f"L'application s'est arrêtée au démarrage (code {proc.returncode})")
+        if _port_in_use(port):
+            return proc
+        time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("L'application ne répond pas sur le port %d" % port)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banc de charge des callbacks Dash")
+    parser.add_argument("--url", default="http://127.0.0.1:8050")
+    parser.add_argument("--start", action="store_true",
+                        help="lance une instance locale dédiée (sauvegardes vers un fichier temporaire)")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=30.0, help="durée en secondes")
+    parser.add_argument("--think", type=float, default=1.0, help="pause moyenne entre actions (s)")
+    parser.add_argument("--ramp", type=float, default=5.0, help="montée en charge (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="écrit le rapport JSON dans ce fichier")
+    parser.add_argument("--compare", help="rapport JSON de référence")
+    args = parser.parse_args()
+
+    params = {k: getattr(args, k) for k in ("sessions", "duration", "think", "ramp", "seed")}
+    proc = None
+    url = args.url
+    if args.start:
+        port = urlsplit(url).port or 8050
+        proc = _start_app(port, os.path.join(tempfile.mkdtemp(), "loadtest_save.json"))
+    try:
+        runner  = _Runner(url, allow_save=args.start)
+        elapsed = asyncio.run(runner.run(args.sessions, args.duration, args.think,
+                                         args.seed, args.ramp))
+    finally:
+        if proc is not None:
+            proc.terminate()
+
+    report = build_report(runner, elapsed, params)
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+    print_report(report, previous)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
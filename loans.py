@@ -0,0 +1,278 @@
+"""
+loans.py
+========
+Moteur de crédit immobilier (amortissement à échéances constantes).
+
+Toutes les grandeurs sont calculées en forme fermée avec NumPy :
+  mensualité      a   = B·r / (1 − (1 + r)^−n)
+  capital restant B_k = B·(1 + r)^k − a·((1 + r)^k − 1) / r
+
+  - `batch_schedules`     : tableaux complets pour une grille de prêts à taux
+                            fixe (montant × taux × durée diffusés), en un appel ;
+  - `loan_totals`         : mensualité et coûts totaux seuls (grilles de
+                            plusieurs milliers d'alternatives) ;
+  - `remaining_balance`   : capital restant dû à des dates données ;
+  - `amortization_schedule` : un prêt avec paliers de taux (taux révisable),
+                            paliers de mensualité, assurance et remboursements
+                            anticipés — chaque segment entre deux événements
+                            est lui aussi calculé en forme fermée ;
+  - `yearly_summary`      : agrégation annuelle d'un échéancier mensuel.
+
+Conventions : taux annuels en décimal (0.035 = 3,5 %), durées en mois.
+"""
+
+import numpy as np
+
+
+# ─── Formes fermées ───────────────────────────────────────────────────────────
+
+def annuity(balance, monthly_rate, months) -> np.ndarray:
+    """Mensualité constante amortissant `balance` en `months` échéances."""
+    balance, r, n = np.broadcast_arrays(
+        np.asarray(balance, dtype=float),
+        np.asarray(monthly_rate, dtype=float),
+        np.maximum(np.asarray(months, dtype=float), 1.0),
+    )
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        pmt = balance * r / (1 - (1 + r) ** -n)
+    return np.where(r == 0, balance / n, pmt)
+
+
+def _balances(balance, r, pmt, k) -> np.ndarray:
+    """Capital restant après k échéances (k diffusé sur le dernier axe)."""
+    growth = (1 + r) ** k
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = np.where(r == 0, k, (growth - 1) / np.where(r == 0, 1, r))
+    return balance * growth - pmt * factor
+
+
+def remaining_balance(principal, annual_rate, months, elapsed) -> np.ndarray:
+    """
+    Capital restant dû après `elapsed` échéances d'un prêt à taux fixe.
+    Tous les paramètres sont diffusés ; `elapsed` est borné à [0, months].
+    """
+    P, R, N, K = np.broadcast_arrays(
+        np.asarray(principal, dtype=float), np.asarray(annual_rate, dtype=float),
+        np.asarray(months, dtype=float), np.asarray(elapsed, dtype=float),
+    )
+    r = R / 12
+    k = np.clip(K, 0, N)
+    return np.maximum(_balances(P, r, annuity(P, r, N), k), 0.0)
+
+
+def remaining_months(balance: float, monthly_rate: float, payment: float) -> int | None:
+    """Nombre d'échéances restantes à mensualité fixée (None si jamais amorti)."""
+    if balance <= 0:
+        return 0
+    if payment <= 0:
+        return None
+    if monthly_rate == 0:
+        return int(np.ceil(balance / payment))
+    ratio = 1 - monthly_rate * balance / payment
+    if ratio <= 0:
+        return None
+    return int(np.ceil(-np.log(ratio) / np.log1p(monthly_rate) - 1e-9))
+
+
+# ─── Grilles de prêts à taux fixe ─────────────────────────────────────────────
+
+def loan_totals(principal, annual_rate, months, insurance_rate=0.0) -> dict:
+    """
+    Mensualité et coûts totaux d'une grille de prêts (paramètres diffusés).
+    Aucun axe mensuel : adapté aux grilles de plusieurs milliers d'alternatives.
+    """
+    P, R, N, INS = np.broadcast_arrays(
+        np.asarray(principal, dtype=float), np.asarray(annual_rate, dtype=float),
+        np.asarray(months, dtype=float), np.asarray(insurance_rate, dtype=float),
+    )
+    pmt = annuity(P, R / 12, N)
+    insurance = P * INS / 12
+    return {
+        "monthly_payment":   pmt,
+        "monthly_insurance": insurance,
+        "total_interest":    pmt * N - P,
+        "total_insurance":   insurance * N,
+        "total_cost":        pmt * N - P + insurance * N,
+    }
+
+
+def batch_schedules(principal, annual_rate, months, insurance_rate=0.0) -> dict:
+    """
+    Échéanciers mensuels complets d'une grille de prêts à taux fixe.
+
+    Les paramètres sont diffusés entre eux (forme S) ; les tableaux renvoyés
+    ont la forme S × M, M étant la plus longue durée. Au-delà de sa durée,
+    un prêt a des flux nuls.
+    """
+    P, R, N, INS = np.broadcast_arrays(
+        np.asarray(principal, dtype=float), np.asarray(annual_rate, dtype=float),
+        np.asarray(months, dtype=int), np.asarray(insurance_rate, dtype=float),
+    )
+    r   = (R / 12)[..., None]
+    pmt = annuity(P, R / 12, N)
+    k   = np.arange(1, int(N.max(initial=0)) + 1)
+
+    active  = k <= N[..., None]
+    balance = np.where(active, np.maximum(_balances(P[..., None], r, pmt[..., None], k), 0), 0.0)
+    before  = np.concatenate([P[..., None], balance[..., :-1]], axis=-1)
+    before  = np.where(active, before, 0.0)
+
+    interest  = before * r
+    principal_paid = before - balance
+    return {
+        "month":           k,
+        "payment":         interest + principal_paid,
+        "interest":        interest,
+        "principal":       principal_paid,
+        "insurance":       np.where(active, (P * INS / 12)[..., None], 0.0),
+        "balance":         balance,
+        "monthly_payment": pmt,
+        "total_interest":  interest.sum(axis=-1),
+    }
+
+
+# ─── Prêt unique avec événements ──────────────────────────────────────────────
+
+def amortization_schedule(
+    principal: float,
+    annual_rate: float,
+    months: int,
+    insurance_rate: float = 0.0,
+    insurance_on: str = "initial",
+    rate_changes: list[tuple[int, float]] | None = None,
+    payment_steps: list[tuple[int, float]] | None = None,
+    prepayments: list[tuple[int, float]] | None = None,
+    keep: str = "duree",
+) -> dict:
+    """
+    Échéancier mensuel d'un prêt.
+
+    rate_changes  : [(mois, taux annuel)] — nouveau taux à partir de l'échéance
+                    suivante (taux révisable ou paliers de taux) ; le capital
+                    restant est réamorti sur la durée restante.
+    payment_steps : [(nb_mois, mensualité)] — paliers de mensualité en début de
+                    prêt (prêt à paliers) ; le solde est ensuite amorti sur la
+                    durée restante.
+    prepayments   : [(mois, montant)] — remboursement anticipé après l'échéance.
+    keep          : après un remboursement anticipé, "duree" recalcule la
+                    mensualité, "mensualite" raccourcit la durée.
+    insurance_on  : assurance sur le capital "initial" ou "restant".
+    """
+    rate_at = dict(rate_changes or [])
+    prepay_at: dict[int, float] = {}
+    for m, amount in prepayments or []:
+        prepay_at[m] = prepay_at.get(m, 0.0) + amount
+
+    step_end, steps = 0, []
+    for n_months, payment in payment_steps or []:
+        steps.append((step_end, step_end + n_months, payment))
+        step_end += n_months
+
+    def _step_payment(month):
+        for start, end, payment in steps:
+            if start <= month < end:
+                return payment
+        return None
+
+    boundaries = sorted(
+        {m for m in (*rate_at, *prepay_at) if 0 < m < months}
+        | {end for _, end, _ in steps if 0 < end < months}
+    )
+
+    balance, month, end = float(principal), 0, int(months)
+    r = annual_rate / 12
+    payment = _step_payment(0)
+    if payment is None:
+        payment = float(annuity(balance, r, end))
+
+    chunks_before, chunks_after, chunks_rate = [], [], []
+    prepaid_at: dict[int, float] = {}
+    for b in [*boundaries, end]:
+        if b <= month:
+            continue
+        seg_end = min(b, end)
+        k = np.arange(1, seg_end - month + 1)
+        after = _balances(balance, r, payment, k)
+        paid_off = np.nonzero(after <= 1e-9)[0]
+        if paid_off.size:
+            k, after = k[:paid_off[0] + 1], after[:paid_off[0] + 1]
+        after = np.maximum(after, 0.0)
+        chunks_before.append(np.concatenate([[balance], after[:-1]]))
+        chunks_after.append(after)
+        chunks_rate.append(np.full(len(k), r))
+        balance, month = float(after[-1]), month + len(k)
+        if balance <= 1e-9 or month >= end:
+            break
+
+        # Événements à l'échéance `month`
+        prepaid = min(prepay_at.get(month, 0.0), balance)
+        balance -= prepaid
+        prepaid_at[month] = prepaid
+        if month in rate_at:
+            r = rate_at[month] / 12
+        step_payment = _step_payment(month)
+        if step_payment is not None:
+            payment = step_payment
+        elif prepaid and keep == "mensualite":
+            n_left = remaining_months(balance, r, payment)
+            if n_left is None:
+                payment = float(annuity(balance, r, end - month))
+            else:
+                end = month + n_left
+        else:
+            payment = float(annuity(balance, r, end - month))
+        if balance <= 1e-9:
+            break
+
+    before = np.concatenate(chunks_before) if chunks_before else np.zeros(0)
+    after  = np.concatenate(chunks_after) if chunks_after else np.zeros(0)
+    rates  = np.concatenate(chunks_rate) if chunks_rate else np.zeros(0)
+    interest       = before * rates
+    principal_paid = before - after
+    if insurance_on == "restant":
+        insurance = before * insurance_rate / 12
+    else:
+        insurance = np.full(len(before), principal * insurance_rate / 12)
+
+    n = len(before)
+    prepaid = np.zeros(n)
+    for m, amount in prepaid_at.items():
+        prepaid[m - 1] = amount
+    return {
+        "month":     np.arange(1, n + 1),
+        "payment":   interest + principal_paid,
+        "interest":  interest,
+        "principal": principal_paid,
+        "insurance": insurance,
+        "prepaid":   prepaid,
+        "balance":   np.maximum(after - prepaid, 0.0),
+        "total_interest":  float(interest.sum()),
+        "total_insurance": float(insurance.sum()),
+    }
+
+
+# ─── Agrégation annuelle ──────────────────────────────────────────────────────
+
+def yearly_summary(schedule: dict) -> dict:
+    """Sommes annuelles (année de prêt 1, 2, …) et capital restant en fin d'année."""
+    n = schedule["interest"].shape[-1]
+    years = max(1, -(-n // 12))
+    pad = years * 12 - n
+
+    def _sum(values):
+        padded = np.pad(values, [(0, 0)] * (values.ndim - 1) + [(0, pad)])
+        return padded.reshape(*values.shape[:-1], years, 12).sum(axis=-1)
+
+    balance = schedule["balance"]
+    idx = np.minimum(np.arange(1, years + 1) * 12, n) - 1
+    summary = {
+        "year":      np.arange(1, years + 1),
+        "payment":   _sum(schedule["payment"]),
+        "interest":  _sum(schedule["interest"]),
+        "principal": _sum(schedule["principal"]),
+        "insurance": _sum(schedule["insurance"]),
+        "balance":   balance[..., idx] if n else np.zeros(balance.shape[:-1] + (years,)),
+    }
+    if "prepaid" in schedule:
+        summary["prepaid"] = _sum(schedule["prepaid"])
+    return summary
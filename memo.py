@@ -0,0 +1,202 @@
+"""
+memo.py
+=======
+Mémoïsation côté serveur des résultats de callbacks.
+
+Les callbacks purs (mêmes entrées → mêmes sorties) sont décorés par
+`@memoize` : les arguments reçus de Dash sont sérialisés en JSON canonique
+(clés triées) puis hachés, et le résultat est servi depuis :
+
+  1. un cache LRU en mémoire, borné à CACHE_MAX_ENTRIES entrées ;
+  2. optionnellement, un cache disque partagé entre workers (CACHE_DIR),
+     un fichier pickle par clé, écrit de façon atomique.
+
+Les compteurs hits / misses par callback sont exposés par `cache_stats()`.
+Une exception (PreventUpdate comprise) n'est jamais mise en cache.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from config import CACHE_DIR, CACHE_DISK_MAX_ENTRIES, CACHE_MAX_ENTRIES, CACHE_VERSION, CURRENT_YEAR
+
+# Invalide les entrées disque d'une version de code ou d'une année à l'autre
+_SALT = f"{CACHE_VERSION}:{CURRENT_YEAR}"
+
+# Fréquence (en écritures) du nettoyage du cache disque
+_PRUNE_EVERY = 64
+
+
+def canonical_key(name: str, args: tuple, kwargs: dict | None = None) -> str:
+    """Empreinte SHA-256 d'un appel, indépendante de l'ordre des clés des dicts."""
+    payload = json.dumps(
+        [_SALT, name, list(args), kwargs or {}],
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ─── Caches ───────────────────────────────────────────────────────────────────
+
+class _DiskTier:
+    """Tier disque : <dir>/<2 premiers caractères>/<clé>.pkl."""
+
+    def __init__(self, directory: str, max_entries: int):
+        self.directory   = directory
+        self.max_entries = max_entries
+        self._writes     = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.pkl")
+
+    def get(self, key: str):
+        try:
+            with open(self._path(key), "rb") as f:
+                return True, pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False, None
+
+    def set(self, key: str, value) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            return   # valeur non sérialisable ou disque indisponible : mémoire seule
+        self._writes += 1
+        if self._writes % _PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self) -> None:
+        """Supprime les fichiers les plus anciens au-delà de max_entries."""
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for n in names:
+                if n.endswith(".pkl"):
+                    p = os.path.join(root, n)
+                    try:
+                        files.append((os.path.getmtime(p), p))
+                    except OSError:
+                        continue
+        if len(files) <= self.max_entries:
+            return
+        files.sort()
+        for _, p in files[:len(files) - self.max_entries]:
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        for root, _, names in os.walk(self.directory):
+            for n in names:
+                if n.endswith(".pkl"):
+                    try:
+                        os.remove(os.path.join(root, n))
+                    except OSError:
+                        pass
+
+
+class CallbackCache:
+    """Cache LRU en mémoire, avec tier disque optionnel et compteurs par callback."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, disk_dir: str | None = CACHE_DIR):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, object] = OrderedDict()
+        self._lock  = threading.Lock()
+        self._disk  = _DiskTier(disk_dir, CACHE_DISK_MAX_ENTRIES) if disk_dir else None
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def _count(self, name: str, field: str) -> None:
+        stats = self._stats.setdefault(
+            name, {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0},
+        )
+        stats[field] += 1
+
+    def get(self, name: str, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._count(name, "hits")
+                return True, self._entries[key]
+        if self._disk is not None:
+            found, value = self._disk.get(key)
+            if found:
+                with self._lock:
+                    self._count(name, "disk_hits")
+                self._store(name, key, value)
+                return True, value
+        with self._lock:
+            self._count(name, "misses")
+        return False, None
+
+    def _store(self, name: str, key: str, value) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._count(name, "evictions")
+
+    def set(self, name: str, key: str, value) -> None:
+        self._store(name, key, value)
+        if self._disk is not None:
+            self._disk.set(key, value)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            out = {name: dict(s) for name, s in self._stats.items()}
+            for s in out.values():
+                s["size"] = len(self._entries)
+            return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+        if self._disk is not None:
+            self._disk.clear()
+
+
+CACHE = CallbackCache()
+
+
+# ─── Décorateur ───────────────────────────────────────────────────────────────
+
+def memoize(func=None, *, skip: int = 0):
+    """
+    Sert le résultat d'un callback pur depuis CACHE quand ses entrées se répètent.
+
+    skip : nombre d'arguments positionnels exclus de la clé (ex. `set_progress`
+           des callbacks en arrière-plan, voir jobs.py).
+    """
+    if func is None:
+        return lambda f: memoize(f, skip=skip)
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        key = canonical_key(name, args[skip:], kwargs)
+        found, value = CACHE.get(name, key)
+        if found:
+            return value
+        value = func(*args, **kwargs)
+        CACHE.set(name, key, value)
+        return value
+
+    return wrapper
+
+
+def cache_stats() -> dict[str, dict[str, int]]:
+    """Compteurs {callback: {hits, disk_hits, misses, evictions, size}}."""
+    return CACHE.stats()
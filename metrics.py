@@ -0,0 +1,208 @@
+"""
+metrics.py
+==========
+Instrumentation des callbacks et endpoint /metrics (format texte Prometheus).
+
+Activée par la variable d'environnement PATRIMOINE_METRICS=1. Désactivée,
+`@instrument` renvoie la fonction telle quelle : aucun surcoût par appel.
+
+Mesures par callback :
+  - histogramme de latence (secondes) ;
+  - taille des entrées reçues (octets JSON) ;
+  - erreurs (exceptions autres que PreventUpdate) et mises à jour annulées.
+Mesures par sortie (`id.propriété`) :
+  - histogramme de la taille de réponse (octets JSON).
+
+Les compteurs du cache de memo.py sont exportés sur le même endpoint.
+"""
+
+import json
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from config import METRICS_ENABLED
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS    = (256, 1_024, 4_096, 16_384, 65_536, 262_144, 1_048_576, 4_194_304)
+
+_LOOPBACK = {"127.0.0.1", "::1", "localhost"}
+
+
+# ─── Stockage ─────────────────────────────────────────────────────────────────
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts  = [0] * (len(buckets) + 1)   # dernier seau : +Inf
+        self.sum     = 0.0
+        self.count   = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum   += value
+        self.count += 1
+
+    def lines(self, metric: str, labels: str) -> list[str]:
+        out, cumul = [], 0
+        for bound, n in zip(self.buckets, self.counts):
+            cumul += n
+            out.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumul}')
+        out.append(f'{metric}_bucket{{{labels},le="+Inf"}} {self.count}')
+        out.append(f"{metric}_sum{{{labels}}} {self.sum}")
+        out.append(f"{metric}_count{{{labels}}} {self.count}")
+        return out
+
+
+class _Registry:
+    def __init__(self):
+        self._lock          = threading.Lock()
+        self.latency:       dict[str, _Histogram] = {}
+        self.response_size: dict[tuple[str, str], _Histogram] = {}
+        self.request_bytes: dict[str, int] = {}
+        self.errors:        dict[str, int] = {}
+        self.prevented:     dict[str, int] = {}
+
+    def record(self, name: str, seconds: float, request_bytes: int,
+               output_sizes: list[tuple[str, int]], error: bool, prevented: bool) -> None:
+        with self._lock:
+            self.latency.setdefault(name, _Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self.request_bytes[name] = self.request_bytes.get(name, 0) + request_bytes
+            for output, size in output_sizes:
+                self.response_size.setdefault(
+                    (name, output), _Histogram(SIZE_BUCKETS),
+                ).observe(size)
+            if error:
+                self.errors[name] = self.errors.get(name, 0) + 1
+            if prevented:
+                self.prevented[name] = self.prevented.get(name, 0) + 1
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            lines += ["# HELP patrimoine_callback_duration_seconds Latence des callbacks.",
+                      "# TYPE patrimoine_callback_duration_seconds histogram"]
+            for name, h in sorted(self.latency.items()):
+                lines += h.lines("patrimoine_callback_duration_seconds", f'callback="{name}"')
+
+            lines += ["# HELP patrimoine_callback_request_bytes_total Octets JSON reçus en entrée.",
+                      "# TYPE patrimoine_callback_request_bytes_total counter"]
+            for name, n in sorted(self.request_bytes.items()):
+                lines.append(f'patrimoine_callback_request_bytes_total{{callback="{name}"}} {n}')
+
+            lines += ["# HELP patrimoine_callback_response_bytes Taille JSON de chaque sortie.",
+                      "# TYPE patrimoine_callback_response_bytes histogram"]
+            for (name, output), h in sorted(self.response_size.items()):
+                labels = f'callback="{name}",output="{_escape(output)}"'
+                lines += h.lines("patrimoine_callback_response_bytes", labels)
+
+            lines += ["# HELP patrimoine_callback_errors_total Exceptions levées.",
+                      "# TYPE patrimoine_callback_errors_total counter"]
+            for name, n in sorted(self.errors.items()):
+                lines.append(f'patrimoine_callback_errors_total{{callback="{name}"}} {n}')
+
+            lines += ["# HELP patrimoine_callback_prevented_total Mises à jour annulées (PreventUpdate).",
+                      "# TYPE patrimoine_callback_prevented_total counter"]
+            for name, n in sorted(self.prevented.items()):
+                lines.append(f'patrimoine_callback_prevented_total{{callback="{name}"}} {n}')
+
+        from memo import cache_stats
+        stats = cache_stats()
+        for field in ("hits", "disk_hits", "misses", "evictions"):
+            metric = f"patrimoine_cache_{field}_total"
+            lines += [f"# TYPE {metric} counter"]
+            for name, s in sorted(stats.items()):
+                lines.append(f'{metric}{{callback="{name}"}} {s[field]}')
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = _Registry()
+
+
+# ─── Helpers ──────────────────────────────────────────────────────────────────
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _json_size(value) -> int:
+    from plotly.io.json import to_json_plotly
+    try:
+        return len(to_json_plotly(value).encode("utf-8"))
+    except (TypeError, ValueError):
+        return len(json.dumps(value, default=str).encode("utf-8"))
+
+
+def _output_labels() -> list[str]:
+    """Libellés `id.propriété` des sorties du callback en cours (contexte Dash)."""
+    from dash import ctx
+    try:
+        outputs = ctx.outputs_list
+    except Exception:
+        return []
+    if isinstance(outputs, dict):
+        outputs = [outputs]
+    labels = []
+    for out in outputs:
+        if isinstance(out, list):   # sortie pattern-matching : un groupe
+            out = out[0] if out else {"id": "?", "property": "?"}
+        oid = out["id"]
+        if isinstance(oid, dict):
+            oid = oid.get("type", json.dumps(oid, sort_keys=True))
+        labels.append(f"{oid}.{out['property']}")
+    return labels
+
+
+# ─── Décorateur ───────────────────────────────────────────────────────────────
+
+def instrument(func):
+    """Mesure latence, tailles et erreurs d'un callback (no-op si désactivé)."""
+    if not METRICS_ENABLED:
+        return func
+
+    from dash.exceptions import PreventUpdate
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        error = prevented = False
+        result = None
+        try:
+            result = func(*args, **kwargs)
+            return result
+        except PreventUpdate:
+            prevented = True
+            raise
+        except Exception:
+            error = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            request_bytes = len(json.dumps([args, kwargs], default=str).encode("utf-8"))
+            output_sizes = []
+            if not (error or prevented):
+                labels  = _output_labels()
+                values  = result if isinstance(result, (tuple, list)) and len(labels) > 1 else [result]
+                output_sizes = [(lbl, _json_size(v)) for lbl, v in zip(labels, values)]
+            REGISTRY.record(name, elapsed, request_bytes, output_sizes, error, prevented)
+
+    return wrapper
+
+
+# ─── Endpoint ─────────────────────────────────────────────────────────────────
+
+def register_metrics_endpoint(server) -> None:
+    """Ajoute GET /metrics au serveur Flask (accès local uniquement)."""
+    if not METRICS_ENABLED:
+        return
+    from flask import Response, abort, request
+
+    @server.route("/metrics")
+    def _metrics():
+        if request.remote_addr not in _LOOPBACK:
+            abort(403)
+        return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
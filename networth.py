@@ -0,0 +1,114 @@
+"""
+networth.py
+===========
+Cumul du patrimoine total : agrégation des séries annuelles des trois modules.
+
+Chaque module publie sa série (une valeur par année, de l'année courante à
+l'horizon maximal) accompagnée d'une version — l'empreinte des entrées dont
+elle dépend. Les séries sont gardées, figées, sous (module, version) dans un
+LRU partagé par toutes les sessions : une publication déjà connue ne
+déclenche aucun calcul, et chaque requête assemble son propre cumul à partir
+des seules versions de ses entrées — jamais de l'état d'une autre session :
+
+  Épargne          : épargne mensuelle du budget cumulée, indexée sur la
+                     croissance salariale ;
+  Immobilier       : valeur nette du parc (scénario central − capital dû) ;
+  Investissements  : valeur de marché actuelle du portefeuille.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from config import CURRENT_YEAR, NETWORTH_CACHE_ROWS, PROPERTY_MAX_HORIZON
+
+SOURCES = ["Épargne", "Immobilier", "Investissements"]
+
+
+# ─── Séries des modules ───────────────────────────────────────────────────────
+
+def savings_series(years: np.ndarray, monthly_savings: float, growth_pct: float) -> np.ndarray:
+    """Épargne cumulée en fin d'année (0 l'année courante), apports indexés."""
+    steps = np.arange(len(years))
+    yearly = 12 * monthly_savings * (1 + growth_pct / 100) ** steps
+    return np.r_[0.0, np.cumsum(yearly[:-1])]
+
+
+def property_series(totals: dict, scenario: int) -> tuple[np.ndarray, np.ndarray]:
+    """(années, valeur nette) du parc pour un scénario de revalorisation."""
+    return totals["years"], totals["equity"][:, scenario]
+
+
+def flat_series(years: np.ndarray, value: float) -> np.ndarray:
+    return np.full(len(years), float(value))
+
+
+# ─── Agrégateur ───────────────────────────────────────────────────────────────
+
+class NetWorthAggregator:
+    """Séries des modules en cache par (module, version), cumulées à la demande."""
+
+    def __init__(self, sources: list[str] = SOURCES, start_year: int = CURRENT_YEAR,
+                 horizon: int = PROPERTY_MAX_HORIZON, max_entries: int = NETWORTH_CACHE_ROWS):
+        self.years = np.arange(start_year, start_year + horizon + 1)
+        self.sources = list(sources)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._rows: OrderedDict[tuple[str, str], np.ndarray] = OrderedDict()
+
+    def _align(self, years, values) -> np.ndarray:
+        """Série ramenée sur l'axe des années ; prolongée par sa dernière valeur."""
+        years = np.asarray(years)
+        values = np.asarray(values, dtype=float)
+        if not len(years):
+            return np.zeros(len(self.years))
+        idx = np.clip(np.searchsorted(years, self.years), 0, len(years) - 1)
+        return np.where(self.years >= years[0], values[idx], 0.0)
+
+    def publish(self, source: str, version: str, compute) -> tuple[np.ndarray, bool]:
+        """
+        Série d'un module pour une version de ses entrées. `compute()` →
+        (années, valeurs) n'est appelé que si cette version n'est pas en
+        cache ; renvoie (série en lecture seule, recalculée ?).
+        """
+        key = (source, version)
+        with self._lock:
+            row = self._rows.get(key)
+            if row is not None:
+                self._rows.move_to_end(key)
+                return row, False
+        # Calcul hors verrou : la série ne dépend que de sa clé
+        row = self._align(*compute())
+        row.flags.writeable = False
+        with self._lock:
+            row = self._rows.setdefault(key, row)
+            self._rows.move_to_end(key)
+            while len(self._rows) > self.max_entries:
+                self._rows.popitem(last=False)
+        return row, True
+
+    def snapshot(self, publications: dict[str, tuple[str, object]]) -> dict:
+        """
+        Cumul d'une requête : {module: (version, compute)} →
+        {years, sources, series, total, recomputed}. Modules absents : 0.
+        """
+        series = np.zeros((len(self.sources), len(self.years)))
+        recomputed = []
+        for i, source in enumerate(self.sources):
+            if source not in publications:
+                continue
+            series[i], fresh = self.publish(source, *publications[source])
+            if fresh:
+                recomputed.append(source)
+        return {
+            "years":      self.years,
+            "sources":    list(self.sources),
+            "series":     series,
+            "total":      series.sum(axis=0),
+            "recomputed": recomputed,
+        }
+
+
+# Instance partagée : seules les séries figées par empreinte sont partagées
+NETWORTH = NetWorthAggregator()
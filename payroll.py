@@ -0,0 +1,126 @@
+"""
+payroll.py
+==========
+Passage du brut au net et impôt sur le revenu d'un salaire (France),
+diffusés sur des tableaux de forme quelconque (projection, scénarios ×
+années, grille des sliders).
+
+  net          = brut − cotisations salariales (tranches en PASS)
+                      − CSG / CRDS (assiette 98,25 % jusqu'à 4 PASS)
+  net imposable = net + CSG non déductible + CRDS
+  impôt        : barème progressif par part (quotient familial plafonné),
+                 après déduction forfaitaire de 10 %, puis décote.
+
+Le net est une fonction affine par morceaux du brut (ruptures à 1, 4 et
+8 PASS) : la conversion inverse net → brut est une interpolation exacte
+sur ces seuls points, calculée une fois. Le salaire est supposé être le
+seul revenu du foyer ; le barème n'est pas indexé sur les années projetées.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from config import (
+    CRDS_RATE, CSG_BASE_CAP, CSG_BASE_RATE, CSG_DEDUCTIBLE, CSG_NON_DEDUCTIBLE,
+    DECOTE, DECOTE_RATE, EMPLOYEE_CONTRIBUTIONS, IR_BRACKETS, PASS, PAYROLL_VIEWS,
+    QF_HALF_PART_CAP, SALARY_ALLOWANCE, SALARY_ALLOWANCE_BOUNDS,
+)
+
+
+# ─── Barèmes (convertis une seule fois) ───────────────────────────────────────
+
+@lru_cache(maxsize=None)
+def _contribution_table() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(plancher €, largeur de tranche €, taux) des cotisations salariales."""
+    _, lo, hi, rates = zip(*EMPLOYEE_CONTRIBUTIONS)
+    lo = np.array(lo, dtype=float) * PASS
+    hi = np.array([np.inf if h is None else h for h in hi], dtype=float) * PASS
+    return lo, hi - lo, np.array(rates)
+
+
+@lru_cache(maxsize=None)
+def _bracket_table() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(seuils, taux, impôt cumulé au seuil) du barème par part."""
+    thresholds, rates = (np.array(col, dtype=float) for col in zip(*IR_BRACKETS))
+    cumulated = np.r_[0.0, np.cumsum(np.diff(thresholds) * rates[:-1])]
+    return thresholds, rates, cumulated
+
+
+@lru_cache(maxsize=None)
+def _inverse_grid() -> tuple[np.ndarray, np.ndarray]:
+    """(net, brut) aux ruptures de pente : net → brut par interpolation exacte."""
+    gross = np.array([0, 1, CSG_BASE_CAP, 8, 1_000], dtype=float) * PASS
+    return payslip(gross)[0], gross
+
+
+# ─── Brut → net ───────────────────────────────────────────────────────────────
+
+def payslip(gross) -> tuple[np.ndarray, np.ndarray]:
+    """(net, net imposable) annuels d'un salaire brut annuel, diffusés."""
+    gross = np.asarray(gross, dtype=float)
+    lo, width, rates = _contribution_table()
+    social = (np.clip(gross[..., None] - lo, 0, width) * rates).sum(axis=-1)
+    cap = CSG_BASE_CAP * PASS
+    base = CSG_BASE_RATE * np.minimum(gross, cap) + np.maximum(gross - cap, 0)
+    net = gross - social - (CSG_DEDUCTIBLE + CSG_NON_DEDUCTIBLE + CRDS_RATE) * base
+    return net, net + (CSG_NON_DEDUCTIBLE + CRDS_RATE) * base
+
+
+def net_from_gross(gross) -> np.ndarray:
+    return payslip(gross)[0]
+
+
+def gross_from_net(net) -> np.ndarray:
+    net_pts, gross_pts = _inverse_grid()
+    return np.interp(np.asarray(net, dtype=float), net_pts, gross_pts)
+
+
+# ─── Impôt sur le revenu ──────────────────────────────────────────────────────
+
+def taxable_salary(net_taxable) -> np.ndarray:
+    """Revenu imposable : net imposable après déduction forfaitaire de 10 %."""
+    net_taxable = np.asarray(net_taxable, dtype=float)
+    lo, hi = SALARY_ALLOWANCE_BOUNDS
+    allowance = np.minimum(np.clip(SALARY_ALLOWANCE * net_taxable, lo, hi), net_taxable)
+    return net_taxable - allowance
+
+
+def _per_part_tax(income_per_part: np.ndarray) -> np.ndarray:
+    thresholds, rates, cumulated = _bracket_table()
+    idx = np.clip(np.searchsorted(thresholds, income_per_part, side="right") - 1, 0, None)
+    return cumulated[idx] + rates[idx] * (income_per_part - thresholds[idx])
+
+
+def income_tax(taxable_income, parts=1.0) -> np.ndarray:
+    """
+    Impôt du foyer, diffusé. Foyer de référence : 1 part (personne seule) ou
+    2 (couple, dès 2 parts) ; les demi-parts au-delà sont plafonnées.
+    """
+    income = np.clip(np.asarray(taxable_income, dtype=float), 0, None)
+    parts = np.maximum(np.asarray(parts, dtype=float), 1.0)
+    base = np.where(parts >= 2, 2.0, 1.0)
+    tax = parts * _per_part_tax(income / parts)
+    capped = base * _per_part_tax(income / base) - 2 * (parts - base) * QF_HALF_PART_CAP
+    tax = np.maximum(tax, capped)
+    threshold = np.where(base == 2, DECOTE[2][0], DECOTE[1][0])
+    flat = np.where(base == 2, DECOTE[2][1], DECOTE[1][1])
+    decote = np.where(tax < threshold, np.clip(flat - DECOTE_RATE * tax, 0, None), 0.0)
+    return np.maximum(tax - decote, 0.0)
+
+
+# ─── Vues brut / net / après impôt ────────────────────────────────────────────
+
+def convert(view: str, *series, parts: float = 1.0) -> list[np.ndarray]:
+    """
+    Séries de salaires nets annuels exprimées dans la vue `view` (voir
+    config.PAYROLL_VIEWS), en une passe sur toutes les séries empilées.
+    """
+    stacked = np.asarray(series, dtype=float).reshape(len(series), -1)
+    if view not in PAYROLL_VIEWS or view == "net":
+        return list(stacked)
+    gross = gross_from_net(stacked)
+    if view == "gross":
+        return list(gross)
+    net_taxable = payslip(gross)[1]
+    return list(stacked - income_tax(taxable_salary(net_taxable), parts))
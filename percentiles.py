@@ -0,0 +1,130 @@
+"""
+percentiles.py
+==============
+Trajectoire de percentile : chaque année de l'historique salarial classée
+dans la distribution INSEE de sa propre année (tc08.csv, par sexe), puis
+projection du percentile futur.
+
+Distribution d'une année : déciles / quartiles / centiles publiés (D1 … C99),
+les valeurs non disponibles (« nd » des premières années) étant déduites de
+l'année complète la plus proche à médiane égale. La fonction de répartition
+est interpolée comme pour la courbe INSEE 2021 (PCHIP entre 0, les repères et
+1,6 × C99) ; elle est construite une seule fois par (sexe, année) et évalue
+toutes les lignes de son année en un appel.
+
+Au-delà de la dernière année publiée, la distribution suit le salaire moyen
+(deflators.py) : un salaire S de l'année t se classe comme
+S · W(dernière) / W(t) dans la dernière distribution — toute la projection
+est donc évaluée en un seul appel.
+"""
+
+import csv
+from functools import lru_cache
+
+import numpy as np
+
+from config import PERCENTILE_POPULATIONS, PROPORTIONS, WAGE_INDEX_PATH
+from deflators import wage_levels
+
+_COLUMNS = list(PROPORTIONS)
+
+
+@lru_cache(maxsize=None)
+def load_distributions(path: str = WAGE_INDEX_PATH) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """{sexe: (années, repères années × D1…C99)} ; repères manquants complétés."""
+    rows: dict[str, list] = {}
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                values = []
+                for col in _COLUMNS:
+                    try:
+                        values.append(float(row[col]))
+                    except (KeyError, TypeError, ValueError):
+                        values.append(np.nan)
+                try:
+                    rows.setdefault(row["SEXE"], []).append((int(row["ANNEE10"]), values))
+                except (KeyError, ValueError):
+                    continue
+    except OSError:
+        return {}
+
+    out = {}
+    median = _COLUMNS.index("D5")
+    for sex, items in rows.items():
+        items.sort()
+        years = np.array([y for y, _ in items])
+        knots = np.array([v for _, v in items])
+        complete = np.flatnonzero(~np.isnan(knots).any(axis=1))
+        if complete.size == 0:
+            continue
+        # Repères « nd » : forme de l'année complète la plus proche, à médiane égale
+        for i in np.flatnonzero(np.isnan(knots).any(axis=1)):
+            ref = complete[np.abs(complete - i).argmin()]
+            shape = knots[ref] / knots[ref, median] * knots[i, median]
+            knots[i] = np.where(np.isnan(knots[i]), shape, knots[i])
+        out[sex] = (years, np.maximum.accumulate(knots, axis=1))
+    return out
+
+
+@lru_cache(maxsize=None)
+def _cdf(sex: str, year: int):
+    # Import différé, comme figures._build_cdf : scipy pèse au démarrage
+    from scipy.interpolate import PchipInterpolator
+
+    years, knots = load_distributions()[sex]
+    row = knots[int(np.searchsorted(years, year))]
+    x_pts = np.r_[0.0, row, row[-1] * 1.6]
+    y_pts = np.r_[0.0, list(PROPORTIONS.values()), 1.0]
+    # Repères égaux (arrondis publiés) : l'interpolation exige des abscisses croissantes
+    x_pts = x_pts + np.arange(len(x_pts)) * 1e-6
+    return PchipInterpolator(x_pts, y_pts)
+
+
+def percentile_ranks(years, salaries, sex: str = "E") -> np.ndarray:
+    """Percentile (0–100) de chaque salaire dans la distribution de son année."""
+    years = np.asarray(years, dtype=int)
+    salaries = np.asarray(salaries, dtype=float)
+    distributions = load_distributions()
+    if sex not in distributions or not len(salaries):
+        return np.full(len(salaries), np.nan)
+    known = distributions[sex][0]
+    first, last = int(known[0]), int(known[-1])
+
+    # Années non publiées : ramenées à la dernière distribution via le salaire moyen
+    after = years > last
+    if after.any():
+        levels = wage_levels(np.r_[last, years[after]])
+        if levels is not None:
+            salaries = salaries.copy()
+            salaries[after] *= levels[0] / levels[1:]
+    years = np.clip(years, first, last)
+    # Les années absentes de la série prennent la distribution publiée suivante
+    years = known[np.clip(np.searchsorted(known, years), 0, len(known) - 1)]
+
+    out = np.empty(len(salaries))
+    for year in np.unique(years):
+        group = years == year
+        out[group] = _cdf(sex, int(year))(salaries[group])
+    return np.clip(out, 0, 1) * 100
+
+
+def percentile_path(past_years, past_salaries, growth_pct: float, horizon: int,
+                    sex: str = "E") -> dict:
+    """Percentiles de l'historique puis du salaire projeté au taux `growth_pct`."""
+    past_years = np.asarray(past_years, dtype=int)
+    past_salaries = np.asarray(past_salaries, dtype=float)
+    steps = np.arange(1, max(int(horizon), 0) + 1)
+    future_years = past_years[-1] + steps
+    future_salaries = past_salaries[-1] * (1 + growth_pct / 100) ** steps
+    ranks = percentile_ranks(np.r_[past_years, future_years],
+                             np.r_[past_salaries, future_salaries], sex)
+    return {
+        "population":   PERCENTILE_POPULATIONS.get(sex, sex),
+        "years":        past_years,
+        "salaries":     past_salaries,
+        "percentiles":  ranks[:len(past_years)],
+        "future_years": future_years,
+        "future_salaries": future_salaries,
+        "future_percentiles": ranks[len(past_years):],
+    }
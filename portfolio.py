@@ -0,0 +1,412 @@
+"""
+portfolio.py
+============
+Cœur du module Investissement : transactions en colonnes NumPy et performance.
+
+Les transactions (achats, ventes, dividendes) sont stockées colonne par
+colonne, triées par date, avec des codes entiers pour le compte et le ticker :
+toutes les agrégations sont des `np.bincount` / `np.add.at` sur la clé de
+position (compte, ticker), sans boucle Python sur les lignes.
+
+  - positions : quantité, coût moyen pondéré (PRU), valeur de marché ;
+  - TWR       : sous-périodes délimitées par chaque date de flux, valorisées
+                au cours connu à cette date, puis chaînées ;
+  - MWR       : taux de rendement interne (XIRR) de chaque série de flux,
+                résolu pour toutes les séries à la fois (Newton vectorisé,
+                bissection pour les séries qui ne convergent pas).
+
+Les séries sont les positions, les comptes et le portefeuille total.
+
+Chargement : `STORE.load(rows)` renvoie un instantané immuable des
+transactions, identifié par l'empreinte des lignes et gardé en cache LRU.
+Chaque requête calcule uniquement depuis l'instantané qu'elle a obtenu :
+deux sessions aux transactions différentes ne se voient jamais, et les
+performances sont mises en cache dans l'instantané dont elles sont issues.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+
+import numpy as np
+
+from config import PORTFOLIO_CACHE_SNAPSHOTS, PORTFOLIO_PERFORMANCE_ENTRIES
+
+BUY, SELL, DIVIDEND = 1, -1, 0
+KIND_CODES = {"Achat": BUY, "Vente": SELL, "Dividende": DIVIDEND}
+
+DATE_FORMATS = ("%d/%m/%Y", "%m/%Y", "%Y-%m-%d")
+
+_DAYS_PER_YEAR = 365.25
+
+
+# ─── Parsing ──────────────────────────────────────────────────────────────────
+
+def _parse_date(raw) -> date | None:
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(str(raw).strip(), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_transaction(row: dict) -> tuple | None:
+    kind = KIND_CODES.get(row.get("Type"))
+    day = _parse_date(row.get("Date"))
+    ticker = str(row.get("Ticker") or "").strip().upper()
+    try:
+        qty   = float(row.get("Quantité") or 0)
+        price = float(row.get("Prix") or 0)
+        fees  = float(row.get("Frais") or 0)
+    except (TypeError, ValueError):
+        return None
+    if kind is None or day is None or not ticker or qty <= 0 or price < 0:
+        return None
+    return day, str(row.get("Compte") or "CTO"), ticker, kind, qty, price, fees
+
+
+def parse_quotes(rows: list | None) -> dict[str, float]:
+    """Tableau des cours → {ticker: cours} (lignes sans cours ignorées)."""
+    quotes = {}
+    for row in rows or []:
+        try:
+            quotes[str(row["Ticker"]).strip().upper()] = float(row["Cours"])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return quotes
+
+
+# ─── XIRR vectorisé ───────────────────────────────────────────────────────────
+
+def xirr(flows: np.ndarray, years: np.ndarray, iterations: int = 50, tol: float = 1e-9) -> np.ndarray:
+    """
+    Taux internes de S séries de flux datés, en une seule résolution.
+
+    flows : S × T (positif = encaissé par l'investisseur), years : T (temps en années).
+    NaN pour une série sans changement de signe. Seules les séries pas encore
+    convergées sont recalculées à chaque itération.
+    """
+    flows = np.atleast_2d(np.asarray(flows, dtype=float))
+    t = np.asarray(years, dtype=float)[None, :]
+
+    def npv(cf, r):
+        return (cf * np.exp(-t * np.log1p(r)[:, None])).sum(axis=1)
+
+    has_root = (flows > 0).any(axis=1) & (flows < 0).any(axis=1)
+    rate = np.full(flows.shape[0], 0.05)
+    todo = np.nonzero(has_root)[0]
+    for _ in range(iterations):
+        if not todo.size:
+            break
+        cf, r = flows[todo], rate[todo]
+        discount = np.exp(-t * np.log1p(r)[:, None])
+        f  = (cf * discount).sum(axis=1)
+        df = -(t * cf * discount).sum(axis=1) / (1 + r)
+        step = np.where(df != 0, f / np.where(df != 0, df, 1), 0.0)
+        rate[todo] = np.clip(r - step, -0.9999, 1e3)
+        todo = todo[np.abs(step) >= tol]
+
+    # Bissection pour les séries où Newton n'a pas convergé
+    scale = np.abs(flows).sum(axis=1).clip(1)
+    bad = np.nonzero(has_root)[0]
+    bad = bad[~(np.abs(npv(flows[bad], rate[bad])) < 1e-6 * scale[bad])]
+    if bad.size:
+        sub = flows[bad]
+        lo = np.full(bad.size, -0.9999)
+        hi = np.full(bad.size, 10.0)
+        f_lo = npv(sub, lo)
+        for _ in range(60):
+            mid = (lo + hi) / 2
+            f_mid = npv(sub, mid)
+            same = np.sign(f_mid) == np.sign(f_lo)
+            lo, f_lo = np.where(same, mid, lo), np.where(same, f_mid, f_lo)
+            hi = np.where(same, hi, mid)
+        rate[bad] = (lo + hi) / 2
+    return np.where(has_root, rate, np.nan)
+
+
+# ─── Instantanés en colonnes ──────────────────────────────────────────────────
+
+def _digest(rows: list | None) -> str:
+    return hashlib.sha1(
+        json.dumps(rows or [], sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class PortfolioSnapshot:
+    """Transactions figées en colonnes (lecture seule), triées par date ; performances en cache."""
+
+    def __init__(self, records: list[tuple], digest: str,
+                 max_entries: int = PORTFOLIO_PERFORMANCE_ENTRIES):
+        self.digest = digest
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._cache: OrderedDict = OrderedDict()
+        records = sorted(records, key=lambda r: r[0])
+        self.records = tuple(records)
+        self.accounts = tuple(sorted({r[1] for r in records}))
+        self.tickers  = tuple(sorted({r[2] for r in records}))
+        acc_code = {a: i for i, a in enumerate(self.accounts)}
+        tic_code = {t: i for i, t in enumerate(self.tickers)}
+        self.date    = np.array([r[0] for r in records], dtype="datetime64[D]")
+        self.account = np.array([acc_code[r[1]] for r in records], dtype=np.int16)
+        self.ticker  = np.array([tic_code[r[2]] for r in records], dtype=np.int32)
+        self.kind    = np.array([r[3] for r in records], dtype=np.int8)
+        self.qty     = np.array([r[4] for r in records], dtype=float)
+        self.price   = np.array([r[5] for r in records], dtype=float)
+        self.fees    = np.array([r[6] for r in records], dtype=float)
+        for column in (self.date, self.account, self.ticker, self.kind,
+                       self.qty, self.price, self.fees):
+            column.setflags(write=False)
+
+    @property
+    def version(self) -> str:
+        """Identifiant stable des transactions (empreinte des lignes chargées)."""
+        return self.digest
+
+    def __len__(self) -> int:
+        return len(self.date)
+
+    # ── Positions ────────────────────────────────────────────────────────────
+
+    @property
+    def position_key(self) -> np.ndarray:
+        return self.account.astype(np.int64) * max(len(self.tickers), 1) + self.ticker
+
+    def _average_cost(self, key: np.ndarray, n_keys: int) -> np.ndarray:
+        """
+        Coût de revient restant par position, méthode du PRU.
+
+        Récurrence c = a·c + b par position (a = part conservée lors d'une vente,
+        b = montant d'un achat frais inclus), résolue sans boucle : produits
+        cumulés par position, remis à zéro après chaque vente totale.
+        """
+        n = len(key)
+        if n == 0:
+            return np.zeros(n_keys)
+        order = np.lexsort((np.arange(n), key))
+        k = key[order]
+        dq = (self.qty * np.where(self.kind == SELL, -1, np.where(self.kind == BUY, 1, 0)))[order]
+        buy_cost = np.where(self.kind == BUY, self.qty * self.price + self.fees, 0.0)[order]
+
+        start = np.r_[True, k[1:] != k[:-1]]
+        seg_id = np.cumsum(start) - 1
+        held_after = np.cumsum(dq)
+        held_after -= (held_after - dq)[start][seg_id]          # cumul par position
+        held_before = held_after - dq
+        with np.errstate(divide="ignore", invalid="ignore"):
+            keep = np.where(dq < 0, np.clip(held_after / held_before, 0, 1), 1.0)
+        keep = np.where(np.isfinite(keep), keep, 0.0)
+
+        # Nouvelle époque après chaque solde à zéro : les facteurs restent > 0
+        reset = start | np.r_[False, keep[:-1] == 0]
+        epoch = np.cumsum(reset) - 1
+        log_a = np.log(np.where(keep > 0, keep, 1.0))
+        cum = np.cumsum(log_a)
+        cum -= (cum - log_a)[reset][epoch]
+        scaled = np.cumsum(buy_cost * np.exp(-cum))
+        scaled -= (scaled - buy_cost * np.exp(-cum))[reset][epoch]
+        cost = np.where(keep == 0, 0.0, np.exp(cum) * scaled)
+
+        last = np.r_[k[1:] != k[:-1], True]
+        out = np.zeros(n_keys)
+        out[k[last]] = cost[last]
+        return out
+
+    def positions(self, quotes: dict | None = None) -> dict:
+        """Positions (compte, ticker) détenues : quantité, PRU, valeur, plus-value latente."""
+        n_tic = max(len(self.tickers), 1)
+        n_keys = len(self.accounts) * n_tic
+        key = self.position_key
+        signed = np.where(self.kind == BUY, self.qty, np.where(self.kind == SELL, -self.qty, 0.0))
+        quantity = np.bincount(key, weights=signed, minlength=n_keys)
+        cost = self._average_cost(key, n_keys)
+        prices = self.last_prices(quotes)
+        value = quantity * np.tile(prices, len(self.accounts))
+        held = np.nonzero(quantity > 1e-9)[0]
+        return {
+            "account":  [self.accounts[i // n_tic] for i in held],
+            "ticker":   [self.tickers[i % n_tic] for i in held],
+            "quantity": quantity[held],
+            "cost":     cost[held],
+            "pru":      cost[held] / quantity[held],
+            "price":    prices[held % n_tic],
+            "value":    value[held],
+            "gain":     value[held] - cost[held],
+        }
+
+    def last_prices(self, quotes: dict | None = None) -> np.ndarray:
+        """Cours par ticker : cours saisi, sinon dernier prix de transaction."""
+        prices = np.zeros(len(self.tickers))
+        trades = self.kind != DIVIDEND
+        prices[self.ticker[trades]] = self.price[trades]          # dernier en date l'emporte
+        for i, t in enumerate(self.tickers):
+            q = (quotes or {}).get(t)
+            if q is not None and q > 0:
+                prices[i] = q
+        return prices
+
+    # ── Performance ──────────────────────────────────────────────────────────
+
+    def performance(self, quotes: dict | None = None, valuation_date: date | None = None,
+                    price_history=None, history_key=None) -> dict | None:
+        """
+        TWR et MWR des positions, des comptes et du total.
+
+        price_history : fonction optionnelle (dates, tickers) → matrice de cours
+                        (dates × tickers, NaN si inconnu) pour valoriser les
+                        sous-périodes ; à défaut, dernier prix de transaction
+                        (cf. PriceStore.matrix).
+        history_key   : version de cet historique, pour invalider le cache.
+        """
+        valuation_date = valuation_date or date.today()
+        cache_key = (json.dumps(quotes or {}, sort_keys=True), str(valuation_date),
+                     price_history is not None, history_key)
+        with self._lock:
+            if cache_key in self._cache:
+                self._cache.move_to_end(cache_key)
+                return self._cache[cache_key]
+        # Instantané immuable : le calcul hors verrou porte sur ces transactions-ci
+        result = self._performance(quotes, valuation_date, price_history)
+        with self._lock:
+            self._cache[cache_key] = result
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return result
+
+    def _performance(self, quotes, valuation_date, price_history) -> dict | None:
+        if len(self) == 0:
+            return None
+        n_acc, n_tic = len(self.accounts), len(self.tickers)
+        n_keys = n_acc * n_tic
+        key = self.position_key
+
+        # Grille de dates : dates de transaction + date de valorisation
+        dates, day_idx = np.unique(self.date, return_inverse=True)
+        end = np.datetime64(valuation_date, "D")
+        if end > dates[-1]:
+            dates = np.r_[dates, end]
+        n_dates = len(dates)
+
+        signed = np.where(self.kind == BUY, self.qty, np.where(self.kind == SELL, -self.qty, 0.0))
+        amount = self.qty * self.price
+        invested = np.where(self.kind == BUY, amount + self.fees,
+                            np.where(self.kind == SELL, -(amount - self.fees), 0.0))
+        dividends = np.where(self.kind == DIVIDEND, amount - self.fees, 0.0)
+
+        deltas = np.zeros((n_dates, n_keys))
+        np.add.at(deltas, (day_idx, key), signed)
+        holdings = np.cumsum(deltas, axis=0)                                 # après chaque date
+
+        # Cours par date : historique fourni, sinon prix de transaction propagé
+        trade = self.kind != DIVIDEND
+        prices = np.full((n_dates, n_tic), np.nan)
+        prices[day_idx[trade], self.ticker[trade]] = self.price[trade]
+        if price_history is not None:
+            known = price_history(dates, self.tickers)
+            prices = np.where(np.isnan(known), prices, known)
+        prices[-1] = self.last_prices(quotes)
+        filled = np.where(~np.isnan(prices), np.arange(n_dates)[:, None], 0)
+        np.maximum.accumulate(filled, axis=0, out=filled)
+        prices = np.nan_to_num(prices[filled, np.arange(n_tic)[None, :]])
+        key_prices = np.tile(prices, (1, n_acc))                             # dates × positions
+
+        # Séries : positions, comptes, total — matrice d'appartenance positions × séries
+        membership = np.zeros((n_keys, n_keys + n_acc + 1))
+        membership[np.arange(n_keys), np.arange(n_keys)] = 1
+        membership[np.arange(n_keys), n_keys + np.arange(n_keys) // n_tic] = 1
+        membership[:, -1] = 1
+
+        value_after  = (holdings * key_prices) @ membership                  # dates × séries
+        prev_hold    = np.vstack([np.zeros((1, n_keys)), holdings[:-1]])
+        value_before = (prev_hold * key_prices) @ membership
+        div_by_date = np.zeros((n_dates, n_keys))
+        np.add.at(div_by_date, (day_idx, key), dividends)
+        div_by_date = div_by_date @ membership
+
+        # TWR : produit des rendements de sous-périodes (valeur avant flux / valeur après flux précédent)
+        prev_after = np.vstack([np.zeros((1, value_after.shape[1])), value_after[:-1]])
+        valid = prev_after > 1e-9
+        growth = np.where(valid, (value_before + div_by_date) / np.where(valid, prev_after, 1), 1.0)
+        twr = np.prod(growth, axis=0) - 1
+        twr = np.where(valid.any(axis=0), twr, np.nan)
+
+        # MWR : flux de l'investisseur + valeur finale, même grille de dates
+        flows = np.zeros((n_dates, n_keys))
+        np.add.at(flows, (day_idx, key), dividends - invested)
+        flows = (flows @ membership).T                                       # séries × dates
+        flows[:, -1] += value_after[-1]
+        years = (dates - dates[0]).astype(float) / _DAYS_PER_YEAR
+        mwr = xirr(flows, years)
+
+        invested_total = np.bincount(key, weights=invested, minlength=n_keys) @ membership
+        dividends_total = np.bincount(key, weights=dividends, minlength=n_keys) @ membership
+        names = (
+            [f"{self.accounts[i // n_tic]} · {self.tickers[i % n_tic]}" for i in range(n_keys)]
+            + list(self.accounts) + ["Total"]
+        )
+        active = np.r_[np.abs(deltas).sum(axis=0) > 0, np.ones(n_acc + 1, bool)]
+        return {
+            "version":   self.digest,
+            "series":    [n for n, a in zip(names, active) if a],
+            "kind":      [k for k, a in zip(["position"] * n_keys + ["compte"] * n_acc + ["total"], active) if a],
+            "value":     value_after[-1][active],
+            "invested":  invested_total[active],
+            "dividends": dividends_total[active],
+            "twr":       twr[active],
+            "mwr":       mwr[active],
+            "years":     float(years[-1]),
+            "dates":     dates,
+            "history":   value_after[:, -1],
+            "invested_history": np.cumsum(np.bincount(day_idx, weights=invested, minlength=n_dates)),
+        }
+
+
+# ─── Registre des instantanés ─────────────────────────────────────────────────
+
+class PortfolioStore:
+    """Instantanés par empreinte des transactions, en cache LRU."""
+
+    def __init__(self, max_entries: int = PORTFOLIO_CACHE_SNAPSHOTS):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._snapshots: OrderedDict[str, PortfolioSnapshot] = OrderedDict()
+
+    def _register(self, digest: str, build) -> PortfolioSnapshot:
+        with self._lock:
+            snapshot = self._snapshots.get(digest)
+            if snapshot is not None:
+                self._snapshots.move_to_end(digest)
+                return snapshot
+        snapshot = build()
+        with self._lock:
+            # Construit en parallèle par une autre requête : on garde le premier
+            snapshot = self._snapshots.setdefault(digest, snapshot)
+            self._snapshots.move_to_end(digest)
+            while len(self._snapshots) > self.max_entries:
+                self._snapshots.popitem(last=False)
+        return snapshot
+
+    def load(self, rows: list | None) -> PortfolioSnapshot:
+        """Instantané des transactions `rows` (relu seulement si ces lignes sont nouvelles)."""
+        digest = _digest(rows)
+        return self._register(digest, lambda: PortfolioSnapshot(
+            [r for r in (_parse_transaction(row) for row in rows or []) if r], digest,
+        ))
+
+    def append(self, snapshot: PortfolioSnapshot, rows: list) -> PortfolioSnapshot:
+        """Nouvel instantané : `snapshot` complété des transactions valides de `rows`."""
+        new = [r for r in (_parse_transaction(row) for row in rows) if r]
+        if not new:
+            return snapshot
+        digest = _digest([snapshot.digest, rows])
+        return self._register(digest, lambda: PortfolioSnapshot(
+            list(snapshot.records) + new, digest,
+        ))
+
+
+# Instance partagée : instantanés et performances servent d'une requête à l'autre
+STORE = PortfolioStore()
@@ -0,0 +1,281 @@
+"""
+prices.py
+=========
+Historique de cours local : un fichier .npy par ticker.
+
+  <TICKER>.npy : tableau structuré (date datetime64[D], close float64),
+                 trié par date
+
+Dates et cours vivent dans le même fichier : un remplacement atomique
+(`os.replace`) publie les deux à la fois, et un lecteur ne peut jamais voir
+de nouvelles dates avec d'anciens cours.
+
+Les fichiers CSV (export de courtier, Yahoo Finance, Boursorama…) sont
+importés une seule fois, fusionnés avec l'historique existant puis réécrits
+de façon atomique. La fusion se fait sous un verrou de fichier par ticker
+(<TICKER>.lock : flock, ou msvcrt sous Windows), partagé par tous les
+process — plusieurs workers gunicorn peuvent importer en même temps sans
+perdre de cotations. Les lectures ne prennent aucun verrou et ouvrent les
+fichiers en
+`mmap_mode="r"` :
+une requête sur une plage de dates renvoie des vues sur le fichier (aucune
+copie, seules les pages lues sont chargées), localisées par recherche
+dichotomique dans l'index des dates.
+"""
+
+import csv
+import io
+import os
+import re
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+from config import PRICES_DIR
+
+_DATE_HEADERS  = ("date", "jour", "séance", "seance")
+_CLOSE_HEADERS = ("adj close", "adj_close", "close", "clôture", "cloture", "dernier", "cours")
+_TICKER_HEADERS = ("ticker", "symbole", "symbol", "isin")
+_DATE_FORMATS = ("%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y", "%Y/%m/%d")
+
+_SERIES_DTYPE = np.dtype([("date", "datetime64[D]"), ("close", float)])
+
+
+# ─── Parsing CSV ──────────────────────────────────────────────────────────────
+
+def _column(header: list[str], candidates: tuple) -> int | None:
+    lowered = [h.strip().lower() for h in header]
+    for name in candidates:
+        if name in lowered:
+            return lowered.index(name)
+    return None
+
+
+def _parse_dates(raw: list[str]) -> np.ndarray:
+    """Dates texte → datetime64[D] (NaT si illisible) ; ISO 8601 converti d'un bloc."""
+    try:
+        return np.array(raw, dtype="datetime64[D]")
+    except ValueError:
+        pass
+    out = np.full(len(raw), np.datetime64("NaT"), dtype="datetime64[D]")
+    for i, value in enumerate(raw):
+        for fmt in _DATE_FORMATS:
+            try:
+                out[i] = datetime.strptime(value.strip()[:10], fmt).date()
+                break
+            except ValueError:
+                continue
+    return out
+
+
+def _parse_number(value: str) -> float:
+    value = value.strip().replace("\u00a0", "").replace("\u202f", "").replace(" ", "")
+    if "," in value and "." in value:
+        # Le dernier séparateur est le séparateur décimal
+        if value.rfind(",") > value.rfind("."):
+            value = value.replace(".", "").replace(",", ".")
+        else:
+            value = value.replace(",", "")
+    else:
+        value = value.replace(",", ".")
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def parse_price_csv(text: str, default_ticker: str) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """
+    Contenu CSV → {ticker: (dates, cours)} triés, un cours par date.
+
+    Séparateur détecté (« , » ou « ; »), virgule décimale acceptée. Sans
+    colonne ticker, toutes les lignes sont attribuées à `default_ticker`.
+    """
+    sample = text[:4096]
+    delimiter = ";" if sample.count(";") > sample.count(",") else ","
+    rows = list(csv.reader(io.StringIO(text), delimiter=delimiter))
+    if len(rows) < 2:
+        return {}
+    header, body = rows[0], [r for r in rows[1:] if r]
+    i_date, i_close = _column(header, _DATE_HEADERS), _column(header, _CLOSE_HEADERS)
+    if i_date is None or i_close is None:
+        raise ValueError("colonnes Date et Close / Clôture introuvables")
+    i_ticker = _column(header, _TICKER_HEADERS)
+
+    width = max(i_date, i_close, i_ticker or 0) + 1
+    body = [r for r in body if len(r) >= width]
+    dates = _parse_dates([r[i_date] for r in body])
+    close = np.array([_parse_number(r[i_close]) for r in body])
+    tickers = np.array([
+        (r[i_ticker].strip().upper() if i_ticker is not None else "") or default_ticker
+        for r in body
+    ])
+    valid = ~np.isnat(dates) & np.isfinite(close) & (close > 0)
+
+    series = {}
+    for ticker in np.unique(tickers[valid]):
+        mask = valid & (tickers == ticker)
+        series[str(ticker)] = _deduplicate(dates[mask], close[mask])
+    return series
+
+
+def _deduplicate(dates: np.ndarray, close: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Tri par date ; pour une date en double, la dernière valeur lue l'emporte."""
+    order = np.argsort(dates, kind="stable")
+    dates, close = dates[order], close[order]
+    last = np.r_[dates[1:] != dates[:-1], True]
+    return dates[last], close[last]
+
+
+def ticker_from_filename(filename: str) -> str:
+    """« CW8.PA_daily.csv » → « CW8.PA »."""
+    stem = os.path.splitext(os.path.basename(filename or ""))[0]
+    return re.split(r"[_\s]", stem.strip())[0].upper() or "INCONNU"
+
+
+# ─── Stockage ─────────────────────────────────────────────────────────────────
+
+@contextmanager
+def _file_lock(path: str):
+    """Verrou exclusif inter-process sur `path` (créé au besoin), bloquant."""
+    with open(path, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class PriceStore:
+    """Séries de cours en fichiers .npy, lues par projection mémoire."""
+
+    def __init__(self, directory: str = PRICES_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._maps: dict[str, tuple[tuple, np.ndarray, np.ndarray]] = {}
+
+    def _base(self, ticker: str) -> str:
+        return os.path.join(self.directory, re.sub(r"[^A-Z0-9.\-]", "_", ticker.upper()))
+
+    def tickers(self) -> list[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(f[:-len(".npy")] for f in os.listdir(self.directory) if f.endswith(".npy"))
+
+    def signature(self) -> float:
+        """Date de dernière modification du stock (change à chaque import)."""
+        if not os.path.isdir(self.directory):
+            return 0.0
+        return max((os.path.getmtime(os.path.join(self.directory, f))
+                    for f in os.listdir(self.directory) if f.endswith(".npy")), default=0.0)
+
+    @staticmethod
+    def _identity(base: str) -> tuple | None:
+        """(inode, mtime) du fichier courant ; change à chaque import."""
+        try:
+            st = os.stat(base + ".npy")
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns
+
+    def series(self, ticker: str) -> tuple[np.ndarray, np.ndarray] | None:
+        """(dates, cours) complets en lecture seule, sans chargement en mémoire."""
+        base = self._base(ticker)
+        identity = self._identity(base)
+        if identity is None:
+            return None
+        with self._lock:
+            cached = self._maps.get(ticker)
+            if cached is None or cached[0] != identity:
+                try:
+                    table = np.load(base + ".npy", mmap_mode="r")
+                    cached = (identity, table["date"], table["close"])
+                except OSError:
+                    return None                   # remplacé entre-temps
+                self._maps[ticker] = cached
+        return cached[1], cached[2]
+
+    def write(self, ticker: str, dates: np.ndarray, close: np.ndarray, merge: bool = True) -> int:
+        """Enregistre une série (fusionnée avec l'existant) ; renvoie le nombre de cotations."""
+        ticker = ticker.upper()
+        base = self._base(ticker)
+        os.makedirs(self.directory, exist_ok=True)
+        # Lecture, fusion et publication sous un même verrou de fichier : deux
+        # imports simultanés du même ticker, même depuis deux workers, ne
+        # perdent aucune cotation
+        with _file_lock(base + ".lock"):
+            existing = self.series(ticker) if merge else None
+            if existing is not None:
+                dates = np.concatenate([np.asarray(existing[0]), dates])
+                close = np.concatenate([np.asarray(existing[1]), close])
+            dates, close = _deduplicate(dates.astype("datetime64[D]"), close.astype(float))
+            table = np.empty(len(dates), dtype=_SERIES_DTYPE)
+            table["date"], table["close"] = dates, close
+
+            tmp = f"{base}.npy.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, table)
+            with self._lock:
+                self._maps.pop(ticker, None)      # libère la projection avant remplacement
+                os.replace(tmp, base + ".npy")    # dates et cours publiés ensemble
+        return len(dates)
+
+    def import_csv(self, text: str, filename: str = "") -> dict[str, int]:
+        """Importe un fichier CSV ; renvoie {ticker: nombre total de cotations}."""
+        parsed = parse_price_csv(text, ticker_from_filename(filename))
+        return {t: self.write(t, d, c) for t, (d, c) in parsed.items()}
+
+    # ── Requêtes ─────────────────────────────────────────────────────────────
+
+    def range(self, ticker: str, start=None, end=None) -> tuple[np.ndarray, np.ndarray]:
+        """Cotations entre start et end inclus : vues sur le fichier, sans copie."""
+        data = self.series(ticker)
+        if data is None:
+            return np.array([], dtype="datetime64[D]"), np.array([])
+        dates, close = data
+        lo = 0 if start is None else np.searchsorted(dates, np.datetime64(start, "D"), "left")
+        hi = len(dates) if end is None else np.searchsorted(dates, np.datetime64(end, "D"), "right")
+        return dates[lo:hi], close[lo:hi]
+
+    def asof(self, ticker: str, when) -> np.ndarray:
+        """Dernier cours connu à chaque date de `when` (NaN avant la première cotation)."""
+        when = np.atleast_1d(np.asarray(when, dtype="datetime64[D]"))
+        data = self.series(ticker)
+        if data is None or not len(data[0]):
+            return np.full(when.shape, np.nan)
+        dates, close = data
+        idx = np.searchsorted(dates, when, side="right") - 1
+        return np.where(idx >= 0, close[np.clip(idx, 0, None)], np.nan)
+
+    def matrix(self, when, tickers: list[str]) -> np.ndarray:
+        """Cours as-of : dates × tickers (NaN si inconnu) — cf. PortfolioSnapshot.performance."""
+        when = np.asarray(when, dtype="datetime64[D]")
+        out = np.full((len(when), len(tickers)), np.nan)
+        for j, ticker in enumerate(tickers):
+            out[:, j] = self.asof(ticker, when)
+        return out
+
+    def latest(self, tickers: list[str]) -> dict[str, float]:
+        """Dernier cours enregistré par ticker (tickers absents ignorés)."""
+        out = {}
+        for ticker in tickers:
+            data = self.series(ticker)
+            if data is not None and len(data[1]):
+                out[ticker] = float(data[1][-1])
+        return out
+
+
+# Instance partagée : les projections mémoire restent ouvertes entre requêtes
+PRICES = PriceStore()
@@ -0,0 +1,167 @@
+"""
+properties.py
+=============
+Projection du parc immobilier : valeur, capital restant dû et valeur nette.
+
+Les résultats sont des tenseurs NumPy :
+  value   : biens × années × scénarios   (revalorisation par zone ± écart du scénario)
+  balance : biens × années               (capital restant dû en fin d'année)
+  equity  : années × scénarios           (value − balance, sommé sur le parc)
+
+`PropertyPortfolio.update` ne recalcule que les biens jamais vus : chaque
+ligne est identifiée par son contenu (saisie et taux de zone), et ses
+tranches sont gardées sous cette clé dans un LRU borné, partagé par toutes
+les sessions et tous les onglets — elles sont recopiées quelle que soit la
+place de la ligne dans le tableau. Les lignes à calculer le sont en un seul
+appel vectorisé.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from config import CURRENT_YEAR, PROPERTY_CACHE_ROWS, PROPERTY_MAX_HORIZON, PROPERTY_SCENARIOS
+from loans import remaining_balance
+
+
+# ─── Parsing ──────────────────────────────────────────────────────────────────
+
+def _num(value, default: float = 0.0) -> float:
+    try:
+        return float(value) if value not in (None, "") else default
+    except (TypeError, ValueError):
+        return default
+
+
+def parse_property(row: dict) -> dict | None:
+    """Ligne du tableau → bien normalisé (None si aucune valeur saisie)."""
+    value = _num(row.get("Valeur"))
+    if value <= 0:
+        return None
+    return {
+        "name":     str(row.get("Bien") or "Sans nom"),
+        "zone":     row.get("Zone") or "",
+        "value":    value,
+        "capital":  max(_num(row.get("Capital")), 0.0),
+        "rate":     max(_num(row.get("Taux")), 0.0) / 100,
+        "months":   int(max(_num(row.get("Durée")), 0.0) * 12),
+        "start":    int(_num(row.get("Début"), CURRENT_YEAR)),
+    }
+
+
+def parse_zones(rows: list | None) -> dict[str, float]:
+    """Tableau des zones → {zone: revalorisation annuelle en décimal}."""
+    return {
+        str(r["Zone"]): _num(r.get("Taux")) / 100
+        for r in rows or [] if r.get("Zone")
+    }
+
+
+# ─── Moteur ───────────────────────────────────────────────────────────────────
+
+class PropertyPortfolio:
+    """Tenseurs de projection d'un parc, mis à jour ligne par ligne."""
+
+    def __init__(
+        self,
+        horizon: int = PROPERTY_MAX_HORIZON,
+        scenarios: dict[str, float] = PROPERTY_SCENARIOS,
+        start_year: int = CURRENT_YEAR,
+        max_entries: int = PROPERTY_CACHE_ROWS,
+    ):
+        self.years     = np.arange(start_year, start_year + horizon + 1)
+        self.scenarios = list(scenarios)
+        self._offsets  = np.array(list(scenarios.values())) / 100
+        self._steps    = np.arange(horizon + 1)
+        self._lock     = threading.Lock()
+        self.max_entries = max_entries
+        # Contenu d'une ligne → (valeur Y × S, capital restant dû Y), figés
+        self._slices: OrderedDict[tuple, tuple[np.ndarray, np.ndarray]] = OrderedDict()
+
+    def _compute(self, props: list[dict], growth: np.ndarray):
+        """Valeur (k × Y × S) et capital restant dû (k × Y) de k biens."""
+        v0    = np.array([p["value"] for p in props])
+        rates = growth[:, None] + self._offsets[None, :]                     # k × S
+        value = v0[:, None, None] * (1 + rates[:, None, :]) ** self._steps[None, :, None]
+
+        capital = np.array([p["capital"] for p in props])
+        rate    = np.array([p["rate"] for p in props])
+        months  = np.array([p["months"] for p in props])
+        start   = np.array([p["start"] for p in props])
+        # Échéances payées à la fin de chaque année de projection
+        elapsed = (self.years[None, :] - start[:, None] + 1) * 12
+        balance = np.where(
+            months[:, None] > 0,
+            remaining_balance(capital[:, None], rate[:, None], months[:, None], elapsed),
+            0.0,
+        )
+        return value, balance
+
+    def update(self, rows: list | None, zone_rates: dict[str, float]) -> dict:
+        """
+        Projection figée du parc `rows` :
+        {properties, years, scenarios, value, balance, recomputed}.
+        Les tableaux ne sont jamais modifiés en place après coup.
+        """
+        props = [p for p in (parse_property(r) for r in rows or []) if p is not None]
+        growth = np.array([zone_rates.get(p["zone"], 0.0) for p in props])
+        # Le nom n'intervient pas dans le calcul : renommer un bien ne recalcule rien
+        keys = [
+            (p["value"], p["capital"], p["rate"], p["months"], p["start"], g)
+            for p, g in zip(props, growth)
+        ]
+
+        n_years, n_scen = len(self.years), len(self.scenarios)
+        value   = np.empty((len(props), n_years, n_scen))
+        balance = np.empty((len(props), n_years))
+
+        stale = []
+        with self._lock:
+            for i, k in enumerate(keys):
+                cached = self._slices.get(k)
+                if cached is None:
+                    stale.append(i)
+                else:
+                    self._slices.move_to_end(k)
+                    value[i], balance[i] = cached
+
+        if stale:
+            # Calcul hors verrou : une tranche ne dépend que de sa clé
+            v, b = self._compute([props[i] for i in stale], growth[stale])
+            value[stale], balance[stale] = v, b
+            with self._lock:
+                for i in stale:
+                    fresh = (value[i].copy(), balance[i].copy())
+                    for a in fresh:
+                        a.flags.writeable = False
+                    self._slices[keys[i]] = fresh
+                    self._slices.move_to_end(keys[i])
+                while len(self._slices) > self.max_entries:
+                    self._slices.popitem(last=False)
+
+        return {
+            "properties": props,
+            "years":      self.years,
+            "scenarios":  self.scenarios,
+            "value":      value,
+            "balance":    balance,
+            "recomputed": len(stale),
+        }
+
+
+def portfolio_totals(projection: dict, horizon: int | None = None) -> dict:
+    """Sommes sur le parc (années × scénarios), tronquées à `horizon` années."""
+    n = len(projection["years"]) if horizon is None else int(horizon) + 1
+    value   = projection["value"][:, :n].sum(axis=0)
+    balance = projection["balance"][:, :n].sum(axis=0)
+    return {
+        "years":   projection["years"][:n],
+        "value":   value,
+        "balance": balance,
+        "equity":  value - balance[:, None],
+    }
+
+
+# Instance partagée : les tranches calculées servent à toutes les sessions
+PORTFOLIO = PropertyPortfolio()
@@ -0,0 +1,172 @@
+"""
+refinancing.py
+==============
+Optimiseur de rachat / renégociation de crédit immobilier.
+
+Pour un prêt en cours, on explore la grille
+    date de remboursement anticipé × frais × nouveau taux × nouvelle durée
+et l'on compare en valeur actuelle (taux d'actualisation REFI_DISCOUNT_RATE)
+les flux restants du prêt actuel à ceux de l'option :
+
+  gain = VA(statu quo) − [ VA(mensualités jusqu'à la date)
+                           + v^m · (frais + IRA + B_m · g(taux, durée)) ]
+
+où B_m est le capital restant dû à la date m, v le facteur d'actualisation
+mensuel, l'IRA l'indemnité de remboursement anticipé (min. de 3 % du capital
+et de 6 mois d'intérêts) et g(taux, durée) la valeur actuelle d'un prêt de
+1 € — indépendante de la date et des frais, donc calculée une seule fois.
+
+Recherche :
+  - borne supérieure du gain par bloc (date, frais), atteinte au plus petit g ;
+  - blocs triés par borne décroissante et évalués par paquets vectorisés ;
+    un bloc dont la borne ne dépasse pas le meilleur gain trouvé est élagué ;
+  - la frontière de rentabilité (taux maximal par date × frais × durée) ne
+    nécessite aucun balayage : g étant croissant en taux, elle s'obtient par
+    interpolation.
+"""
+
+import numpy as np
+
+from config import REFI_DISCOUNT_RATE, REFI_FEES, REFI_RATE_RANGE, REFI_SWITCH_MONTHS, REFI_YEARS
+from loans import annuity, remaining_balance
+
+_CHUNK = 32   # blocs (date, frais) évalués par paquet
+
+
+def _grid(start, stop, step) -> np.ndarray:
+    return np.round(np.arange(start, stop + step / 2, step), 6)
+
+
+def default_grid() -> dict:
+    """Grille par défaut : taux (décimal), durées (mois), frais (€), dates (mois)."""
+    return {
+        "rates":     _grid(*REFI_RATE_RANGE) / 100,
+        "durations": np.arange(REFI_YEARS[0], REFI_YEARS[1] + 1) * 12,
+        "fees":      _grid(*REFI_FEES),
+        "switch":    _grid(*REFI_SWITCH_MONTHS).astype(int),
+    }
+
+
+def _annuity_pv(monthly_discount: float, n) -> np.ndarray:
+    """Valeur actuelle de n mensualités de 1 €."""
+    n = np.asarray(n, dtype=float)
+    if monthly_discount == 0:
+        return n
+    return (1 - (1 + monthly_discount) ** -n) / monthly_discount
+
+
+def early_repayment_penalty(balance, annual_rate) -> np.ndarray:
+    """Indemnité légale plafonnée : min(3 % du capital, 6 mois d'intérêts)."""
+    balance = np.asarray(balance, dtype=float)
+    return np.minimum(0.03 * balance, balance * annual_rate / 12 * 6)
+
+
+def optimize_refinancing(
+    principal: float,
+    annual_rate: float,
+    months: int,
+    elapsed: int = 0,
+    grid: dict | None = None,
+    discount_rate: float = REFI_DISCOUNT_RATE / 100,
+    max_payment: float | None = None,
+    min_rate: float = 0.0,
+    min_fees: float = 0.0,
+) -> dict:
+    """
+    Meilleure option et frontière de rentabilité.
+
+    elapsed     : échéances déjà payées sur le prêt actuel.
+    max_payment : mensualité maximale acceptée pour le nouveau prêt (None : libre).
+    min_rate    : meilleur taux obtenable (offre de la banque) ; les taux
+                  inférieurs ne servent qu'au tracé de la frontière.
+    min_fees    : frais annoncés ; de même, les frais inférieurs sont exclus
+                  de la recherche du meilleur choix.
+    """
+    grid = grid or default_grid()
+    rates, durations = grid["rates"], grid["durations"]
+    fees = np.asarray(grid["fees"], dtype=float)
+    switch = np.asarray(grid["switch"])
+    switch = switch[elapsed + switch < months]
+
+    d   = (1 + discount_rate) ** (1 / 12) - 1
+    pmt = float(annuity(principal, annual_rate / 12, months))
+    remaining = months - elapsed
+    status_quo = pmt * float(_annuity_pv(d, remaining))
+
+    # Par date : capital restant, IRA, actualisation
+    balance  = remaining_balance(principal, annual_rate, months, elapsed + switch)     # M
+    penalty  = early_repayment_penalty(balance, annual_rate)
+    v_m      = (1 + d) ** -switch.astype(float)
+    paid_pv  = pmt * _annuity_pv(d, switch)
+
+    # Prêt de 1 € : mensualité et valeur actuelle par (taux, durée)
+    unit_pmt = annuity(1.0, rates[:, None] / 12, durations[None, :])                   # R × D
+    g = unit_pmt * _annuity_pv(d, durations)[None, :]
+    g_offer = np.where(rates[:, None] >= min_rate - 1e-12, g, np.inf)
+
+    # Borne supérieure du gain par bloc (date, frais) : atteinte au plus petit g
+    fixed = status_quo - paid_pv[:, None] - v_m[:, None] * (fees[None, :] + penalty[:, None])
+    scale = (v_m * balance)[:, None]                                                   # M × 1
+    bound = fixed - scale * g_offer.min()                                              # M × F
+    bound = np.where(fees[None, :] >= min_fees - 1e-9, bound, -np.inf)
+
+    total = bound.size * g.size
+    best = None
+    best_gain = 0.0
+    evaluated = 0
+    order = np.argsort(bound, axis=None)[::-1]
+    order = order[bound.ravel()[order] > 0]
+    while order.size:
+        chunk, order = order[:_CHUNK], order[_CHUNK:]
+        mi, fi = np.unravel_index(chunk, bound.shape)
+        gain = fixed[mi, fi][:, None, None] - scale[mi, 0][:, None, None] * g_offer[None]  # k × R × D
+        if max_payment is not None:
+            feasible = balance[mi][:, None, None] * unit_pmt[None] <= max_payment
+            gain = np.where(feasible, gain, -np.inf)
+        evaluated += gain.size
+        k, r, n = np.unravel_index(np.argmax(gain), gain.shape)
+        if gain[k, r, n] > best_gain:
+            best_gain = float(gain[k, r, n])
+            best = (mi[k], fi[k], r, n)
+        # Élagage : blocs restants dont la borne ne peut plus battre le meilleur gain
+        order = order[bound.ravel()[order] > best_gain]
+
+    # Frontière : taux au-delà duquel l'option ne rapporte plus (g croissant en taux)
+    threshold = fixed / scale                                                          # M × F
+    frontier = np.full(threshold.shape + (len(durations),), np.nan)
+    for j in range(len(durations)):
+        frontier[..., j] = np.interp(threshold, g[:, j], rates, left=np.nan, right=rates[-1])
+
+    result = {
+        "switch":      switch,
+        "fees":        fees,
+        "rates":       rates,
+        "durations":   durations,
+        "frontier":    frontier,
+        "bound":       bound,
+        "combinations": total,
+        "evaluated":   evaluated,
+        "current_payment": pmt,
+        "best":        None,
+    }
+    if best is not None:
+        mi, fi, r, n = best
+        new_pmt = float(balance[mi] * unit_pmt[r, n])
+        cost = fees[fi] + penalty[mi]
+        # Délai de récupération : premier mois où les sorties cumulées de
+        # l'option (frais + IRA + nouvelles mensualités) passent sous celles du prêt actuel
+        n_left = remaining - int(switch[mi])
+        t = np.arange(1, max(n_left, int(durations[n])) + 1)
+        behind = cost + new_pmt * np.minimum(t, durations[n]) - pmt * np.minimum(t, n_left)
+        recovered = np.nonzero(behind <= 0)[0]
+        result["best"] = {
+            "switch_month": int(switch[mi]),
+            "fees":         float(fees[fi]),
+            "penalty":      float(penalty[mi]),
+            "rate":         float(rates[r]),
+            "months":       int(durations[n]),
+            "payment":      new_pmt,
+            "gain":         best_gain,
+            "breakeven_months": int(t[recovered[0]]) if recovered.size else None,
+        }
+    return result
@@ -0,0 +1,273 @@
+"""
+rental.py
+=========
+Rendement locatif et fiscalité immobilière (France), vectorisés biens × années.
+
+  - rendements brut, net de charges et net-net (après impôt) par bien ;
+  - revenus fonciers : micro-foncier (abattement 30 %, loyers ≤ 15 000 €)
+    contre régime réel (charges et intérêts déductibles, déficit imputable
+    sur le revenu global dans la limite de 10 700 €, reliquat reporté) ;
+  - plus-value de cession : abattements pour durée de détention
+      IR 19 %   : 6 %/an de la 6e à la 21e année, 4 % la 22e  → exonération à 22 ans
+      PS 17,2 % : 1,65 %/an de la 6e à la 21e, 1,60 % la 22e,
+                  9 %/an de la 23e à la 30e                    → exonération à 30 ans
+    et surtaxe au-delà de 50 000 € de plus-value imposable (avec lissage).
+
+Les barèmes sont convertis une fois en tableaux NumPy (lru_cache) et
+interrogés par `np.searchsorted` : réévaluer tout le parc après la
+modification d'un loyer ne coûte que quelques opérations vectorielles.
+Seul le report des déficits fonciers, qui dépend des années précédentes,
+est une boucle sur les années (≤ 41 itérations).
+"""
+
+from collections import deque
+from functools import lru_cache
+
+import numpy as np
+
+from config import (
+    ACQUISITION_FEES_FLAT, CAPITAL_GAINS_IR_RATE, FONCIER_DEFICIT_CAP,
+    FONCIER_DEFICIT_YEARS, IR_BRACKETS, MICRO_FONCIER_ALLOWANCE,
+    MICRO_FONCIER_CEILING, RENT_INDEXATION, SOCIAL_TAX_RATE, WORKS_FLAT,
+)
+from loans import annuity, remaining_balance
+
+
+# ─── Barèmes (convertis une seule fois) ───────────────────────────────────────
+
+@lru_cache(maxsize=None)
+def _ir_table() -> tuple[np.ndarray, np.ndarray]:
+    thresholds, rates = zip(*IR_BRACKETS)
+    return np.array(thresholds, dtype=float), np.array(rates)
+
+
+@lru_cache(maxsize=None)
+def _allowance_table() -> tuple[np.ndarray, np.ndarray]:
+    """Abattements cumulés (IR, PS) indexés par années pleines de détention, 0 à 30."""
+    ir_step = np.zeros(31)
+    ps_step = np.zeros(31)
+    ir_step[6:22], ir_step[22] = 0.06, 0.04
+    ps_step[6:22], ps_step[22], ps_step[23:31] = 0.0165, 0.016, 0.09
+    # Arrondi : 16 × 6 % + 4 % doit valoir exactement 100 %
+    return (np.minimum(np.cumsum(ir_step).round(6), 1.0),
+            np.minimum(np.cumsum(ps_step).round(6), 1.0))
+
+
+@lru_cache(maxsize=None)
+def _surtax_table() -> tuple[np.ndarray, ...]:
+    """
+    Surtaxe sur les plus-values imposables > 50 000 € :
+    (seuil bas, taux, borne de lissage, coefficient de lissage) par tranche.
+    """
+    rows = [
+        (50_000,  0.02, 60_000,  1 / 20),
+        (60_000,  0.02, 0,       0.0),
+        (100_000, 0.03, 110_000, 1 / 10),
+        (110_000, 0.03, 0,       0.0),
+        (150_000, 0.04, 160_000, 0.15),
+        (160_000, 0.04, 0,       0.0),
+        (200_000, 0.05, 210_000, 0.20),
+        (210_000, 0.05, 0,       0.0),
+        (250_000, 0.06, 260_000, 0.25),
+        (260_000, 0.06, 0,       0.0),
+    ]
+    return tuple(np.array(col, dtype=float) for col in zip(*rows))
+
+
+# ─── Impôt sur le revenu ──────────────────────────────────────────────────────
+
+def marginal_rate(taxable_income, parts=1.0) -> np.ndarray:
+    """Tranche marginale d'imposition (TMI) du foyer, diffusée."""
+    thresholds, rates = _ir_table()
+    per_part = np.asarray(taxable_income, dtype=float) / np.maximum(np.asarray(parts, dtype=float), 1.0)
+    idx = np.searchsorted(thresholds, per_part, side="right") - 1
+    return rates[np.clip(idx, 0, len(rates) - 1)]
+
+
+# ─── Plus-values immobilières ─────────────────────────────────────────────────
+
+def holding_allowances(years_held) -> tuple[np.ndarray, np.ndarray]:
+    """Abattements (IR, PS) en fraction de la plus-value brute."""
+    ir, ps = _allowance_table()
+    idx = np.clip(np.floor(np.asarray(years_held, dtype=float)), 0, 30).astype(int)
+    return ir[idx], ps[idx]
+
+
+def surtax(taxable_gain) -> np.ndarray:
+    gain = np.asarray(taxable_gain, dtype=float)
+    lower, rate, smooth_to, coef = _surtax_table()
+    idx = np.searchsorted(lower, gain, side="left") - 1
+    inside = idx >= 0
+    i = np.clip(idx, 0, len(lower) - 1)
+    tax = rate[i] * gain - np.where(coef[i] > 0, (smooth_to[i] - gain) * coef[i], 0.0)
+    return np.where(inside, np.maximum(tax, 0.0), 0.0)
+
+
+def capital_gains_tax(purchase_price, sale_price, years_held, flat_costs: bool = True) -> dict:
+    """
+    Impôt sur la plus-value de cession (hors résidence principale), diffusé.
+
+    flat_costs : majore le prix d'acquisition des forfaits frais d'acquisition
+                 (7,5 %) et travaux (15 %, au-delà de 5 ans de détention).
+    """
+    price = np.asarray(purchase_price, dtype=float)
+    held  = np.asarray(years_held, dtype=float)
+    cost  = price
+    if flat_costs:
+        cost = price * (1 + ACQUISITION_FEES_FLAT + np.where(held > 5, WORKS_FLAT, 0.0))
+    gain = np.maximum(np.asarray(sale_price, dtype=float) - cost, 0.0)
+
+    ir_allow, ps_allow = holding_allowances(held)
+    taxable_ir = gain * (1 - ir_allow)
+    taxable_ps = gain * (1 - ps_allow)
+    ir    = taxable_ir * CAPITAL_GAINS_IR_RATE
+    ps    = taxable_ps * SOCIAL_TAX_RATE
+    extra = surtax(taxable_ir)
+    return {
+        "gain":       gain,
+        "taxable_ir": taxable_ir,
+        "taxable_ps": taxable_ps,
+        "ir":         ir,
+        "ps":         ps,
+        "surtax":     extra,
+        "total":      ir + ps + extra,
+    }
+
+
+# ─── Revenus fonciers ─────────────────────────────────────────────────────────
+
+def yearly_interest(principal, annual_rate, months, start_year, years) -> np.ndarray:
+    """Intérêts d'emprunt payés chaque année civile (prêts × années)."""
+    principal  = np.asarray(principal, dtype=float)[:, None]
+    rate       = np.asarray(annual_rate, dtype=float)[:, None]
+    months     = np.asarray(months, dtype=float)[:, None]
+    elapsed    = (np.asarray(years)[None, :] - np.asarray(start_year)[:, None]) * 12
+    paid       = np.clip(np.minimum(elapsed + 12, months) - np.maximum(elapsed, 0), 0, 12)
+    b_start    = remaining_balance(principal, rate, months, elapsed)
+    b_end      = remaining_balance(principal, rate, months, elapsed + 12)
+    payment    = annuity(principal, rate / 12, months)
+    return np.where(months > 0, np.maximum(paid * payment - (b_start - b_end), 0.0), 0.0)
+
+
+def foncier_taxes(gross, charges, interest, tmi) -> dict:
+    """
+    Impôt annuel du foyer sur ses revenus fonciers (IR + PS), par régime.
+
+    gross, charges, interest : biens × années (sommés sur le foyer).
+    Le micro-foncier vaut NaN les années où les loyers dépassent le plafond ;
+    au réel, l'impôt est négatif quand le déficit imputé sur le revenu global
+    fait économiser plus qu'il n'en coûte.
+    """
+    gross_y    = np.asarray(gross).sum(axis=0)
+    charges_y  = np.asarray(charges).sum(axis=0)
+    interest_y = np.asarray(interest).sum(axis=0)
+    rate = tmi + SOCIAL_TAX_RATE
+
+    micro = np.where(gross_y <= MICRO_FONCIER_CEILING,
+                     gross_y * (1 - MICRO_FONCIER_ALLOWANCE) * rate, np.nan)
+
+    # Régime réel : les intérêts s'imputent d'abord sur les loyers ; seul le
+    # déficit issu des autres charges s'impute sur le revenu global.
+    after_interest = gross_y - interest_y
+    net            = after_interest - charges_y
+    from_charges   = np.clip(-net, 0, charges_y)
+    global_part    = np.minimum(from_charges, FONCIER_DEFICIT_CAP)
+    carried_new    = np.maximum(-net, 0) - global_part
+
+    reel = np.empty_like(gross_y)
+    carry: deque[list] = deque()           # [année d'origine, montant restant]
+    for y in range(len(gross_y)):
+        while carry and y - carry[0][0] > FONCIER_DEFICIT_YEARS:
+            carry.popleft()
+        taxable = max(net[y], 0.0)
+        while taxable > 0 and carry:
+            used = min(taxable, carry[0][1])
+            taxable -= used
+            carry[0][1] -= used
+            if carry[0][1] <= 0:
+                carry.popleft()
+        if carried_new[y] > 0:
+            carry.append([y, carried_new[y]])
+        reel[y] = taxable * rate - global_part[y] * tmi
+
+    return {"gross": gross_y, "micro": micro, "reel": reel}
+
+
+# ─── Évaluation du parc locatif ───────────────────────────────────────────────
+
+def _num(value, default: float = 0.0) -> float:
+    try:
+        return float(value) if value not in (None, "") else default
+    except (TypeError, ValueError):
+        return default
+
+
+def evaluate_rentals(rows: list | None, projection: dict, tmi: float,
+                     indexation_pct: float = RENT_INDEXATION) -> dict | None:
+    """
+    Rendements, fiscalité foncière et impôt de plus-value du parc locatif.
+
+    rows       : lignes du tableau locatif (Bien, Loyer, Charges, Occupation, Prix, Achat).
+    projection : résultat de `PropertyPortfolio.update` (biens, années, valeurs) ;
+                 fournit les intérêts d'emprunt et la valeur de revente.
+    """
+    years = projection["years"]
+    by_name = {p["name"]: i for i, p in enumerate(projection["properties"])}
+    rentals = [r for r in rows or [] if _num(r.get("Loyer")) > 0]
+    if not rentals:
+        return None
+
+    names = [str(r.get("Bien") or "Sans nom") for r in rentals]
+    rent  = np.array([_num(r.get("Loyer")) * 12 for r in rentals])
+    occ   = np.array([_num(r.get("Occupation"), 100) for r in rentals]) / 100
+    chg   = np.array([_num(r.get("Charges")) for r in rentals])
+    match = np.array([by_name.get(n, -1) for n in names])
+    linked = match >= 0
+    scenarios = projection["scenarios"]
+    central = scenarios.index("Central") if "Central" in scenarios else len(scenarios) // 2
+    value = np.zeros((len(rentals), len(years)))                           # P × Y
+    value[linked] = projection["value"][match[linked], :, central]
+
+    price = np.array([_num(r.get("Prix")) for r in rentals])
+    value_now = value[:, 0]
+    price = np.where(price > 0, price, value_now)
+    bought = np.array([_num(r.get("Achat"), years[0]) for r in rentals])
+
+    growth = (1 + indexation_pct / 100) ** (years - years[0])              # Y
+    gross   = (rent * occ)[:, None] * growth[None, :]                      # P × Y
+    charges = chg[:, None] * growth[None, :]
+
+    interest = np.zeros_like(gross)
+    if linked.any():
+        props = [projection["properties"][j] for j in match[linked]]
+        interest[linked] = yearly_interest(
+            [p["capital"] for p in props], [p["rate"] for p in props],
+            [p["months"] for p in props], [p["start"] for p in props], years,
+        )
+
+    taxes = foncier_taxes(gross, charges, interest, tmi)
+    best = np.fmin(taxes["micro"], taxes["reel"])
+    # Impôt de l'année courante réparti au prorata des loyers
+    share = gross[:, 0] / max(gross[:, 0].sum(), 1e-9)
+
+    # Valeur de revente : scénario central de la projection, sinon prix d'achat
+    sale = np.where(linked[:, None], value, price[:, None])
+    gains = capital_gains_tax(price[:, None], sale, years[None, :] - bought[:, None])
+
+    safe_price = np.where(price > 0, price, np.nan)
+    return {
+        "names":       names,
+        "years":       years,
+        "gross_yield": rent / safe_price,
+        "net_yield":   (rent * occ - chg) / safe_price,
+        "net_net_yield": (rent * occ - chg - best[0] * share) / safe_price,
+        "gross":       gross,
+        "charges":     charges,
+        "interest":    interest,
+        "tax_micro":   taxes["micro"],
+        "tax_reel":    taxes["reel"],
+        "best_regime": np.where(np.isnan(taxes["micro"]) | (taxes["reel"] < taxes["micro"]),
+                                "réel", "micro"),
+        "capital_gains_tax": gains["total"],
+        "capital_gain":      gains["gain"],
+    }
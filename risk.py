@@ -0,0 +1,199 @@
+"""
+risk.py
+=======
+Risque du portefeuille : volatilité, corrélation, Value-at-Risk et CVaR.
+
+Moments incrémentaux
+  Moyennes et matrice de covariance des rendements quotidiens sont tenues à
+  jour par fusion de lots (Welford / Chan) : à chaque appel, seules les
+  cotations postérieures à la dernière date traitée sont lues dans
+  l'historique local (prices.py), puis fusionnées avec les moments existants.
+  L'historique est recalculé en entier seulement si la période commune des
+  tickers change (nouveau ticker, historique complété vers le passé).
+
+VaR / CVaR (pertes positives, en euros, pour un horizon de h jours)
+  - historique   : quantile des P&L quotidiens rejoués sur les positions ;
+  - paramétrique : loi normale de moyenne w·μ et de variance wᵀΣw ;
+  - Monte Carlo  : tirages gaussiens corrélés (Cholesky de Σ).
+Toutes les méthodes sont vectorisées sur les niveaux de confiance.
+"""
+
+import threading
+from collections import OrderedDict
+from statistics import NormalDist
+
+import numpy as np
+
+from config import RISK_CACHE_TICKER_SETS, RISK_MC_PATHS, TRADING_DAYS
+from prices import PRICES
+
+_NORMAL = NormalDist()
+
+
+# ─── Moments incrémentaux ─────────────────────────────────────────────────────
+
+class RunningMoments:
+    """Moyenne et co-moments de K séries, fusionnés lot par lot."""
+
+    def __init__(self, k: int):
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))          # Σ (x − μ)(x − μ)ᵀ
+
+    def update(self, batch: np.ndarray) -> None:
+        """Ajoute un lot de T × K observations (formule de fusion de Chan)."""
+        batch = np.atleast_2d(batch)
+        n_b = batch.shape[0]
+        if n_b == 0:
+            return
+        mean_b = batch.mean(axis=0)
+        centered = batch - mean_b
+        comoment_b = centered.T @ centered
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * n_b / n
+        self.comoment = self.comoment + comoment_b + np.outer(delta, delta) * self.n * n_b / n
+        self.n = n
+
+    @property
+    def covariance(self) -> np.ndarray:
+        return self.comoment / max(self.n - 1, 1)
+
+
+# ─── Moteur ───────────────────────────────────────────────────────────────────
+
+class RiskEngine:
+    """Rendements quotidiens alignés et moments, par ensemble de tickers (cache LRU)."""
+
+    def __init__(self, prices, max_entries: int = RISK_CACHE_TICKER_SETS):
+        self.prices = prices
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._states: OrderedDict[tuple, dict] = OrderedDict()
+
+    def _new_state(self, tickers: tuple, start: np.datetime64) -> dict:
+        return {"start": start, "last_date": None, "last_close": None,
+                "moments": RunningMoments(len(tickers)), "returns": np.zeros((0, len(tickers)))}
+
+    def update(self, tickers: list[str]) -> dict | None:
+        """Moments à jour pour `tickers` (ceux sans historique sont ignorés)."""
+        series = {t: self.prices.series(t) for t in tickers}
+        tickers = tuple(t for t in tickers if series[t] is not None and len(series[t][0]) > 1)
+        if not tickers:
+            return None
+        # Période commune : à partir de la première cotation du ticker le plus récent
+        start = max(series[t][0][0] for t in tickers)
+
+        with self._lock:
+            state = self._states.get(tickers)
+            if state is None or state["start"] != start:
+                state = self._states[tickers] = self._new_state(tickers, start)
+            self._states.move_to_end(tickers)
+            while len(self._states) > self.max_entries:
+                self._states.popitem(last=False)
+
+            since = state["last_date"] if state["last_date"] is not None else start
+            new_dates = np.unique(np.concatenate([
+                self.prices.range(t, since)[0] for t in tickers
+            ]))
+            if state["last_date"] is not None:
+                new_dates = new_dates[new_dates > state["last_date"]]
+            new_rows = 0
+            if new_dates.size:
+                close = self.prices.matrix(new_dates, list(tickers))               # as-of
+                if state["last_close"] is not None:
+                    close = np.vstack([state["last_close"], close])
+                batch = close[1:] / close[:-1] - 1
+                state["moments"].update(batch)
+                new_rows = batch.shape[0]
+                state["returns"] = np.vstack([state["returns"], batch])
+                state["last_date"] = new_dates[-1]
+                state["last_close"] = close[-1:]
+
+            moments = state["moments"]
+            return {
+                "tickers":    list(tickers),
+                "start":      state["start"],
+                "end":        state["last_date"],
+                "n":          moments.n,
+                "mean":       moments.mean.copy(),
+                "covariance": moments.covariance,
+                "returns":    state["returns"],
+                "new_rows":   new_rows,
+            }
+
+
+def correlation(covariance: np.ndarray) -> np.ndarray:
+    std = np.sqrt(np.clip(np.diag(covariance), 0, None))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = covariance / np.outer(std, std)
+    return np.nan_to_num(corr)
+
+
+# ─── VaR / CVaR ───────────────────────────────────────────────────────────────
+
+def historical_var(returns: np.ndarray, weights: np.ndarray, levels,
+                   horizon_days: int = 1) -> tuple[np.ndarray, np.ndarray]:
+    """VaR et CVaR historiques (par niveau), P&L quotidiens mis à l'échelle √h."""
+    pnl = returns @ weights * np.sqrt(horizon_days)
+    return _empirical(pnl, levels)
+
+
+def parametric_var(mean: np.ndarray, covariance: np.ndarray, weights: np.ndarray, levels,
+                   horizon_days: int = 1) -> tuple[np.ndarray, np.ndarray]:
+    """VaR et CVaR gaussiennes : μ_p = h·w·μ, σ_p = √(h·wᵀΣw)."""
+    levels = np.asarray(levels, dtype=float)
+    mu = float(weights @ mean) * horizon_days
+    sigma = float(np.sqrt(max(weights @ covariance @ weights, 0.0) * horizon_days))
+    z = np.array([_NORMAL.inv_cdf(float(a)) for a in levels])
+    pdf = np.exp(-z ** 2 / 2) / np.sqrt(2 * np.pi)
+    return sigma * z - mu, sigma * pdf / (1 - levels) - mu
+
+
+def monte_carlo_var(mean: np.ndarray, covariance: np.ndarray, weights: np.ndarray, levels,
+                    horizon_days: int = 1, n_paths: int = RISK_MC_PATHS,
+                    seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """VaR et CVaR par tirages gaussiens corrélés des rendements sur h jours."""
+    k = len(mean)
+    jitter = 1e-12 * max(float(np.trace(covariance)), 1e-12)
+    chol = np.linalg.cholesky(covariance * horizon_days + jitter * np.eye(k))
+    shocks = np.random.default_rng(seed).standard_normal((n_paths, k))
+    pnl = (mean * horizon_days + shocks @ chol.T) @ weights
+    return _empirical(pnl, levels)
+
+
+def _empirical(pnl: np.ndarray, levels) -> tuple[np.ndarray, np.ndarray]:
+    levels = np.asarray(levels, dtype=float)
+    cutoff = np.quantile(pnl, 1 - levels)                                     # L
+    tail = pnl[None, :] <= cutoff[:, None]                                    # L × N
+    cvar = -(np.where(tail, pnl[None, :], 0).sum(axis=1) / tail.sum(axis=1).clip(1))
+    return -cutoff, cvar
+
+
+def risk_report(stats: dict, holdings: dict[str, float], levels, horizon_days: int = 1) -> dict:
+    """
+    Volatilités annualisées, corrélations et VaR / CVaR des trois méthodes.
+
+    holdings : {ticker: valeur de marché en €} ; tickers sans historique ignorés.
+    """
+    tickers = stats["tickers"]
+    weights = np.array([holdings.get(t, 0.0) for t in tickers])
+    cov, mean = stats["covariance"], stats["mean"]
+    levels = np.atleast_1d(levels)
+    total = weights.sum()
+    port_var = float(weights @ cov @ weights)
+    return {
+        "tickers":     tickers,
+        "levels":      levels,
+        "value":       float(total),
+        "volatility":  np.sqrt(np.diag(cov) * TRADING_DAYS),
+        "portfolio_volatility": (np.sqrt(port_var * TRADING_DAYS) / total) if total else np.nan,
+        "correlation": correlation(cov),
+        "historical":  historical_var(stats["returns"], weights, levels, horizon_days),
+        "parametric":  parametric_var(mean, cov, weights, levels, horizon_days),
+        "monte_carlo": monte_carlo_var(mean, cov, weights, levels, horizon_days),
+    }
+
+
+# Instance partagée : les moments accumulés servent d'une requête à l'autre
+RISK = RiskEngine(PRICES)
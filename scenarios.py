@@ -0,0 +1,124 @@
+"""
+scenarios.py
+============
+Mode multi-scénarios : comparaison côte à côte d'hypothèses nommées.
+
+Un scénario fige l'historique salarial, les réglages de projection (taux,
+horizon, intervalle), le budget mensuel et le salaire mensuel saisi. Tous
+les scénarios à évaluer le sont en une seule passe vectorisée sur l'axe des
+scénarios (S × années, horizons différents masqués) ; chaque résultat est
+gardé en cache sous l'empreinte des entrées du scénario (le nom n'en fait
+pas partie) : comparer dix scénarios dont un seul a changé n'en évalue qu'un.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from config import SCENARIO_CACHE_ENTRIES, SCENARIO_DEFAULT_MONTHLY_SALARY
+from memo import canonical_key
+
+SAVINGS_CATEGORY = "Épargne"
+
+
+def _inputs_key(scenario: dict) -> str:
+    inputs = {k: v for k, v in scenario.items() if k != "name"}
+    return canonical_key("scenario", (inputs,))
+
+
+# ─── Évaluation vectorisée ────────────────────────────────────────────────────
+
+def evaluate_batch(scenarios: list[dict]) -> list[dict]:
+    """
+    Indicateurs de S scénarios en une passe.
+
+    Chaque scénario : {history: [[année, salaire net annuel], …], growth (%/an),
+    horizon (années), confidence (%/an), budget: {catégorie: {poste: €/mois}},
+    monthly_salary (€/mois, 0 = dernier salaire / 12)}.
+    """
+    n = len(scenarios)
+    if not n:
+        return []
+    history = [sorted(s.get("history") or []) for s in scenarios]
+    last_year = np.array([h[-1][0] if h else 0 for h in history], dtype=int)
+    last_salary = np.array([h[-1][1] if h else 0.0 for h in history], dtype=float)
+    growth = np.array([float(s.get("growth") or 0) for s in scenarios]) / 100
+    conf = np.array([float(s.get("confidence") or 0) for s in scenarios]) / 100
+    horizon = np.array([max(int(s.get("horizon") or 1), 1) for s in scenarios])
+
+    budgets = [s.get("budget") or {} for s in scenarios]
+    spent = np.array([sum(float(v or 0) for subs in b.values() for v in subs.values())
+                      for b in budgets])
+    savings = np.array([sum(float(v or 0) for v in (b.get(SAVINGS_CATEGORY) or {}).values())
+                        for b in budgets])
+    typed = np.array([float(s.get("monthly_salary") or 0) for s in scenarios])
+    monthly = np.where(typed > 0, typed,
+                       np.where(last_salary > 0, last_salary / 12, SCENARIO_DEFAULT_MONTHLY_SALARY))
+
+    # S × (H + 1) : trajectoires centrale, haute et basse, masquées au-delà de l'horizon
+    steps = np.arange(horizon.max() + 1)
+    live = steps[None, :] <= horizon[:, None]
+    rows = np.arange(n)
+    central = last_salary[:, None] * (1 + growth[:, None]) ** steps
+    high = last_salary[:, None] * (1 + growth[:, None] + conf[:, None]) ** steps
+    low = last_salary[:, None] * (1 + growth[:, None] - conf[:, None]) ** steps
+    earned = np.where(live & (steps > 0), central, 0.0).sum(axis=1)
+    # Épargne indexée sur la croissance salariale, cumulée jusqu'à l'horizon
+    yearly_savings = 12 * savings[:, None] * (1 + growth[:, None]) ** steps
+    saved = np.where(steps[None, :] < horizon[:, None], yearly_savings, 0.0).sum(axis=1)
+
+    return [
+        {
+            "years":          last_year[i] + steps[live[i]],
+            "salary":         central[i, live[i]],
+            "growth":         float(growth[i] * 100),
+            "last_salary":    float(last_salary[i]),
+            "final_salary":   float(central[i, horizon[i]]),
+            "final_high":     float(high[i, horizon[i]]),
+            "final_low":      float(low[i, horizon[i]]),
+            "final_year":     int(last_year[i] + horizon[i]),
+            "earned":         float(earned[i]),
+            "monthly_salary": float(monthly[i]),
+            "monthly_budget": float(spent[i]),
+            "balance":        float(monthly[i] - spent[i]),
+            "savings_rate":   float(savings[i] / monthly[i]) if monthly[i] else 0.0,
+            "saved":          float(saved[i]),
+        }
+        for i in rows
+    ]
+
+
+# ─── Cache ────────────────────────────────────────────────────────────────────
+
+class ScenarioBook:
+    """Résultats de scénarios en cache LRU, indexés par empreinte des entrées."""
+
+    def __init__(self, max_entries: int = SCENARIO_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[str, dict] = OrderedDict()
+        self.evaluated = 0
+
+    def evaluate(self, scenarios: list[dict]) -> list[dict]:
+        """Résultats dans l'ordre de `scenarios` ; seuls les absents du cache sont évalués."""
+        keys = [_inputs_key(s) for s in scenarios]
+        with self._lock:
+            # Résultats en cache relevés d'emblée : une éviction ultérieure
+            # (autre requête, ou comparaison plus large que le cache) est sans effet
+            found = {k: self._cache[k] for k in keys if k in self._cache}
+        missing = {k: s for k, s in zip(keys, scenarios) if k not in found}
+        found.update(zip(missing, evaluate_batch(list(missing.values()))))
+        results = [found[k] for k in keys]
+        with self._lock:
+            self._cache.update(found)
+            for k in keys:
+                self._cache.move_to_end(k)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+            self.evaluated = len(missing)
+        return [{**r, "name": s.get("name", "")} for r, s in zip(results, scenarios)]
+
+
+# Instance partagée : les scénarios évalués restent en cache d'une requête à l'autre
+SCENARIOS = ScenarioBook()
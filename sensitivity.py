@@ -0,0 +1,118 @@
+"""
+sensitivity.py
+==============
+Sensibilité de la projection salariale aux réglages des sliders.
+
+Les sliders taux × horizon × intervalle forment une grille finie
+(config.SALARY_*_RANGE). Lorsque l'historique salarial change, le salaire
+final est calculé en une passe diffusée sur toute la grille :
+
+  central : S₀ · (1 + g)^h                  (taux × horizon)
+  haut    : S₀ · (1 + g + c)^h              (taux × intervalle × horizon)
+  bas     : S₀ · (1 + g − c)^h
+
+Un mouvement de slider n'est ensuite qu'une lecture d'indice. Le tornado
+compare l'écart de salaire final obtenu en faisant varier un seul réglage
+autour de sa valeur courante (le taux et l'horizon sur le scénario central,
+l'intervalle par l'écart entre les bornes basse et haute).
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from config import (
+    SALARY_CONFIDENCE_RANGE, SALARY_GROWTH_RANGE, SALARY_HORIZON_RANGE,
+    SENSITIVITY_CACHE_ENTRIES, SENSITIVITY_GROWTH_SWING, SENSITIVITY_HORIZON_SWING,
+)
+
+
+def _axis(bounds) -> np.ndarray:
+    lo, hi, step = bounds
+    return lo + step * np.arange(int(round((hi - lo) / step)) + 1)
+
+
+def _index(axis: np.ndarray, value) -> int:
+    """Indice du point de grille le plus proche (lecture O(1), pas constant)."""
+    step = axis[1] - axis[0] if len(axis) > 1 else 1
+    return int(np.clip(round((float(value) - axis[0]) / step), 0, len(axis) - 1))
+
+
+class SensitivityGrid:
+    """Salaire final sur toute la grille des sliders, par dernier salaire connu."""
+
+    def __init__(self, max_entries: int = SENSITIVITY_CACHE_ENTRIES):
+        self.growth = _axis(SALARY_GROWTH_RANGE)                   # G (%)
+        self.confidence = _axis(SALARY_CONFIDENCE_RANGE)           # C (%)
+        self.horizon = _axis(SALARY_HORIZON_RANGE).astype(int)     # H (années)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._grids: OrderedDict[float, dict] = OrderedDict()
+        self.computed = 0
+
+    def _compute(self, salary: float) -> dict:
+        g = self.growth[:, None, None] / 100
+        c = self.confidence[None, :, None] / 100
+        h = self.horizon[None, None, :]
+        return {
+            "salary":     salary,
+            "growth":     self.growth,
+            "confidence": self.confidence,
+            "horizon":    self.horizon,
+            "central": salary * (1 + g[:, 0, :]) ** h[:, 0, :],                # G × H
+            "high":    salary * (1 + g + c) ** h,                              # G × C × H
+            "low":     salary * np.clip(1 + g - c, 0, None) ** h,
+        }
+
+    def grid(self, salary: float) -> dict:
+        """Grille du dernier salaire `salary` (calculée une fois, puis servie du cache)."""
+        salary = float(salary)
+        with self._lock:
+            cached = self._grids.get(salary)
+            if cached is not None:
+                self._grids.move_to_end(salary)
+                return cached
+        cached = self._compute(salary)
+        with self._lock:
+            self._grids[salary] = cached
+            while len(self._grids) > self.max_entries:
+                self._grids.popitem(last=False)
+            self.computed += 1
+        return cached
+
+    def lookup(self, salary: float, growth, horizon, confidence) -> dict:
+        """Salaire final (central, bas, haut) au réglage courant des sliders."""
+        grid = self.grid(salary)
+        i, j, k = (_index(self.growth, growth), _index(self.confidence, confidence),
+                   _index(self.horizon, horizon))
+        return {"central": float(grid["central"][i, k]),
+                "low": float(grid["low"][i, j, k]), "high": float(grid["high"][i, j, k])}
+
+    def tornado(self, salary: float, growth, horizon, confidence) -> list[dict]:
+        """Écart de salaire final par réglage, trié du plus influent au moins influent."""
+        grid = self.grid(salary)
+        i, j, k = (_index(self.growth, growth), _index(self.confidence, confidence),
+                   _index(self.horizon, horizon))
+        g_lo, g_hi = (_index(self.growth, self.growth[i] + d * SENSITIVITY_GROWTH_SWING)
+                      for d in (-1, 1))
+        h_lo, h_hi = (_index(self.horizon, self.horizon[k] + d * SENSITIVITY_HORIZON_SWING)
+                      for d in (-1, 1))
+        bars = [
+            {"parameter": f"Taux ±{SENSITIVITY_GROWTH_SWING:g} pts",
+             "low": grid["central"][g_lo, k], "high": grid["central"][g_hi, k],
+             "low_label": f"{self.growth[g_lo]:+.1f} %", "high_label": f"{self.growth[g_hi]:+.1f} %"},
+            {"parameter": f"Horizon ±{SENSITIVITY_HORIZON_SWING} ans",
+             "low": grid["central"][i, h_lo], "high": grid["central"][i, h_hi],
+             "low_label": f"{self.horizon[h_lo]} ans", "high_label": f"{self.horizon[h_hi]} ans"},
+            {"parameter": f"Intervalle ±{self.confidence[j]:g} %/an",
+             "low": grid["low"][i, j, k], "high": grid["high"][i, j, k],
+             "low_label": "borne basse", "high_label": "borne haute"},
+        ]
+        for bar in bars:
+            bar["low"], bar["high"] = float(bar["low"]), float(bar["high"])
+        return sorted(bars, key=lambda b: b["high"] - b["low"], reverse=True)
+
+
+# Instance partagée : les grilles calculées servent d'une requête à l'autre
+SENSITIVITY = SensitivityGrid()
@@ -0,0 +1,114 @@
+"""
+startup_report.py
+=================
+Rapport de démarrage à froid de l'application.
+
+Équivalent agrégé de `python -X importtime` : l'import du module cible est
+exécuté dans un process neuf (aucun module en cache), puis le temps propre
+de chaque module est cumulé par paquet de premier niveau (pandas, scipy…).
+Le temps de construction du premier layout est mesuré à part.
+
+Usage :
+    python startup_report.py            # top 15 des contributeurs
+    python startup_report.py --top 30
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+
+# Script exécuté dans le process fils : import puis premier rendu du layout
+# (app.layout : fonction de layout, comme app.serve_layout, ou composant figé)
+_CHILD_CODE = """
+import json, time
+t0 = time.perf_counter()
+import {module}
+t1 = time.perf_counter()
+render = {module}.app.layout if callable({module}.app.layout) else (lambda: {module}.app.layout)
+render()
+t2 = time.perf_counter()
+render()
+t3 = time.perf_counter()
+print(json.dumps({{"import": t1 - t0, "layout": t2 - t1, "layout_cached": t3 - t2}}))
+"""
+
+
+def _parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """Lignes `import time: self | cumulative | module` → [(module, self_us, cumul_us)]."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumul_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue   # ligne d'en-tête
+        entries.append((parts[2].strip(), self_us, cumul_us))
+    return entries
+
+
+def _aggregate(entries: list[tuple[str, int, int]]) -> dict[str, dict]:
+    """Cumule le temps propre par paquet de premier niveau."""
+    totals: dict[str, dict] = defaultdict(lambda: {"self_us": 0, "modules": 0})
+    for module, self_us, _ in entries:
+        top = module.split(".")[0]
+        totals[top]["self_us"] += self_us
+        totals[top]["modules"] += 1
+    return dict(totals)
+
+
+def run_report(module: str = "app", top: int = 15) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD_CODE.format(module=module)],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Import de {module} impossible :\n{proc.stderr[-2000:]}")
+
+    timings  = json.loads(proc.stdout.strip().splitlines()[-1])
+    entries  = _parse_importtime(proc.stderr)
+    packages = _aggregate(entries)
+    ranked   = sorted(packages.items(), key=lambda kv: kv[1]["self_us"], reverse=True)
+    return {
+        "timings":  timings,
+        "total_us": sum(e[1] for e in entries),
+        "packages": ranked[:top],
+        "modules":  sorted(entries, key=lambda e: e[1], reverse=True)[:top],
+    }
+
+
+def _print_report(report: dict) -> None:
+    t = report["timings"]
+    total_ms = report["total_us"] / 1_000
+    print(f"Import application      : {t['import'] * 1_000:8.1f} ms")
+    print(f"Premier layout          : {t['layout'] * 1_000:8.1f} ms")
+    print(f"Layout (depuis le cache): {t['layout_cached'] * 1_000:8.1f} ms")
+    print()
+    print(f"{'Paquet':<28}{'modules':>8}{'ms':>10}{'part':>8}")
+    for name, agg in report["packages"]:
+        ms = agg["self_us"] / 1_000
+        share = ms / total_ms * 100 if total_ms else 0
+        print(f"{name:<28}{agg['modules']:>8}{ms:>10.1f}{share:>7.1f}%")
+    print()
+    print(f"{'Module (temps propre)':<48}{'ms':>10}")
+    for module, self_us, _ in report["modules"]:
+        print(f"{module[:47]:<48}{self_us / 1_000:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rapport de démarrage à froid")
+    parser.add_argument("--module", default="app", help="module à importer (défaut : app)")
+    parser.add_argument("--top", type=int, default=15, help="nombre de lignes affichées")
+    parser.add_argument("--json", action="store_true", help="sortie JSON brute")
+    args = parser.parse_args()
+
+    result = run_report(args.module, args.top)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        _print_report(result)
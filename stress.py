@@ -0,0 +1,149 @@
+"""
+stress.py
+=========
+Scénarios de stress du portefeuille : chocs de facteurs et rejeux historiques.
+
+Chocs de facteurs
+  Un scénario est un vecteur de variations des facteurs (actions, taux,
+  inflation). Chaque ligne y est exposée selon sa classe d'actifs
+  (config.STRESS_EXPOSURES) ; pour S scénarios à la fois :
+      R = E · M          (lignes × facteurs) · (facteurs × scénarios)
+      P&L = v · R        (valeurs de marché des lignes)
+
+Rejeux historiques
+  Rendement de chaque ligne entre le début et la fin d'une crise, lu dans
+  l'historique local (prices.py). Les lignes sans cotation sur la période
+  reçoivent le choc de facteurs de repli associé à la crise.
+
+Cache
+  Résultat gardé par (lignes et valeurs du portefeuille, scénario) — une
+  clé de contenu, partagée sans risque entre sessions : modifier un
+  scénario ne réévalue que lui, et tous les scénarios manquants sont
+  évalués ensemble par le même produit matriciel.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from config import (
+    STRESS_CACHE_PORTFOLIOS, STRESS_DEFAULT_CLASS, STRESS_EXPOSURES, STRESS_FACTORS,
+    STRESS_HISTORY, STRESS_SCENARIOS,
+)
+from prices import PRICES
+
+HYPOTHETICAL, HISTORICAL = "Hypothétique", "Historique"
+
+
+def scenario_library() -> list[dict]:
+    """Scénarios hypothétiques puis rejeux historiques de la configuration."""
+    return [
+        {"name": name, "kind": HYPOTHETICAL, "moves": tuple(moves)}
+        for name, moves in STRESS_SCENARIOS
+    ] + [
+        {"name": name, "kind": HISTORICAL, "moves": tuple(moves), "start": start, "end": end}
+        for name, start, end, moves in STRESS_HISTORY
+    ]
+
+
+def exposure_matrix(classes: list[str]) -> np.ndarray:
+    """Lignes × facteurs ; classe inconnue → classe par défaut."""
+    default = STRESS_EXPOSURES[STRESS_DEFAULT_CLASS]
+    return np.array([STRESS_EXPOSURES.get(c, default) for c in classes],
+                    dtype=float).reshape(len(classes), len(STRESS_FACTORS))
+
+
+def _scenario_key(scenario: dict) -> tuple:
+    return (scenario["name"], scenario["kind"], tuple(scenario["moves"]),
+            scenario.get("start"), scenario.get("end"))
+
+
+class StressEngine:
+    """Évaluation groupée des scénarios, en cache par version du portefeuille."""
+
+    def __init__(self, prices):
+        self.prices = prices
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[str, dict[tuple, dict]] = OrderedDict()
+
+    def _replay(self, tickers: list[str], scenarios: list[dict]) -> np.ndarray:
+        """Rendements historiques lignes × scénarios (NaN : pas de rejeu possible)."""
+        out = np.full((len(tickers), len(scenarios)), np.nan)
+        cols = [j for j, s in enumerate(scenarios) if s["kind"] == HISTORICAL]
+        if not cols:
+            return out
+        bounds = np.array([[scenarios[j]["start"], scenarios[j]["end"]] for j in cols],
+                          dtype="datetime64[D]")                              # H × 2
+        for i, ticker in enumerate(tickers):
+            data = self.prices.series(ticker)
+            if data is None or not len(data[0]):
+                continue
+            close = self.prices.asof(ticker, bounds.ravel()).reshape(bounds.shape)
+            # Début de crise antérieur à la première cotation : pas de rejeu
+            close[bounds[:, 0] < data[0][0], 0] = np.nan
+            out[i, cols] = close[:, 1] / close[:, 0] - 1
+        return out
+
+    def run(self, holdings: dict[str, float], classes: dict[str, str],
+            scenarios: list[dict]) -> tuple[list[dict], int]:
+        """
+        P&L de chaque scénario pour les lignes `holdings` ({ticker: valeur €}).
+
+        classes : {ticker: classe d'actifs}. Renvoie, dans l'ordre des scénarios,
+        {name, kind, pnl, share, after, worst, worst_pnl, replayed}, et le
+        nombre de scénarios évalués par cet appel (hors cache).
+        """
+        tickers = sorted(t for t, v in holdings.items() if v)
+        values = np.array([holdings[t] for t in tickers], dtype=float)
+        line_classes = [classes.get(t) or STRESS_DEFAULT_CLASS for t in tickers]
+        signature = self.prices.signature()
+        portfolio = hashlib.sha1(repr((tickers, values.tobytes(), line_classes)).encode()).hexdigest()
+
+        def key(s):
+            # Un rejeu dépend aussi de l'historique importé
+            return _scenario_key(s) + ((signature,) if s["kind"] == HISTORICAL else ())
+
+        with self._lock:
+            cached = self._cache.setdefault(portfolio, {})
+            self._cache.move_to_end(portfolio)
+            while len(self._cache) > STRESS_CACHE_PORTFOLIOS:
+                self._cache.popitem(last=False)
+            missing = list({key(s): s for s in scenarios if key(s) not in cached}.values())
+
+        if missing and len(tickers):
+            moves = np.array([s["moves"] for s in missing], dtype=float).T       # F × S
+            returns = exposure_matrix(line_classes) @ moves                       # P × S
+            history = self._replay(tickers, missing)
+            replayed = np.isfinite(history)
+            returns = np.where(replayed, history, returns)
+            pnl = values @ returns                                                # S
+            line_pnl = values[:, None] * returns
+            worst = line_pnl.argmin(axis=0)
+            total = values.sum()
+            fresh = {
+                key(s): {
+                    "name": s["name"], "kind": s["kind"],
+                    "pnl": float(pnl[j]), "share": float(pnl[j] / total) if total else 0.0,
+                    "after": float(total + pnl[j]),
+                    "worst": tickers[worst[j]], "worst_pnl": float(line_pnl[worst[j], j]),
+                    "replayed": int(replayed[:, j].sum()),
+                }
+                for j, s in enumerate(missing)
+            }
+        else:
+            fresh = {key(s): {"name": s["name"], "kind": s["kind"], "pnl": 0.0, "share": 0.0,
+                              "after": 0.0, "worst": "—", "worst_pnl": 0.0, "replayed": 0}
+                     for s in missing}
+
+        with self._lock:
+            # Import de cours pendant l'évaluation : les rejeux ne correspondent
+            # plus à la signature de leur clé, ils ne sont pas gardés
+            if self.prices.signature() == signature:
+                cached.update(fresh)
+            return [fresh.get(key(s)) or cached[key(s)] for s in scenarios], len(fresh)
+
+
+# Instance partagée : les scénarios évalués restent en cache d'une requête à l'autre
+STRESS = StressEngine(PRICES)
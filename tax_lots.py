@@ -0,0 +1,193 @@
+"""
+tax_lots.py
+===========
+Fiscalité des plus-values mobilières : registre de lots et PFU contre barème.
+
+Registre
+  Les transactions de chaque position (compte, ticker) sont parcourues une
+  seule fois, dans l'ordre des dates :
+    - prix de revient : PRU (prix moyen pondéré, frais inclus), seule
+      méthode admise pour des titres fongibles ;
+    - durée de détention : lots en file (deque) consommés en FIFO, pour
+      l'abattement des titres acquis avant 2018 (option barème).
+  Le résultat de chaque position est mis en cache (LRU borné) sous la clé
+  (position, empreinte de ses propres transactions) : corriger une
+  transaction ne rejoue que sa position, et des sessions aux transactions
+  différentes ne s'évincent pas mutuellement.
+
+Imposition annuelle (comptes-titres ; PEA et assurance-vie ne sont pas
+imposés à la cession mais au retrait)
+  PFU    : 12,8 % + prélèvements sociaux sur plus-values nettes et dividendes ;
+  barème : TMI sur plus-values nettes après abattement et dividendes après
+           abattement de 40 %, + prélèvements sociaux sur les montants bruts.
+  Les moins-values s'imputent sur les plus-values de l'année puis des dix
+  années suivantes.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from config import (
+    ALLOWANCE_CUTOFF_YEAR, CAPITAL_LOSS_CARRY_YEARS, DIVIDEND_ALLOWANCE, PFU_IR_RATE,
+    SECURITIES_ALLOWANCES, SHELTERED_ACCOUNTS, SOCIAL_TAX_RATE, TAX_LEDGER_POSITIONS,
+)
+from portfolio import BUY, DIVIDEND, SELL
+
+_DAYS_PER_YEAR = 365.25
+
+
+def holding_allowance(years_held, acquired_year) -> np.ndarray:
+    """Abattement pour durée de détention (titres acquis avant 2018, option barème)."""
+    years_held = np.asarray(years_held, dtype=float)
+    rate = np.zeros_like(years_held)
+    for min_years, allowance in SECURITIES_ALLOWANCES:
+        rate = np.where(years_held >= min_years, allowance, rate)
+    return np.where(np.asarray(acquired_year) < ALLOWANCE_CUTOFF_YEAR, rate, 0.0)
+
+
+def _replay(dates, kinds, qty, price, fees) -> dict:
+    """Une position : cessions réalisées, dividendes et lots encore ouverts."""
+    lots: deque[list] = deque()                # [date d'achat, quantité restante]
+    held, cost = 0.0, 0.0
+    sales, dividends = [], []
+    for day, kind, q, p, f in zip(dates, kinds, qty, price, fees):
+        if kind == BUY:
+            lots.append([day, q])
+            held += q
+            cost += q * p + f
+        elif kind == SELL:
+            q = min(q, held)
+            if q <= 0:
+                continue
+            basis = cost * q / held
+            held -= q
+            cost -= basis
+            # Durée de détention des titres cédés : premiers entrés, premiers sortis
+            allowance, left = 0.0, q
+            while left > 1e-12 and lots:
+                used = min(left, lots[0][1])
+                years = (day - lots[0][0]).astype(int) / _DAYS_PER_YEAR
+                acquired = lots[0][0].astype("datetime64[Y]").astype(int) + 1970
+                allowance += used * float(holding_allowance(years, acquired))
+                lots[0][1] -= used
+                left -= used
+                if lots[0][1] <= 1e-12:
+                    lots.popleft()
+            sales.append((day, q * p - f, basis, allowance / q))
+        elif kind == DIVIDEND:
+            dividends.append((day, q * p - f))
+    return {
+        "sales":     sales,                    # (date, prix de cession net, PRU × q, abattement)
+        "dividends": dividends,
+        "held":      held,
+        "pru":       cost / held if held > 1e-12 else 0.0,
+        "lots":      [(d, q) for d, q in lots],
+    }
+
+
+class TaxLedger:
+    """Registre des lots par position, rejoué position par position."""
+
+    def __init__(self, max_entries: int = TAX_LEDGER_POSITIONS):
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[tuple, dict] = OrderedDict()   # (position, empreinte) → rejeu
+        self.max_entries = max_entries
+
+    def update(self, snapshot) -> tuple[dict, int]:
+        """
+        Registre des transactions d'un PortfolioSnapshot :
+        ({(compte, ticker): position rejouée}, nombre de positions rejouées).
+        Seules les positions dont les transactions n'ont encore jamais été
+        rejouées le sont.
+        """
+        key = snapshot.position_key
+        order = np.lexsort((np.arange(len(key)), key))
+        bounds = np.flatnonzero(np.r_[True, key[order][1:] != key[order][:-1], True])
+        n_tic = max(len(snapshot.tickers), 1)
+        ledger, replayed = {}, 0
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            rows = order[lo:hi]
+            k = int(key[rows[0]])
+            position = (snapshot.accounts[k // n_tic], snapshot.tickers[k % n_tic])
+            columns = (snapshot.date[rows], snapshot.kind[rows], snapshot.qty[rows],
+                       snapshot.price[rows], snapshot.fees[rows])
+            entry = (position, hashlib.sha1(b"".join(c.tobytes() for c in columns)).hexdigest())
+            with self._lock:
+                cached = self._cache.get(entry)
+                if cached is not None:
+                    self._cache.move_to_end(entry)
+            if cached is None:
+                # Rejeu hors verrou : le résultat ne dépend que de la clé
+                cached = _replay(*columns)
+                replayed += 1
+                with self._lock:
+                    cached = self._cache.setdefault(entry, cached)
+                    while len(self._cache) > self.max_entries:
+                        self._cache.popitem(last=False)
+            ledger[position] = cached
+        return ledger, replayed
+
+
+def yearly_tax(ledger: dict, tmi: float) -> dict | None:
+    """Impôt annuel des comptes-titres selon le PFU et selon le barème."""
+    sales = [s for (account, _), pos in ledger.items()
+             if account not in SHELTERED_ACCOUNTS for s in pos["sales"]]
+    dividends = [d for (account, _), pos in ledger.items()
+                 if account not in SHELTERED_ACCOUNTS for d in pos["dividends"]]
+    if not sales and not dividends:
+        return None
+
+    sale_year = np.array([s[0].astype("datetime64[Y]").astype(int) + 1970 for s in sales], dtype=int)
+    gain = np.array([s[1] - s[2] for s in sales], dtype=float)
+    allowance = np.array([s[3] for s in sales], dtype=float)
+    div_year = np.array([d[0].astype("datetime64[Y]").astype(int) + 1970 for d in dividends], dtype=int)
+    div_amount = np.array([d[1] for d in dividends], dtype=float)
+
+    years = np.arange(min(np.r_[sale_year, div_year]), max(np.r_[sale_year, div_year]) + 1)
+    idx_s, idx_d = sale_year - years[0], div_year - years[0]
+    gains  = np.bincount(idx_s, weights=np.clip(gain, 0, None), minlength=len(years))
+    losses = np.bincount(idx_s, weights=np.clip(-gain, 0, None), minlength=len(years))
+    # Abattement moyen pondéré par les plus-values de l'année
+    allow_w = np.bincount(idx_s, weights=np.clip(gain, 0, None) * allowance, minlength=len(years))
+    allow_rate = np.divide(allow_w, gains, out=np.zeros_like(gains), where=gains > 0)
+    divs = np.bincount(idx_d, weights=div_amount, minlength=len(years))
+
+    # Imputation des moins-values : année en cours puis reports sur dix ans
+    net = np.zeros(len(years))
+    carry: deque[list] = deque()               # [année d'origine, moins-value restante]
+    for y in range(len(years)):
+        while carry and y - carry[0][0] > CAPITAL_LOSS_CARRY_YEARS:
+            carry.popleft()
+        taxable = gains[y] - losses[y]
+        if taxable < 0:
+            carry.append([y, -taxable])
+            taxable = 0.0
+        while taxable > 0 and carry:
+            used = min(taxable, carry[0][1])
+            taxable -= used
+            carry[0][1] -= used
+            if carry[0][1] <= 0:
+                carry.popleft()
+        net[y] = taxable
+
+    social = SOCIAL_TAX_RATE * (net + divs)
+    pfu = PFU_IR_RATE * (net + divs) + social
+    bareme = tmi * (net * (1 - allow_rate) + divs * (1 - DIVIDEND_ALLOWANCE)) + social
+    return {
+        "years":     years,
+        "gains":     gains,
+        "losses":    losses,
+        "net_gains": net,
+        "dividends": divs,
+        "pfu":       pfu,
+        "bareme":    bareme,
+        "best":      np.where(bareme < pfu, "Barème", "PFU"),
+        "carried_loss": float(sum(c[1] for c in carry)),
+    }
+
+
+# Instance partagée : les positions déjà rejouées restent en cache, toutes sessions confondues
+LEDGER = TaxLedger()